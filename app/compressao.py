@@ -0,0 +1,148 @@
+import gzip
+import io
+import os
+import zlib
+
+from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+load_dotenv()
+
+COMPRESSAO_MINIMO = int(os.getenv("COMPRESSAO_MINIMO", "1024"))
+COMPRESSAO_NIVEL_GZIP = int(os.getenv("COMPRESSAO_NIVEL_GZIP", "6"))
+COMPRESSAO_NIVEL_BROTLI = int(os.getenv("COMPRESSAO_NIVEL_BROTLI", "4"))
+
+# Conteúdos que já vêm comprimidos não ganham nada com uma segunda passada;
+# server-sent events ficam de fora para que cada evento chegue sem esperar o compressor
+_NAO_COMPRIMIR = ("text/event-stream", "image/", "video/", "audio/", "application/zip", "application/gzip",
+                  "application/vnd.apache.parquet", "application/vnd.apache.arrow")
+
+
+def escolher_codificacao(accept_encoding: str) -> str | None:
+    """
+    Escolhe ``br`` (se o pacote brotli estiver instalado) ou ``gzip`` conforme o Accept-Encoding.
+    """
+    aceitas = {}
+    for parte in accept_encoding.lower().split(","):
+        nome, _, parametros = parte.strip().partition(";")
+        qualidade = 1.0
+        if parametros.strip().startswith("q="):
+            try:
+                qualidade = float(parametros.strip()[2:])
+            except ValueError:
+                qualidade = 0.0
+        if nome:
+            aceitas[nome] = qualidade
+    if brotli is not None and aceitas.get("br", 0) > 0:
+        return "br"
+    if aceitas.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    def __init__(self, codificacao: str):
+        self.codificacao = codificacao
+        if codificacao == "br":
+            self._br = brotli.Compressor(quality=COMPRESSAO_NIVEL_BROTLI)
+        else:
+            self._buffer = io.BytesIO()
+            self._gzip = gzip.GzipFile(mode="wb", fileobj=self._buffer, compresslevel=COMPRESSAO_NIVEL_GZIP)
+
+    def comprimir(self, dados: bytes, final: bool) -> bytes:
+        if self.codificacao == "br":
+            saida = self._br.process(dados) if dados else b""
+            return saida + (self._br.finish() if final else self._br.flush())
+        self._gzip.write(dados)
+        if final:
+            self._gzip.close()
+        else:
+            # Envia o que já foi comprimido, para que respostas em fluxo não fiquem presas
+            self._gzip.flush(zlib.Z_SYNC_FLUSH)
+        saida = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return saida
+
+
+class CompressaoMiddleware:
+    """
+    Comprime as respostas com brotli ou gzip, conforme o Accept-Encoding do cliente.
+
+    Respostas menores que ``minimo`` bytes saem sem compressão. Respostas em fluxo
+    (NDJSON, CSV) são comprimidas pedaço a pedaço. Respostas que já têm
+    Content-Encoding, os status 204/304 e tipos já comprimidos não são alterados.
+    """
+
+    def __init__(self, app, minimo: int = COMPRESSAO_MINIMO):
+        self.app = app
+        self.minimo = minimo
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        codificacao = escolher_codificacao(Headers(scope=scope).get("accept-encoding", ""))
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio = None
+        compressor = None
+        repassar = False
+
+        async def enviar(mensagem):
+            nonlocal inicio, compressor, repassar
+            if mensagem["type"] == "http.response.start":
+                inicio = mensagem
+                headers = Headers(raw=mensagem["headers"])
+                tipo = headers.get("content-type", "")
+                repassar = (
+                    mensagem["status"] in (204, 304)
+                    or "content-encoding" in headers
+                    or tipo.startswith(_NAO_COMPRIMIR)
+                )
+                if repassar:
+                    await send(mensagem)
+                return
+
+            if mensagem["type"] != "http.response.body" or repassar:
+                await send(mensagem)
+                return
+
+            corpo = mensagem.get("body", b"")
+            mais = mensagem.get("more_body", False)
+
+            if compressor is None:
+                if not mais and len(corpo) < self.minimo:
+                    # Resposta pequena e completa: segue sem compressão
+                    await send(inicio)
+                    await send(mensagem)
+                    repassar = True
+                    return
+                compressor = _Compressor(codificacao)
+                headers = MutableHeaders(raw=inicio["headers"])
+                headers["Content-Encoding"] = codificacao
+                headers.add_vary_header("Accept-Encoding")
+                if mais:
+                    del headers["Content-Length"]
+                    await send(inicio)
+                else:
+                    comprimido = compressor.comprimir(corpo, final=True)
+                    headers["Content-Length"] = str(len(comprimido))
+                    await send(inicio)
+                    await send({"type": "http.response.body", "body": comprimido})
+                    return
+
+            await send({
+                "type": "http.response.body",
+                "body": compressor.comprimir(corpo, final=not mais),
+                "more_body": mais,
+            })
+
+        await self.app(scope, receive, enviar)
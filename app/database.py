@@ -1,7 +1,12 @@
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from fastapi import Request
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,13 +18,273 @@ print(f"DATABASE_URL em database.py: {DATABASE_URL}")
 if DATABASE_URL is None:
     raise ValueError("DATABASE_URL environment variable is not set!")
 
-engine = create_engine(DATABASE_URL)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+DB_SESSAO_LENTA_MS = float(os.getenv("DB_SESSAO_LENTA_MS", "2000"))
+
+# Drivers assíncronos equivalentes aos síncronos usados no DATABASE_URL
+_DRIVERS_ASYNC = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgresql+psycopg": "postgresql+psycopg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def url_async(url: str) -> str:
+    """
+    Converte o DATABASE_URL síncrono para o driver assíncrono correspondente
+    (asyncpg no PostgreSQL, aiosqlite no SQLite).
+
+    Raises:
+        ValueError: Se o esquema não tiver equivalente assíncrono conhecido.
+    """
+    esquema, separador, resto = url.partition("://")
+    if esquema not in _DRIVERS_ASYNC:
+        raise ValueError(
+            f"Não há driver assíncrono conhecido para '{esquema}'; defina ASYNC_DATABASE_URL"
+        )
+    return _DRIVERS_ASYNC[esquema] + separador + resto
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or url_async(DATABASE_URL)
+
+
+class MetricasPool:
+    """
+    Contadores de uso de um pool de conexões, alimentados pelos eventos do SQLAlchemy
+    e pelo pool instrumentado (tempo de espera por uma conexão livre).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.conexoes_abertas = 0
+        self.invalidadas = 0
+        self.esperas_total_ms = 0.0
+        self.espera_max_ms = 0.0
+        self.timeouts = 0
+        self.uso_max_ms = 0.0
+
+    def registrar_espera(self, ms: float, timeout: bool = False):
+        with self._lock:
+            self.esperas_total_ms += ms
+            self.espera_max_ms = max(self.espera_max_ms, ms)
+            if timeout:
+                self.timeouts += 1
+
+    def ligar(self, engine):
+        pool = engine.pool
+
+        @event.listens_for(pool, "connect")
+        def _connect(dbapi_connection, connection_record):
+            with self._lock:
+                self.conexoes_abertas += 1
+
+        @event.listens_for(pool, "close")
+        def _close(dbapi_connection, connection_record):
+            with self._lock:
+                self.conexoes_abertas -= 1
+
+        @event.listens_for(pool, "checkout")
+        def _checkout(dbapi_connection, connection_record, connection_proxy):
+            connection_record.info["checkout_em"] = time.perf_counter()
+            with self._lock:
+                self.checkouts += 1
+
+        @event.listens_for(pool, "checkin")
+        def _checkin(dbapi_connection, connection_record):
+            inicio = connection_record.info.pop("checkout_em", None)
+            if inicio is not None:
+                uso = (time.perf_counter() - inicio) * 1000
+                with self._lock:
+                    self.uso_max_ms = max(self.uso_max_ms, uso)
+
+        @event.listens_for(pool, "invalidate")
+        def _invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.invalidadas += 1
+
+    def resumo(self, pool) -> dict:
+        with self._lock:
+            dados = {
+                "checkouts": self.checkouts,
+                "conexoes_abertas": self.conexoes_abertas,
+                "invalidadas": self.invalidadas,
+                "espera_media_ms": round(self.esperas_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "espera_max_ms": round(self.espera_max_ms, 3),
+                "timeouts": self.timeouts,
+                "uso_max_ms": round(self.uso_max_ms, 3),
+            }
+        if isinstance(pool, QueuePool):
+            dados.update({
+                "tamanho": pool.size(),
+                "em_uso": pool.checkedout(),
+                "livres": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+        return dados
+
+
+class _EsperaInstrumentada:
+    """
+    Mede quanto tempo cada checkout esperou por uma conexão livre do pool.
+    """
+
+    metricas: MetricasPool | None = None
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexao = super()._do_get()
+        except exc.TimeoutError:
+            if self.metricas is not None:
+                self.metricas.registrar_espera((time.perf_counter() - inicio) * 1000, timeout=True)
+            raise
+        if self.metricas is not None:
+            self.metricas.registrar_espera((time.perf_counter() - inicio) * 1000)
+        return conexao
+
+
+class QueuePoolInstrumentado(_EsperaInstrumentada, QueuePool):
+    pass
+
+
+class AsyncQueuePoolInstrumentado(_EsperaInstrumentada, AsyncAdaptedQueuePool):
+    pass
+
+
+def _opcoes_engine(url: str, assincrono: bool) -> dict:
+    """
+    Monta os parâmetros do pool e o statement_timeout a partir das variáveis de ambiente.
+    O SQLite mantém o pool padrão do SQLAlchemy.
+    """
+    if url.startswith("sqlite"):
+        return {}
+    opcoes = {
+        "poolclass": AsyncQueuePoolInstrumentado if assincrono else QueuePoolInstrumentado,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if DB_STATEMENT_TIMEOUT_MS > 0 and url.startswith("postgresql"):
+        if assincrono:
+            opcoes["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            opcoes["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return opcoes
+
+
+def _instrumentar(engine, metricas: MetricasPool):
+    if isinstance(engine.pool, _EsperaInstrumentada):
+        engine.pool.metricas = metricas
+    metricas.ligar(engine)
+
+
+engine = create_engine(DATABASE_URL, **_opcoes_engine(DATABASE_URL, assincrono=False))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_opcoes_engine(ASYNC_DATABASE_URL, assincrono=True))
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+metricas_pool_sync = MetricasPool()
+metricas_pool_async = MetricasPool()
+_instrumentar(engine, metricas_pool_sync)
+_instrumentar(async_engine.sync_engine, metricas_pool_async)
+
+
+class RegistroSessoes:
+    """
+    Acompanha as sessões abertas por ``get_db``/``get_async_db``.
+
+    Sessões que ficam abertas além de ``DB_SESSAO_LENTA_MS`` são registradas no log
+    ao fechar e aparecem em ``abertas_ha_mais_de`` enquanto continuam abertas,
+    o que expõe vazamentos antes de o pool esgotar.
+    """
+
+    def __init__(self, limite_lenta_ms: float = DB_SESSAO_LENTA_MS):
+        self.limite_lenta_ms = limite_lenta_ms
+        self._lock = threading.Lock()
+        self._abertas: dict[int, tuple[float, str]] = {}
+        self._proximo_id = 0
+        self.total = 0
+        self.lentas = 0
+        self.duracao_max_ms = 0.0
+
+    def abrir(self, origem: str) -> int:
+        with self._lock:
+            self._proximo_id += 1
+            self._abertas[self._proximo_id] = (time.perf_counter(), origem)
+            self.total += 1
+            return self._proximo_id
+
+    def fechar(self, sessao_id: int):
+        with self._lock:
+            inicio, origem = self._abertas.pop(sessao_id)
+            duracao = (time.perf_counter() - inicio) * 1000
+            self.duracao_max_ms = max(self.duracao_max_ms, duracao)
+            lenta = duracao > self.limite_lenta_ms
+            if lenta:
+                self.lentas += 1
+        if lenta:
+            print(f"Sessão do banco aberta por {duracao:.0f} ms ({origem})")
+
+    def abertas_ha_mais_de(self, ms: float) -> list[dict]:
+        agora = time.perf_counter()
+        with self._lock:
+            return [
+                {"origem": origem, "aberta_ha_ms": round((agora - inicio) * 1000, 1)}
+                for inicio, origem in self._abertas.values()
+                if (agora - inicio) * 1000 > ms
+            ]
+
+    def resumo(self) -> dict:
+        with self._lock:
+            dados = {
+                "total": self.total,
+                "abertas": len(self._abertas),
+                "lentas": self.lentas,
+                "duracao_max_ms": round(self.duracao_max_ms, 3),
+            }
+        dados["abertas_lentas"] = self.abertas_ha_mais_de(self.limite_lenta_ms)
+        return dados
+
+
+registro_sessoes = RegistroSessoes()
+
+
+def metricas_banco() -> dict:
+    """
+    Retorna o estado dos pools (síncrono e assíncrono) e das sessões abertas pelas rotas.
+    """
+    return {
+        "pool": metricas_pool_sync.resumo(engine.pool),
+        "pool_async": metricas_pool_async.resumo(async_engine.sync_engine.pool),
+        "sessoes": registro_sessoes.resumo(),
+    }
+
+
+def get_db(request: Request):
+    sessao_id = registro_sessoes.abrir(f"{request.method} {request.url.path}")
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+        registro_sessoes.fechar(sessao_id)
+
+async def get_async_db(request: Request):
+    sessao_id = registro_sessoes.abrir(f"{request.method} {request.url.path}")
+    try:
+        async with AsyncSessionLocal() as db:
+            yield db
+    finally:
+        registro_sessoes.fechar(sessao_id)
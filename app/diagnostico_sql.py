@@ -0,0 +1,237 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+from .telemetria import impressao_consulta
+
+load_dotenv()
+
+DIAGNOSTICO_SQL_HABILITADO = os.getenv("DIAGNOSTICO_SQL_HABILITADO", "false").lower() == "true"
+# Comandos acima deste tempo são registrados no log com o plano de execução
+DIAGNOSTICO_SQL_LENTA_MS = float(os.getenv("DIAGNOSTICO_SQL_LENTA_MS", "500"))
+# Execuções da mesma consulta em uma requisição a partir das quais ela é tratada como N+1
+DIAGNOSTICO_SQL_REPETICOES = int(os.getenv("DIAGNOSTICO_SQL_REPETICOES", "5"))
+# Requisições com mais comandos que isto são registradas mesmo sem repetição
+DIAGNOSTICO_SQL_MAX_COMANDOS = int(os.getenv("DIAGNOSTICO_SQL_MAX_COMANDOS", "50"))
+DIAGNOSTICO_SQL_EXPLAIN = os.getenv("DIAGNOSTICO_SQL_EXPLAIN", "true").lower() == "true"
+# Intervalo mínimo entre dois EXPLAIN da mesma consulta lenta
+DIAGNOSTICO_SQL_EXPLAIN_INTERVALO = float(os.getenv("DIAGNOSTICO_SQL_EXPLAIN_INTERVALO", "600"))
+
+
+class ComandosRequisicao:
+    """
+    Comandos SQL executados durante uma requisição, agrupados pela impressão da consulta.
+    """
+
+    __slots__ = ("rota", "total", "tempo_ms", "por_consulta")
+
+    def __init__(self, rota: str):
+        self.rota = rota
+        self.total = 0
+        self.tempo_ms = 0.0
+        self.por_consulta: dict[str, list] = {}
+
+    def registrar(self, impressao: str, sql: str, ms: float):
+        self.total += 1
+        self.tempo_ms += ms
+        consulta = self.por_consulta.get(impressao)
+        if consulta is None:
+            self.por_consulta[impressao] = [1, ms, sql]
+        else:
+            consulta[0] += 1
+            consulta[1] += ms
+
+    def repetidas(self, minimo: int) -> list[tuple[str, int, float, str]]:
+        return sorted(
+            ((impressao, n, ms, sql) for impressao, (n, ms, sql) in self.por_consulta.items() if n >= minimo),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+
+_requisicao_atual: ContextVar[ComandosRequisicao | None] = ContextVar("diagnostico_sql_requisicao", default=None)
+
+
+class DiagnosticoSQL:
+    """
+    Modo de diagnóstico das consultas do ORM, para desenvolvimento ou para ligar
+    por um tempo em produção.
+
+    - conta os comandos SQL de cada requisição (cabeçalho ``X-SQL-Comandos``);
+    - aponta N+1: a mesma consulta parametrizada executada ``repeticoes`` vezes ou mais
+      na mesma requisição, o sintoma de um relacionamento ``lazy`` percorrido em uma lista;
+    - registra no log os comandos acima de ``lenta_ms`` com o ``EXPLAIN`` (sem ``ANALYZE``,
+      a consulta não é executada de novo), no máximo uma vez por consulta a cada
+      ``DIAGNOSTICO_SQL_EXPLAIN_INTERVALO`` segundos.
+
+    A contagem por requisição usa um ``ContextVar``, que acompanha tanto as rotas ``async``
+    (inclusive dentro de ``run_sync``) quanto as síncronas executadas no threadpool.
+    Comandos fora de uma requisição (buffer, consumer) só entram na verificação de lentidão.
+
+    Desligado (``DIAGNOSTICO_SQL_HABILITADO=false``), nada é instalado.
+    """
+
+    def __init__(
+        self,
+        habilitado: bool = DIAGNOSTICO_SQL_HABILITADO,
+        lenta_ms: float = DIAGNOSTICO_SQL_LENTA_MS,
+        repeticoes: int = DIAGNOSTICO_SQL_REPETICOES,
+        max_comandos: int = DIAGNOSTICO_SQL_MAX_COMANDOS,
+        explain: bool = DIAGNOSTICO_SQL_EXPLAIN,
+    ):
+        self.habilitado = habilitado
+        self.lenta_ms = lenta_ms
+        self.repeticoes = repeticoes
+        self.max_comandos = max_comandos
+        self.explain = explain
+        self._lock = threading.Lock()
+        self._explicadas: dict[str, float] = {}
+        self.requisicoes = 0
+        self.requisicoes_n_mais_1 = 0
+        self.lentas = 0
+        self.n_mais_1: dict[tuple[str, str], dict] = {}
+
+    def iniciar_requisicao(self, rota: str):
+        return _requisicao_atual.set(ComandosRequisicao(rota))
+
+    def encerrar_requisicao(self, token, rota: str) -> ComandosRequisicao:
+        """
+        Avalia os comandos da requisição que terminou e registra N+1 e excessos no log.
+        """
+        comandos = _requisicao_atual.get()
+        _requisicao_atual.reset(token)
+        comandos.rota = rota
+        repetidas = comandos.repetidas(self.repeticoes)
+        with self._lock:
+            self.requisicoes += 1
+            if repetidas:
+                self.requisicoes_n_mais_1 += 1
+            for impressao, n, _, sql in repetidas:
+                registro = self.n_mais_1.setdefault((rota, impressao), {"ocorrencias": 0, "max_repeticoes": 0, "sql": sql})
+                registro["ocorrencias"] += 1
+                registro["max_repeticoes"] = max(registro["max_repeticoes"], n)
+        for impressao, n, ms, sql in repetidas:
+            print(f"Possível N+1 em {rota}: consulta {impressao} executada {n} vezes ({ms:.1f} ms): {sql[:300]}")
+        if comandos.total > self.max_comandos and not repetidas:
+            print(f"{rota} executou {comandos.total} comandos SQL ({comandos.tempo_ms:.1f} ms)")
+        return comandos
+
+    def _registrar(self, conn, cursor, statement, parameters, executemany, ms: float):
+        comandos = _requisicao_atual.get()
+        if comandos is not None:
+            impressao, normalizada = impressao_consulta(statement)
+            comandos.registrar(impressao, normalizada, ms)
+        if ms < self.lenta_ms:
+            return
+        with self._lock:
+            self.lentas += 1
+        rota = comandos.rota if comandos is not None else "fora de requisição"
+        print(f"Consulta lenta ({ms:.0f} ms) em {rota}: {' '.join(statement.split())[:500]}")
+        if self.explain and not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            self._explicar(conn, statement, parameters)
+
+    def _explicar(self, conn, statement, parameters):
+        impressao, _ = impressao_consulta(statement)
+        agora = time.monotonic()
+        with self._lock:
+            ultima = self._explicadas.get(impressao)
+            if ultima is not None and agora - ultima < DIAGNOSTICO_SQL_EXPLAIN_INTERVALO:
+                return
+            self._explicadas[impressao] = agora
+        sqlite = conn.dialect.name == "sqlite"
+        prefixo = "EXPLAIN QUERY PLAN " if sqlite else "EXPLAIN "
+        # Cursor do driver (não dispara os eventos de novo); o comando já está no formato
+        # de parâmetros dele. O savepoint impede que um EXPLAIN com erro aborte a transação
+        # da requisição no PostgreSQL.
+        cursor = conn.connection.cursor()
+        try:
+            if not sqlite:
+                cursor.execute("SAVEPOINT diagnostico_explain")
+            try:
+                cursor.execute(prefixo + statement, parameters)
+                plano = "\n".join("  " + " | ".join(str(coluna) for coluna in linha) for linha in cursor.fetchall())
+            except Exception:
+                if not sqlite:
+                    cursor.execute("ROLLBACK TO SAVEPOINT diagnostico_explain")
+                raise
+            if not sqlite:
+                cursor.execute("RELEASE SAVEPOINT diagnostico_explain")
+            print(f"Plano da consulta {impressao}:\n{plano}")
+        except Exception as e:
+            print(f"Erro ao obter o plano da consulta {impressao}: {repr(e)}")
+        finally:
+            cursor.close()
+
+    def ligar_engine(self, engine):
+        """
+        Instala os eventos do diagnóstico no ``engine`` (para o assíncrono, ``async_engine.sync_engine``).
+        """
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _antes(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("diagnostico_inicio", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _depois(conn, cursor, statement, parameters, context, executemany):
+            inicio = conn.info["diagnostico_inicio"].pop()
+            self._registrar(conn, cursor, statement, parameters, executemany, (time.perf_counter() - inicio) * 1000)
+
+        @event.listens_for(engine, "handle_error")
+        def _erro(contexto):
+            pilha = contexto.connection.info.get("diagnostico_inicio") if contexto.connection is not None else None
+            if pilha:
+                pilha.pop()
+
+    def metricas(self) -> dict:
+        with self._lock:
+            return {
+                "habilitado": self.habilitado,
+                "requisicoes": self.requisicoes,
+                "requisicoes_n_mais_1": self.requisicoes_n_mais_1,
+                "lentas": self.lentas,
+                "n_mais_1": [
+                    dict(registro, rota=rota, consulta=impressao)
+                    for (rota, impressao), registro in sorted(
+                        self.n_mais_1.items(), key=lambda item: item[1]["ocorrencias"], reverse=True
+                    )
+                ],
+            }
+
+
+diagnostico_sql = DiagnosticoSQL()
+
+
+class DiagnosticoSQLMiddleware:
+    """
+    Middleware ASGI que abre a contagem de comandos SQL de cada requisição e a avalia no final.
+    """
+
+    def __init__(self, app, diagnostico: DiagnosticoSQL = diagnostico_sql):
+        self.app = app
+        self.diagnostico = diagnostico
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = self.diagnostico.iniciar_requisicao(scope["path"])
+        comandos = _requisicao_atual.get()
+
+        async def send_contado(mensagem):
+            if mensagem["type"] == "http.response.start":
+                # Os comandos executados enquanto o corpo é transmitido (streaming) não entram no cabeçalho
+                mensagem["headers"] = list(mensagem.get("headers", [])) + [
+                    (b"x-sql-comandos", str(comandos.total).encode())
+                ]
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, send_contado)
+        finally:
+            rota = getattr(scope.get("route"), "path", None) or scope["path"]
+            self.diagnostico.encerrar_requisicao(token, f"{scope['method']} {rota}")
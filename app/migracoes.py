@@ -0,0 +1,25 @@
+import os
+
+from alembic import command
+from alembic.config import Config
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def configuracao_alembic() -> Config:
+    config = Config(os.path.join(RAIZ, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(RAIZ, "migrations"))
+    # Mantém a configuração de logging do uvicorn quando rodado pela aplicação
+    config.attributes["configurar_logging"] = False
+    return config
+
+
+def executar_migracoes(revisao: str = "head"):
+    """
+    Aplica as migrações pendentes do diretório ``migrations`` (Alembic).
+
+    Substitui o ``Base.metadata.create_all``: cada alteração de esquema é uma
+    revisão numerada e bancos existentes recebem apenas o que falta.
+    No PostgreSQL um advisory lock impede que workers migrem ao mesmo tempo.
+    """
+    command.upgrade(configuracao_alembic(), revisao)
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, TIMESTAMP, DECIMAL
+from sqlalchemy import Boolean, Column, Date, Index, Integer, SmallInteger, String, Text, ForeignKey, TIMESTAMP, DECIMAL
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from .database import Base
 
 class User(Base):
@@ -10,6 +11,8 @@ class User(Base):
     email = Column(String(70))
     # score_cliente = Column(DECIMAL(5,2))
     username = Column(String(255))
+    # Hash bcrypt da senha; ver app/services/senhas.py
+    hashed_password = Column(String(255))
 
     acoes = relationship("Acao", back_populates="user")
 
@@ -53,6 +56,27 @@ class Acao(Base):
     user = relationship("User", back_populates="acoes")
     analises = relationship("AnaliseSentimento", back_populates="acao")
 
+    # Índices criados pela migração 0002
+    __table_args__ = (
+        Index("ix_cs_acoes_agent_id_data_acao", "agent_id", "data_acao"),
+        Index("ix_cs_acoes_user_id_data_acao", "user_id", "data_acao"),
+        Index("ix_cs_acoes_event_id", "event_id"),
+        Index("ix_cs_acoes_data_acao", "data_acao"),
+    )
+
+
+class Sentimento(Base):
+    """
+    Dicionário dos rótulos de sentimento. As análises guardam só o código inteiro;
+    ``negativo`` marca os rótulos considerados em ``/sentimento/mais-negativo``.
+    """
+    __tablename__ = "cs_sentimento"
+
+    # No SQLite só INTEGER PRIMARY KEY é autoincremento
+    sentimento_id = Column(SmallInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    nome = Column(String(50), nullable=False, unique=True)
+    negativo = Column(Boolean, nullable=False, default=False, server_default="false")
+
 
 class AnaliseSentimento(Base):
     __tablename__ = "cs_analise_sentimento"
@@ -61,10 +85,66 @@ class AnaliseSentimento(Base):
     acao_id = Column(Integer, ForeignKey("cs_acoes.acao_id"), nullable=False)
     user_id = Column(Integer, ForeignKey("cs_user.user_id"))
     agent_id = Column(Integer, ForeignKey("cs_agents.agent_id"))
-    sentimento = Column(String(50), nullable=False)
+    # Código do rótulo em cs_sentimento (migração 0006)
+    sentimento_id = Column(SmallInteger, ForeignKey("cs_sentimento.sentimento_id"), nullable=False)
     score = Column(DECIMAL(5,2))
-    data_analise = Column(TIMESTAMP)
+    # No PostgreSQL a tabela é particionada por mês de data_analise (migração 0003)
+    # e a chave primária real é (analise_id, data_analise).
+    data_analise = Column(TIMESTAMP, nullable=False, server_default=func.now())
 
     acao = relationship("Acao", back_populates="analises")
 
-
+    # Rótulo em texto, fora do mapeamento: ``salvar_analise`` o converte em ``sentimento_id``
+    sentimento = None
+
+    # Índices criados pelas migrações 0002, 0006 e 0007
+    __table_args__ = (
+        Index("ix_cs_analise_sentimento_acao_id", "acao_id"),
+        Index("ix_cs_analise_sentimento_score", "score"),
+        Index("ix_cs_analise_sentimento_data_analise", "data_analise"),
+        Index("ix_cs_analise_sentimento_sentimento_id", "sentimento_id"),
+        Index("ix_cs_analise_sentimento_agent_id", "agent_id"),
+    )
+
+
+
+
+class EstatisticaSentimento(Base):
+    """
+    Contagens pré-agregadas de ``cs_analise_sentimento`` por dia, sentimento, técnico e cliente.
+
+    Usada pelos perfis e pela tendência, que filtram por técnico, cliente ou período; com
+    poucas análises por combinação ela tem quase uma linha por análise, então as
+    contagens gerais leem ``TotalSentimento``.
+    Mantida incrementalmente por ``salvar_analise``/``salvar_analises_lote``.
+    ``agent_id``/``user_id`` ausentes são gravados como 0 e ``data_analise``
+    ausente como 1970-01-01, para que a chave primária não tenha nulos.
+    """
+    __tablename__ = "cs_estatistica_sentimento"
+
+    dia = Column(Date, primary_key=True)
+    sentimento_id = Column(SmallInteger, primary_key=True)
+    agent_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, primary_key=True)
+    quantidade = Column(Integer, nullable=False, default=0)
+    quantidade_score = Column(Integer, nullable=False, default=0)
+    soma_score = Column(DECIMAL(14,2), nullable=False, default=0)
+    score_min = Column(DECIMAL(5,2))
+    score_max = Column(DECIMAL(5,2))
+
+
+class TotalSentimento(Base):
+    """
+    Totais de ``cs_analise_sentimento`` por sentimento (uma linha por rótulo), para as
+    contagens que não filtram por técnico, cliente ou período (migração 0008).
+
+    Mantida na mesma transação que ``EstatisticaSentimento``.
+    """
+    __tablename__ = "cs_total_sentimento"
+
+    sentimento_id = Column(SmallInteger, primary_key=True)
+    quantidade = Column(Integer, nullable=False, default=0)
+    quantidade_score = Column(Integer, nullable=False, default=0)
+    soma_score = Column(DECIMAL(18,2), nullable=False, default=0)
+    score_min = Column(DECIMAL(5,2))
+    score_max = Column(DECIMAL(5,2))
@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+import time
+
+import pika
+from dotenv import load_dotenv
+from pika.exceptions import AMQPChannelError, AMQPConnectionError
+
+from .producer import RABBITMQ_EXCHANGE, parametros_conexao
+from ..services.buffer_analises import BufferAnalises, obter_buffer
+
+load_dotenv()
+
+RABBITMQ_CONSUMER_HABILITADO = os.getenv("RABBITMQ_CONSUMER_HABILITADO", "false").lower() == "true"
+RABBITMQ_RESULTADOS_QUEUE = os.getenv("RABBITMQ_RESULTADOS_QUEUE", "resultados_analise")
+RABBITMQ_RESULTADOS_ROUTING_KEY = os.getenv("RABBITMQ_RESULTADOS_ROUTING_KEY", "resultados_analise")
+RABBITMQ_PREFETCH = int(os.getenv("RABBITMQ_PREFETCH", "500"))
+
+
+class RabbitMQResultConsumer:
+    """
+    Consome os resultados da análise direto da fila do RabbitMQ, sem passar por
+    ``POST /sentimento/recebido``.
+
+    Cada mensagem é validada por ``preparar_analise`` e entregue ao
+    ``BufferAnalises``, que grava em lote. O ``ack`` só é enviado depois que o
+    buffer confirma o commit da linha; como o ``BlockingConnection`` do pika não é
+    thread-safe, a confirmação é agendada na thread do consumer com
+    ``add_callback_threadsafe``. O ``prefetch`` limita quantas mensagens ficam em
+    voo e deve ser pelo menos o tamanho do lote do buffer para que ele encha.
+
+    Mensagens inválidas são rejeitadas sem reenfileirar. Falhas de gravação
+    são reenfileiradas uma vez; na segunda entrega a mensagem é descartada
+    (ou vai para a dead-letter exchange, se a fila tiver uma).
+
+    Args:
+        buffer (BufferAnalises): Buffer de escrita; o compartilhado da aplicação por padrão.
+        queue (str): Fila de onde os resultados são lidos.
+        prefetch (int): Quantidade máxima de mensagens sem ``ack``.
+        connection_factory (callable): Função que recebe ``pika.ConnectionParameters``
+            e devolve uma conexão. Permite usar um broker substituto em testes.
+    """
+
+    def __init__(
+        self,
+        buffer: BufferAnalises | None = None,
+        queue: str = RABBITMQ_RESULTADOS_QUEUE,
+        exchange: str = RABBITMQ_EXCHANGE,
+        routing_key: str = RABBITMQ_RESULTADOS_ROUTING_KEY,
+        prefetch: int = RABBITMQ_PREFETCH,
+        connection_factory=pika.BlockingConnection,
+        parametros: pika.ConnectionParameters | None = None,
+    ):
+        self.queue = queue
+        self.exchange = exchange
+        self.routing_key = routing_key
+        self.prefetch = prefetch
+        self._buffer = buffer
+        self._connection_factory = connection_factory
+        self._parametros = parametros or parametros_conexao()
+        self._connection = None
+        self._channel = None
+        self._consumer_tag = None
+        self._em_voo = 0
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._metricas = {"recebidas": 0, "confirmadas": 0, "rejeitadas": 0, "reenfileiradas": 0}
+
+    @property
+    def buffer(self) -> BufferAnalises:
+        return self._buffer or obter_buffer()
+
+    def iniciar(self):
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="rabbitmq-consumer", daemon=True)
+        self._thread.start()
+
+    def _conectar(self):
+        self._connection = self._connection_factory(self._parametros)
+        self._channel = self._connection.channel()
+        self._channel.exchange_declare(exchange=self.exchange, exchange_type="direct", durable=True)
+        self._channel.queue_declare(queue=self.queue, durable=True)
+        self._channel.queue_bind(queue=self.queue, exchange=self.exchange, routing_key=self.routing_key)
+        self._channel.basic_qos(prefetch_count=self.prefetch)
+        self._consumer_tag = self._channel.basic_consume(queue=self.queue, on_message_callback=self._ao_receber)
+
+    def _executar(self):
+        tentativas = 0
+        while not self._parar.is_set():
+            try:
+                self._conectar()
+                tentativas = 0
+                while not self._parar.is_set():
+                    self._connection.process_data_events(time_limit=1)
+                self._drenar()
+            except (AMQPConnectionError, AMQPChannelError, ConnectionError, OSError) as e:
+                tentativas += 1
+                # Mensagens sem ack voltam para a fila quando a conexão cai.
+                print(f"Consumer do RabbitMQ desconectado (tentativa {tentativas}): {repr(e)}")
+                self._parar.wait(min(0.5 * 2 ** (tentativas - 1), 30.0))
+            finally:
+                self._fechar_conexao()
+
+    def _ao_receber(self, channel, method, properties, body):
+        with self._lock:
+            self._metricas["recebidas"] += 1
+        try:
+            future = self.buffer.adicionar(json.loads(body))
+        except (ValueError, TypeError) as e:
+            print(f"Resultado inválido descartado: {repr(e)}")
+            channel.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            with self._lock:
+                self._metricas["rejeitadas"] += 1
+            return
+        except Exception as e:
+            # Buffer encerrado durante o desligamento ou falha inesperada: a mensagem
+            # volta para a fila e a thread do consumer continua viva
+            print(f"Erro ao receber resultado da análise, mensagem reenfileirada: {repr(e)}")
+            channel.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+            with self._lock:
+                self._metricas["reenfileiradas"] += 1
+            return
+
+        with self._lock:
+            self._em_voo += 1
+        connection = self._connection
+        future.add_done_callback(lambda f: self._agendar_confirmacao(connection, channel, method, f))
+
+    def _agendar_confirmacao(self, connection, channel, method, future):
+        # Executado na thread do buffer; o ack precisa acontecer na thread da conexão.
+        with self._lock:
+            self._em_voo -= 1
+        try:
+            connection.add_callback_threadsafe(lambda: self._confirmar(channel, method, future))
+        except Exception:
+            # Conexão já fechada: o broker reentrega a mensagem.
+            pass
+
+    def _confirmar(self, channel, method, future):
+        if not channel.is_open:
+            return
+        erro = future.exception()
+        if erro is None:
+            channel.basic_ack(delivery_tag=method.delivery_tag)
+            chave = "confirmadas"
+        elif isinstance(erro, ValueError) or method.redelivered:
+            print(f"Resultado da análise descartado: {repr(erro)}")
+            channel.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            chave = "rejeitadas"
+        else:
+            channel.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+            chave = "reenfileiradas"
+        with self._lock:
+            self._metricas[chave] += 1
+
+    def _drenar(self, timeout: float = 10.0):
+        """
+        Para de receber mensagens e espera o buffer confirmar as que estão em voo.
+        """
+        self._channel.basic_cancel(self._consumer_tag)
+        limite = time.monotonic() + timeout
+        while time.monotonic() < limite:
+            with self._lock:
+                if self._em_voo <= 0:
+                    break
+            self._connection.process_data_events(time_limit=0.1)
+        # Envia os acks agendados pelas últimas gravações
+        self._connection.process_data_events(time_limit=0)
+
+    def _fechar_conexao(self):
+        try:
+            if self._connection is not None and self._connection.is_open:
+                self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
+        self._channel = None
+
+    def metricas(self) -> dict:
+        with self._lock:
+            return dict(self._metricas, em_voo=self._em_voo)
+
+    def fechar(self, timeout: float | None = 15.0):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_consumer: RabbitMQResultConsumer | None = None
+_consumer_lock = threading.Lock()
+
+
+def obter_consumer() -> RabbitMQResultConsumer | None:
+    return _consumer
+
+
+def iniciar_consumer():
+    """
+    Inicia o consumer de resultados se ``RABBITMQ_CONSUMER_HABILITADO`` estiver ligado.
+    A conexão é refeita em segundo plano enquanto o broker estiver indisponível.
+    """
+    global _consumer
+    if not RABBITMQ_CONSUMER_HABILITADO:
+        return
+    with _consumer_lock:
+        if _consumer is None:
+            _consumer = RabbitMQResultConsumer()
+            _consumer.iniciar()
+
+
+def encerrar_consumer():
+    global _consumer
+    with _consumer_lock:
+        if _consumer is not None:
+            _consumer.fechar()
+            _consumer = None
@@ -1,14 +1,55 @@
-import pika 
-import json 
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pika
+from dotenv import load_dotenv
+from pika.exceptions import AMQPChannelError, AMQPConnectionError, NackError, UnroutableError
+
+from ..telemetria import telemetria
+
+load_dotenv()
+
+RABBITMQ_HOST = os.getenv("RABBITMQ_HOST", "localhost")
+RABBITMQ_PORT = int(os.getenv("RABBITMQ_PORT", "5672"))
+RABBITMQ_USER = os.getenv("RABBITMQ_USER", "guest")
+RABBITMQ_PASSWORD = os.getenv("RABBITMQ_PASSWORD", "guest")
+RABBITMQ_EXCHANGE = os.getenv("RABBITMQ_EXCHANGE", "datas_exchanges")
+RABBITMQ_ROUTING_KEY = os.getenv("RABBITMQ_ROUTING_KEY", "minha_routing_key")
+RABBITMQ_HEARTBEAT = int(os.getenv("RABBITMQ_HEARTBEAT", "60"))
+RABBITMQ_POOL_SIZE = int(os.getenv("RABBITMQ_POOL_SIZE", "4"))
+RABBITMQ_POOL_TIMEOUT = float(os.getenv("RABBITMQ_POOL_TIMEOUT", "5"))
+RABBITMQ_MAX_TENTATIVAS = int(os.getenv("RABBITMQ_MAX_TENTATIVAS", "3"))
+RABBITMQ_CHUNK_SIZE = int(os.getenv("RABBITMQ_CHUNK_SIZE", "100"))
+
+
+def parametros_conexao() -> pika.ConnectionParameters:
+    """
+    Monta os parâmetros de conexão com o RabbitMQ a partir das variáveis de ambiente.
+    """
+    return pika.ConnectionParameters(
+        host=RABBITMQ_HOST,
+        port=RABBITMQ_PORT,
+        heartbeat=RABBITMQ_HEARTBEAT,
+        credentials=pika.PlainCredentials(
+            username=RABBITMQ_USER,
+            password=RABBITMQ_PASSWORD
+        )
+    )
+
 
 class RabbitMQProducer:
     def __init__(self):
-        self.__host="localhost"
-        self.__port=5672
-        self.__username="guest"
-        self.__password="guest"
-        self.__routingKey="minha_routing_key"
-        self.__exchange="datas_exchanges"
+        self.__host=RABBITMQ_HOST
+        self.__port=RABBITMQ_PORT
+        self.__username=RABBITMQ_USER
+        self.__password=RABBITMQ_PASSWORD
+        self.__routingKey=RABBITMQ_ROUTING_KEY
+        self.__exchange=RABBITMQ_EXCHANGE
         self.__channel=self.__create_channel()
 
     def __create_channel(self):
@@ -30,12 +71,12 @@ class RabbitMQProducer:
         )
 
         return channel
-    
+
     def send_menssage(self, body):
         self.__channel.basic_publish(
             exchange=self.__exchange,
             routing_key=self.__routingKey,
-            body=json.dumps(body), 
+            body=json.dumps(body),
             properties=pika.BasicProperties(
                 delivery_mode=2
             )
@@ -46,3 +87,282 @@ class RabbitMQProducer:
             self.__channel.close()
         if self.__channel.connection:
             self.__channel.connection.close()
+
+
+class _CanalPool:
+    """
+    Par conexão/canal mantido pelo pool. O ``BlockingConnection`` do pika não é
+    thread-safe, então cada canal usa a sua própria conexão e só é emprestado
+    para uma thread por vez.
+    """
+
+    def __init__(self, connection, channel):
+        self.connection = connection
+        self.channel = channel
+
+    @property
+    def aberto(self) -> bool:
+        return self.connection.is_open and self.channel.is_open
+
+    def fechar(self):
+        try:
+            if self.channel.is_open:
+                self.channel.close()
+        except Exception:
+            pass
+        try:
+            if self.connection.is_open:
+                self.connection.close()
+        except Exception:
+            pass
+
+
+class RabbitMQPublisher:
+    """
+    Publicador de longa duração ligado ao ciclo de vida da aplicação.
+
+    Mantém um pool de canais com confirmação de publicação (publisher confirms),
+    reabre conexões perdidas automaticamente e oferece ``publicar_async`` para
+    que rotas ``async`` não bloqueiem o event loop.
+
+    Args:
+        tamanho_pool (int): Quantidade máxima de canais abertos ao mesmo tempo.
+        connection_factory (callable): Função que recebe ``pika.ConnectionParameters``
+            e devolve uma conexão. Permite usar um broker substituto em testes.
+    """
+
+    def __init__(
+        self,
+        tamanho_pool: int = RABBITMQ_POOL_SIZE,
+        exchange: str = RABBITMQ_EXCHANGE,
+        routing_key: str = RABBITMQ_ROUTING_KEY,
+        connection_factory=pika.BlockingConnection,
+        parametros: pika.ConnectionParameters | None = None,
+        timeout_pool: float = RABBITMQ_POOL_TIMEOUT,
+        max_tentativas: int = RABBITMQ_MAX_TENTATIVAS,
+    ):
+        self.tamanho_pool = tamanho_pool
+        self.exchange = exchange
+        self.routing_key = routing_key
+        self.timeout_pool = timeout_pool
+        self.max_tentativas = max_tentativas
+        self._connection_factory = connection_factory
+        self._parametros = parametros or parametros_conexao()
+        self._livres: queue.LifoQueue[_CanalPool] = queue.LifoQueue()
+        self._criados = 0
+        self._lock = threading.Lock()
+        self._fechado = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=tamanho_pool, thread_name_prefix="rabbitmq-publisher"
+        )
+
+    def _abrir_canal(self) -> _CanalPool:
+        connection = self._connection_factory(self._parametros)
+        channel = connection.channel()
+        channel.confirm_delivery()
+        channel.exchange_declare(
+            exchange=self.exchange,
+            exchange_type="direct",
+            durable=True
+        )
+        return _CanalPool(connection, channel)
+
+    def _emprestar(self) -> _CanalPool:
+        if self._fechado:
+            raise RuntimeError("Publisher do RabbitMQ já foi encerrado")
+
+        while True:
+            try:
+                canal = self._livres.get_nowait()
+            except queue.Empty:
+                break
+            if self._canal_saudavel(canal):
+                return canal
+            self._descartar(canal)
+
+        with self._lock:
+            pode_criar = self._criados < self.tamanho_pool
+            if pode_criar:
+                self._criados += 1
+        if pode_criar:
+            try:
+                return self._abrir_canal()
+            except Exception:
+                with self._lock:
+                    self._criados -= 1
+                raise
+
+        try:
+            canal = self._livres.get(timeout=self.timeout_pool)
+        except queue.Empty:
+            raise TimeoutError("Nenhum canal do RabbitMQ disponível no pool")
+        if self._canal_saudavel(canal):
+            return canal
+        self._descartar(canal)
+        return self._emprestar()
+
+    def _canal_saudavel(self, canal: _CanalPool) -> bool:
+        if not canal.aberto:
+            return False
+        try:
+            # Processa heartbeats pendentes de canais que ficaram ociosos no pool.
+            canal.connection.process_data_events(time_limit=0)
+        except Exception:
+            return False
+        return canal.aberto
+
+    def _devolver(self, canal: _CanalPool):
+        if self._fechado or not canal.aberto:
+            self._descartar(canal)
+        else:
+            self._livres.put(canal)
+
+    def _descartar(self, canal: _CanalPool):
+        canal.fechar()
+        with self._lock:
+            self._criados -= 1
+
+    def _basic_publish(self, canal: _CanalPool, body):
+        inicio = time.perf_counter() if telemetria.habilitada else None
+        resultado = "erro"
+        try:
+            canal.channel.basic_publish(
+                exchange=self.exchange,
+                routing_key=self.routing_key,
+                body=json.dumps(body),
+                properties=pika.BasicProperties(
+                    delivery_mode=2
+                )
+            )
+            resultado = "ok"
+        finally:
+            if inicio is not None:
+                telemetria.observar_publicacao(resultado, time.perf_counter() - inicio)
+
+    def publicar(self, body):
+        """
+        Publica uma mensagem e aguarda a confirmação do broker.
+
+        Conexões perdidas são descartadas e a publicação é repetida em um canal
+        novo até ``max_tentativas`` vezes.
+
+        Args:
+            body: Conteúdo serializável em JSON.
+        """
+        erro = self.publicar_lote([body])[0]
+        if erro is not None:
+            raise erro
+
+    def publicar_lote(self, bodies: list) -> list:
+        """
+        Publica várias mensagens usando um único canal do pool.
+
+        Cada mensagem é confirmada pelo broker individualmente; se a conexão cair
+        no meio do lote, o canal é trocado e o envio continua a partir da
+        mensagem que falhou. Se as ``max_tentativas`` de uma mensagem se esgotarem,
+        ela e as demais do lote são dadas como falhas sem novas tentativas.
+
+        Args:
+            bodies (list): Conteúdos serializáveis em JSON.
+
+        Returns:
+            list: Para cada mensagem, ``None`` se foi confirmada ou a exceção que impediu o envio.
+        """
+        resultados = [None] * len(bodies)
+        canal = None
+        i = 0
+        tentativas = 0
+        while i < len(bodies):
+            try:
+                if canal is None:
+                    canal = self._emprestar()
+                self._basic_publish(canal, bodies[i])
+                i += 1
+                tentativas = 0
+            except (NackError, UnroutableError) as e:
+                resultados[i] = e
+                i += 1
+                tentativas = 0
+            except (AMQPConnectionError, AMQPChannelError, ConnectionError, OSError) as e:
+                if canal is not None:
+                    self._descartar(canal)
+                    canal = None
+                tentativas += 1
+                print(f"Falha ao publicar no RabbitMQ (tentativa {tentativas}): {repr(e)}")
+                if tentativas >= self.max_tentativas:
+                    # Broker fora do ar: repetir as tentativas para cada item restante
+                    # prenderia a requisição por minutos
+                    erro = ConnectionError(f"Não foi possível publicar no RabbitMQ: {repr(e)}")
+                    resultados[i:] = [erro] * (len(bodies) - i)
+                    break
+                else:
+                    time.sleep(min(0.1 * 2 ** (tentativas - 1), 1.0))
+        if canal is not None:
+            self._devolver(canal)
+        return resultados
+
+    async def publicar_async(self, body):
+        """
+        Versão não bloqueante de ``publicar`` para uso em rotas ``async``.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.publicar, body)
+
+    async def publicar_lote_async(self, bodies: list) -> list:
+        """
+        Versão não bloqueante de ``publicar_lote``.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.publicar_lote, bodies)
+
+    def aquecer(self):
+        """
+        Abre um canal antecipadamente para que a primeira requisição não pague o handshake.
+        """
+        self._devolver(self._emprestar())
+
+    def fechar(self):
+        self._fechado = True
+        self._executor.shutdown(wait=True)
+        while True:
+            try:
+                canal = self._livres.get_nowait()
+            except queue.Empty:
+                break
+            self._descartar(canal)
+
+
+_publisher: RabbitMQPublisher | None = None
+_publisher_lock = threading.Lock()
+
+
+def obter_publisher() -> RabbitMQPublisher:
+    """
+    Retorna o publisher compartilhado da aplicação, criando-o se necessário.
+    """
+    global _publisher
+    if _publisher is None:
+        with _publisher_lock:
+            if _publisher is None:
+                _publisher = RabbitMQPublisher()
+    return _publisher
+
+
+def iniciar_publisher():
+    """
+    Cria o publisher compartilhado e tenta abrir o primeiro canal.
+    Se o broker estiver indisponível a aplicação sobe mesmo assim e a conexão
+    é refeita na primeira publicação.
+    """
+    try:
+        obter_publisher().aquecer()
+    except Exception as e:
+        print(f"RabbitMQ indisponível na inicialização: {repr(e)}")
+
+
+def encerrar_publisher():
+    global _publisher
+    with _publisher_lock:
+        if _publisher is not None:
+            _publisher.fechar()
+            _publisher = None
@@ -0,0 +1,45 @@
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+
+from .telemetria import telemetria
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson está no requirements.txt
+    orjson = None
+    import json
+    from datetime import date, datetime
+
+
+def _padrao(valor):
+    # DECIMAL(5,2) do score sai como número, igual ao jsonable_encoder
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if orjson is None and isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo não serializável em JSON: {type(valor).__name__}")
+
+
+def codificar_json(conteudo) -> bytes:
+    """
+    Serializa ``conteudo`` (dicts, listas, datas e ``Decimal``) com orjson.
+    Sem orjson instalado, usa o ``json`` da biblioteca padrão.
+    """
+    if orjson is not None:
+        return orjson.dumps(conteudo, default=_padrao)
+    return json.dumps(conteudo, default=_padrao, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class RespostaJSONRapida(JSONResponse):
+    """
+    Resposta JSON codificada com ``codificar_json``.
+
+    As rotas devem devolver a instância diretamente (``return RespostaJSONRapida(dados)``)
+    para que o FastAPI não passe o conteúdo pelo ``jsonable_encoder``, que percorre cada
+    objeto por reflexão. O conteúdo deve ser formado por dicts/listas de valores simples.
+    """
+
+    def render(self, content) -> bytes:
+        with telemetria.medir("json"):
+            return codificar_json(content)
@@ -1,12 +1,15 @@
 # app/routers/auth.py
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 import os
-from .. import models, database
-from sqlalchemy.orm import Session
+import time
+from .. import models, database, schemas
+from ..services.principais import cache_principais
+from ..services.senhas import SenhasOcupadas, pool_senhas
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(tags=["authentication"])
 
@@ -16,7 +19,6 @@ if SECRET_KEY is None:
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def criar_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
@@ -24,11 +26,21 @@ def criar_access_token(data: dict, expires_delta: timedelta | None = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    # iat com fração de segundo: um token emitido logo depois de ``revogar_usuario``
+    # não pode cair no mesmo segundo da revogação e ser recusado
+    to_encode.update({"exp": expire, "iat": time.time()})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def obter_usuario_atual(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
+async def obter_usuario_atual(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(database.get_async_db)):
+    """
+    Retorna o usuário do token. Tokens já verificados vêm do ``cache_principais``,
+    sem decodificar o JWT nem consultar o banco.
+    """
+    usuario = cache_principais.obter(token)
+    if usuario is not None:
+        return usuario
+
     credentials_exception = HTTPException(
         status_code=401,
         detail="Não foi possível validar as credenciais",
@@ -37,32 +49,99 @@ async def obter_usuario_atual(token: str = Depends(oauth2_scheme), db: Session =
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: int = payload.get("sub") # Assumindo que o ID do usuário está no 'sub'
-        if user_id is None:
+        if user_id is None or cache_principais.revogado(token, payload):
             raise credentials_exception
-        user = db.query(models.User).filter(models.User.user_id == user_id).first()
+        resultado = await db.execute(select(models.User).filter(models.User.user_id == user_id))
+        user = resultado.scalars().first()
         if user is None:
             raise credentials_exception
+        # Desanexa da sessão para que o objeto possa ser reaproveitado por outras requisições
+        db.expunge(user)
+        cache_principais.gravar(token, payload, user)
         return user
     except JWTError:
         raise credentials_exception
 
 # (Dentro da sua função de login no auth.py)
 @router.post("/token")
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(database.get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(database.get_async_db)):
     try: 
-        user = db.query(models.User).filter(models.User.username == form_data.username).first()
+        resultado = await db.execute(select(models.User).filter(models.User.username == form_data.username))
+        user = resultado.scalars().first()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro inesperado: {str(e)}")
     
     if not user:
         raise HTTPException(status_code=400, detail="Usuário incorreto")
-    if not user.verify_password(form_data.password):
+    if not user.hashed_password:
+        raise HTTPException(status_code=400, detail="Senha incorreta")
+    try:
+        # O bcrypt roda no pool de senhas para não travar o event loop
+        correta, novo_hash = await pool_senhas.verificar(form_data.password, user.hashed_password)
+    except SenhasOcupadas as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    if not correta:
         raise HTTPException(status_code=400, detail="Senha incorreta")
+    if novo_hash:
+        # O custo do bcrypt mudou: regrava o hash com o custo atual
+        try:
+            user.hashed_password = novo_hash
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            print(f"Erro ao atualizar o hash da senha: {repr(e)}")
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = criar_access_token(data={"sub": str(user.user_id)}, expires_delta=access_token_expires)
     return {"access_token": access_token, "token_type": "bearer"}
 
+
+@router.post("/logout")
+async def logout(token: str = Depends(oauth2_scheme), usuario: models.User = Depends(obter_usuario_atual)):
+    """
+    Revoga o token atual; as próximas requisições com ele recebem 401.
+    """
+    try:
+        expira_em = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        expira_em = None
+    cache_principais.revogar_token(token, expira_em)
+    return {"message": "Sessão encerrada"}
+
+@router.post("/senha")
+async def trocar_senha(
+    dados: schemas.TrocaSenha,
+    usuario: models.User = Depends(obter_usuario_atual),
+    db: AsyncSession = Depends(database.get_async_db),
+):
+    """
+    Troca a senha do usuário autenticado. A senha atual é conferida e o novo hash
+    é calculado no pool de senhas, fora do event loop.
+
+    Todos os tokens já emitidos para o usuário são revogados; a resposta traz um novo.
+    """
+    # O usuário do cache é compartilhado entre requisições; a alteração é feita em uma cópia da sessão
+    user = await db.get(models.User, usuario.user_id)
+    if user is None or not user.hashed_password:
+        raise HTTPException(status_code=400, detail="Senha incorreta")
+    try:
+        correta, _ = await pool_senhas.verificar(dados.senha_atual, user.hashed_password)
+        if not correta:
+            raise HTTPException(status_code=400, detail="Senha incorreta")
+        user.hashed_password = await pool_senhas.gerar_hash(dados.senha_nova)
+    except SenhasOcupadas as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    try:
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Erro ao alterar a senha: {str(e)}")
+    cache_principais.revogar_usuario(user.user_id)
+    access_token = criar_access_token(
+        data={"sub": str(user.user_id)}, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {"message": "Senha alterada", "access_token": access_token, "token_type": "bearer"}
+
 # A classe User já estava definida no seu código anterior, então a mantive.
 # Certifique-se de que ela esteja corretamente definida no seu models.py
 # e que a tabela "users" corresponda à sua definição.
\ No newline at end of file
@@ -1,10 +1,8 @@
-from passlib.context import CryptContext
 from sqlalchemy import Column, Integer, String
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session
 from ..database import Base, engine, SessionLocal
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from ..services.senhas import pwd_context
 
 class User(Base):
     __tablename__ = "users"
@@ -1,17 +1,35 @@
 from dotenv import load_dotenv
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from .. import models, schemas
-from ..database import get_db
-from ..services import services_sentimentos
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import schemas
+from ..database import get_async_db
+from ..producers.consumer import obter_consumer
+from ..respostas import RespostaJSONRapida
+from ..producers.producer import RABBITMQ_CHUNK_SIZE
+from ..services import exportacao, services_sentimentos, tendencias
+from ..services.buffer_analises import obter_buffer
+from ..services.feed_analises import feed_analises
+from ..services.cache import (
+    TAG_CLIENTE,
+    TAG_CLIENTES_LISTA,
+    TAG_SENTIMENTOS,
+    TAG_TECNICO,
+    TAG_TECNICOS_LISTA,
+    cache_rotas,
+)
+from ..services.versao_dados import etag_confere, gerar_etag, versao_dados
 import httpx
 import datetime
+import json
 from os import getenv
 
 load_dotenv()
 
 ANALISE_URL = getenv("ANALISE_URL")
+# Quantidade máxima de ids nas rotas de perfis em lote
+PERFIS_MAX_IDS = int(getenv("PERFIS_MAX_IDS", "500"))
 
 router = APIRouter(
     prefix="",
@@ -20,12 +38,12 @@ router = APIRouter(
 
 # POST /sentimento
 @router.post("/sentimento/create")
-async def create_sentimento(acao: schemas.Acao, db: Session = Depends(get_db)):
+async def create_sentimento(acao: schemas.Acao):
     """
     Requisita o modelo para analisar o sentimento
     """
     try:
-       services_sentimentos.enviar_mensagem(acao)
+       await services_sentimentos.enviar_mensagem_async(acao)
     except Exception as e:
         print(f"Erro ao processar a requisição: {repr(e)}")
         raise HTTPException(status_code=500, detail=f"Erro inesperado: {str(e)}")
@@ -35,48 +53,241 @@ async def create_sentimento(acao: schemas.Acao, db: Session = Depends(get_db)):
     })
 
 
+async def _ler_itens_lote(request: Request):
+    """
+    Lê o corpo de uma requisição em lote, seja uma lista JSON ou um fluxo NDJSON.
+
+    Gera tuplas ``(indice, item, erro)``; linhas NDJSON inválidas geram ``erro``
+    em vez de interromper o lote inteiro.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith(("application/x-ndjson", "application/jsonl")):
+        indice = 0
+        resto = b""
+        async for pedaco in request.stream():
+            linhas = (resto + pedaco).split(b"\n")
+            resto = linhas.pop()
+            for linha in linhas:
+                if not linha.strip():
+                    continue
+                try:
+                    yield indice, json.loads(linha), None
+                except ValueError:
+                    yield indice, None, "JSON inválido"
+                indice += 1
+        if resto.strip():
+            try:
+                yield indice, json.loads(resto), None
+            except ValueError:
+                yield indice, None, "JSON inválido"
+        return
+
+    try:
+        itens = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Corpo da requisição não é um JSON válido")
+    if not isinstance(itens, list):
+        raise HTTPException(status_code=400, detail="Esperada uma lista de ações")
+    for indice, item in enumerate(itens):
+        yield indice, item, None
+
+
+# POST /sentimento/create/batch
+@router.post("/sentimento/create/batch")
+async def create_sentimento_batch(
+    request: Request,
+    chunk_size: int = Query(RABBITMQ_CHUNK_SIZE, ge=1, le=1000)
+):
+    """
+    Requisita a análise de várias ações em uma única chamada.
+
+    Aceita uma lista JSON de ações ou um fluxo NDJSON (``Content-Type: application/x-ndjson``).
+    Cada ação é validada individualmente e as válidas são publicadas em blocos
+    de ``chunk_size`` mensagens, cada bloco em um único canal do RabbitMQ.
+    """
+    resultados = []
+    pendentes = []
+
+    async def publicar_pendentes():
+        erros = await services_sentimentos.enviar_mensagens_lote([acao for _, acao in pendentes])
+        for (indice, acao), erro in zip(pendentes, erros):
+            if erro is None:
+                resultados.append({"indice": indice, "acao_id": acao.acao_id, "status": "enviado"})
+            else:
+                resultados.append({"indice": indice, "acao_id": acao.acao_id, "status": "erro", "detalhe": str(erro)})
+        pendentes.clear()
+
+    try:
+        async for indice, item, erro in _ler_itens_lote(request):
+            if erro is not None:
+                resultados.append({"indice": indice, "status": "invalido", "detalhe": erro})
+                continue
+            try:
+                acao = schemas.Acao.model_validate(item)
+            except ValidationError as e:
+                resultados.append({
+                    "indice": indice,
+                    "status": "invalido",
+                    "detalhe": e.errors(include_url=False, include_context=False, include_input=False)
+                })
+                continue
+            pendentes.append((indice, acao))
+            if len(pendentes) >= chunk_size:
+                await publicar_pendentes()
+        if pendentes:
+            await publicar_pendentes()
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Erro ao processar o lote: {repr(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro inesperado: {str(e)}")
+
+    resultados.sort(key=lambda r: r["indice"])
+    enviados = sum(1 for r in resultados if r["status"] == "enviado")
+    return JSONResponse(status_code=200, content={
+        "total": len(resultados),
+        "enviados": enviados,
+        "falhas": len(resultados) - enviados,
+        "resultados": resultados
+    })
+
+
 # POST /sentimento/recebido
 @router.post("/sentimento/recebido")
-async def receber_sentimento(dados: dict, db: Session = Depends(get_db)):
+async def receber_sentimento(dados: dict):
     """
     Recebe os dados enviados pelo consumer e salva no banco de dados.
+
+    O resultado passa pelo buffer de escrita e a resposta só é enviada depois do commit.
     """
     try:
-        acao_id = dados.get("acao_id")
-        user_id = dados.get("user_id")
-        agent_id = dados.get("agent_id")
-        descricao = dados.get("sentimento")
-        score = dados.get("score")
-        data = dados.get("data_analise")
-        descricao.capitalize()
-        enviar = {
-            "acao_id": acao_id,
-            "user_id": user_id,
-            "agent_id": agent_id,
-            "sentimento": descricao,
-            "score": score,
-            "data_analise": data
-        }
-        analise = models.AnaliseSentimento(**enviar)
-        services_sentimentos.salvar_analise(db,analise)
-        
-    
+        await obter_buffer().adicionar_async(dados)
+
         return JSONResponse(status_code=201, content={
             "message": "Sentimento recebido"
         })
 
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         print(f"Erro ao processar a requisição: {repr(e)}")
         raise HTTPException(status_code=500, detail=f"Erro inesperado: {str(e)}")
+
+
+# POST /sentimento/recebido/batch
+@router.post("/sentimento/recebido/batch")
+async def receber_sentimento_batch(request: Request):
+    """
+    Recebe vários resultados do consumer em uma única chamada.
+
+    Aceita uma lista JSON ou um fluxo NDJSON. Os resultados são gravados pelo
+    buffer de escrita e a resposta traz o status de cada item já persistido.
+    """
+    resultados = []
+    itens = []
+    try:
+        async for indice, item, erro in _ler_itens_lote(request):
+            if erro is not None:
+                resultados.append({"indice": indice, "status": "invalido", "detalhe": erro})
+            else:
+                itens.append((indice, item))
+
+        erros = await obter_buffer().adicionar_lote_async([item for _, item in itens])
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Erro ao processar o lote: {repr(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro inesperado: {str(e)}")
+
+    for (indice, _), erro in zip(itens, erros):
+        if erro is None:
+            resultados.append({"indice": indice, "status": "salvo"})
+        elif isinstance(erro, ValueError):
+            resultados.append({"indice": indice, "status": "invalido", "detalhe": str(erro)})
+        else:
+            resultados.append({"indice": indice, "status": "erro", "detalhe": str(erro)})
+
+    resultados.sort(key=lambda r: r["indice"])
+    salvos = sum(1 for r in resultados if r["status"] == "salvo")
+    return JSONResponse(status_code=200, content={
+        "total": len(resultados),
+        "salvos": salvos,
+        "falhas": len(resultados) - salvos,
+        "resultados": resultados
+    })
+
+
+# GET /sentimento/recebido/metricas
+@router.get("/sentimento/recebido/metricas")
+def metricas_buffer_analises():
+    """
+    Retorna os contadores e a latência de gravação do buffer de análises
+    e, se estiver ativo, do consumer de resultados do RabbitMQ.
+    """
+    metricas = obter_buffer().metricas()
+    consumer = obter_consumer()
+    if consumer is not None:
+        metricas["consumer"] = consumer.metricas()
+    metricas["feed"] = feed_analises.metricas()
+    return metricas
+
+
+# GET /sentimento/stream
+@router.get("/sentimento/stream")
+async def stream_analises(
+    request: Request,
+    agent_id: int | None = None,
+    sentimento: str | None = None,
+):
+    """
+    Envia as novas análises por server-sent events assim que são gravadas.
+
+    ``agent_id`` e ``sentimento`` filtram os eventos. Cada evento ``analise`` traz
+    a linha gravada em JSON; um evento ``perdidos`` indica que o cliente não
+    acompanhou o ritmo e deve recarregar os dados pelas rotas GET.
+    """
+    if sentimento is not None:
+        sentimento = services_sentimentos.normalizar_sentimento(sentimento)
+    assinante = feed_analises.assinar(agent_id, sentimento)
+    if assinante is None:
+        raise HTTPException(status_code=503, detail="Limite de conexões do feed atingido")
+
+    return StreamingResponse(
+        feed_analises.eventos(assinante, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
     
 # GET /sentimento
 @router.get("/sentimento/all")
-def get_sentimentos(db: Session = Depends(get_db)):
+async def get_sentimentos(
+    limite: int | None = Query(None, ge=1, le=10000),
+    apos: int | None = Query(None, ge=0),
+    formato: str = Query("json", pattern="^(json|ndjson)$"),
+    incluir_acao: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Recupera todos os sentimentos.
+
+    - ``formato=ndjson``: transmite a tabela inteira (a partir de ``apos``) em NDJSON,
+      lendo de um cursor do lado do servidor.
+    - ``limite``/``apos``: paginação por cursor em ``analise_id``; a resposta traz
+      ``items`` e ``proximo_cursor`` para a próxima chamada; com ``incluir_acao=true``
+      cada item traz a sua ``acao``.
+    - Sem parâmetros: lista completa, como antes.
     """
     try:
-        return services_sentimentos.get_sentimentos(db)
+        if formato == "ndjson":
+            return StreamingResponse(
+                services_sentimentos.stream_sentimentos_ndjson(apos),
+                media_type="application/x-ndjson"
+            )
+        if limite is not None or apos is not None or incluir_acao:
+            return RespostaJSONRapida(
+                await services_sentimentos.get_sentimentos_pagina_async(db, limite or 1000, apos, incluir_acao)
+            )
+        return RespostaJSONRapida(await services_sentimentos.get_sentimentos_async(db))
         
     except Exception as e:
         raise HTTPException(
@@ -84,14 +295,41 @@ def get_sentimentos(db: Session = Depends(get_db)):
                 detail=str(e)
                 )
 
+
+async def _resposta_condicional(request: Request, db: AsyncSession, calcular):
+    """
+    Responde com ETag derivado da versão dos dados e da query string.
+
+    Se o ``If-None-Match`` do cliente já tiver esse ETag, devolve 304 sem
+    executar ``calcular`` (corrotina que retorna os dados ou uma ``Response``).
+    """
+    versao = await versao_dados.atual_async(db)
+    etag = gerar_etag(versao, request.url.path, request.url.query)
+    cabecalhos = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_confere(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cabecalhos)
+
+    resposta = await calcular()
+    if not isinstance(resposta, Response):
+        resposta = RespostaJSONRapida(resposta)
+    resposta.headers.update(cabecalhos)
+    return resposta
+
+
 # GET /sentimentosRecorrentes
 @router.get("/sentimento/recorrente")
-def sentimentos_recorrentes(db: Session = Depends(get_db)):
+async def sentimentos_recorrentes(request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Recupera todos os sentimentos recorrentes.
+
+    Aceita ``If-None-Match``: se nenhuma análise foi gravada desde o ETag informado, responde 304.
     """
     try:
-        return services_sentimentos.sentimentos_recorrentes(db)
+        return await _resposta_condicional(request, db, lambda: cache_rotas.obter_ou_calcular(
+            "/sentimento/recorrente",
+            lambda: services_sentimentos.sentimentos_recorrentes_async(db),
+            tags=(TAG_SENTIMENTOS,)
+        ))
     
     except Exception as e:
         raise HTTPException(
@@ -101,12 +339,12 @@ def sentimentos_recorrentes(db: Session = Depends(get_db)):
 
 # GET /sentimento/tecnico/{id}
 @router.get("/sentimento/tecnico/{id}")
-def get_sentimento_by_tecnico(id: int, db: Session = Depends(get_db)):
+async def get_sentimento_by_tecnico(id: int, incluir_acao: bool = False, db: AsyncSession = Depends(get_async_db)):
     """
-    Recupera todos os sentimentos de um técnico.
+    Recupera todos os sentimentos de um técnico; com ``incluir_acao=true``, cada um traz a sua ``acao``.
     """
     try:    
-        return services_sentimentos.get_sentimentos_por_id(id, db)
+        return await services_sentimentos.get_sentimentos_por_id_async(id, db, incluir_acao)
        
     
     except Exception as e:
@@ -117,13 +355,38 @@ def get_sentimento_by_tecnico(id: int, db: Session = Depends(get_db)):
 
 # GET /atendimento
 @router.get("/atendimento")
-def get_atendimento(db: Session = Depends(get_db)):
+async def get_atendimento(
+    request: Request,
+    start: datetime.date | None = None,
+    end: datetime.date | None = None,
+    agent_id: int | None = None,
+    user_id: int | None = None,
+    limite: int | None = Query(None, ge=1, le=10000),
+    apos: int | None = Query(None, ge=0),
+    formato: str = Query("json", pattern="^(json|ndjson)$"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Recupera as informações de atendimento incluindo conversas, sentimentos, atendenctes e clientes.
+
+    Os filtros (``start``/``end`` em ``data_acao``, ``agent_id``, ``user_id``) são aplicados no SQL.
+    ``limite``/``apos`` paginam por cursor e ``formato=ndjson`` transmite o resultado em fluxo.
+    Aceita ``If-None-Match``: se nenhuma análise foi gravada desde o ETag informado, responde 304.
     """
+    async def calcular():
+        if formato == "ndjson":
+            return StreamingResponse(
+                services_sentimentos.stream_atendimento_ndjson(start, end, agent_id, user_id, apos),
+                media_type="application/x-ndjson"
+            )
+        if limite is not None or apos is not None:
+            return await services_sentimentos.get_atendimento_pagina_async(
+                db, limite or 1000, apos, start, end, agent_id, user_id
+            )
+        return await services_sentimentos.get_atendimento_async(db, start, end, agent_id, user_id)
+
     try: 
-        
-        return services_sentimentos.get_atendimento(db)
+        return await _resposta_condicional(request, db, calcular)
     
     except Exception as e:
         raise HTTPException(
@@ -135,13 +398,18 @@ def get_atendimento(db: Session = Depends(get_db)):
 
 # GET /tecnico/{id}
 @router.get("/tecnico/{id}")
-def get_tecnico(id: int, db: Session = Depends(get_db)):
+async def get_tecnico(id: int, db: AsyncSession = Depends(get_async_db)):
     """
-    Recupera informações de um técnico específico.
+    Recupera o perfil de um técnico: score médio/mínimo/máximo, distribuição dos
+    sentimentos, sentimento dominante e tendência recente.
     """
     try:    
             
-        return services_sentimentos.get_tecnico(id, db)
+        return await cache_rotas.obter_ou_calcular(
+            cache_rotas.chave("/tecnico", id=id),
+            lambda: services_sentimentos.get_tecnico_async(id, db),
+            tags=(TAG_TECNICO, f"{TAG_TECNICO}:{id}")
+        )
     
     except Exception as e:
         raise HTTPException(
@@ -151,14 +419,68 @@ def get_tecnico(id: int, db: Session = Depends(get_db)):
     
     
 
+def _ids_lote(ids: list[int]) -> list[int]:
+    """
+    Remove ids repetidos mantendo a ordem e valida o tamanho do lote.
+    """
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > PERFIS_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"No máximo {PERFIS_MAX_IDS} ids por requisição")
+    return ids
+
+
+def _chave_lote(rota: str, ids: list[int]) -> str:
+    return cache_rotas.chave(rota, ids=",".join(map(str, sorted(ids))))
+
+
+# GET /tecnicos/perfis
+@router.get("/tecnicos/perfis")
+async def get_tecnicos_perfis(ids: list[int] = Query(...), db: AsyncSession = Depends(get_async_db)):
+    """
+    Perfis de vários técnicos (``?ids=1&ids=2``), na ordem pedida, para rankings.
+    """
+    ids = _ids_lote(ids)
+    try:
+        resultado = await cache_rotas.obter_ou_calcular(
+            _chave_lote("/tecnicos/perfis", ids),
+            lambda: services_sentimentos.get_tecnicos_perfis_async(ids, db),
+            tags=(TAG_TECNICO, *(f"{TAG_TECNICO}:{id}" for id in ids))
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return RespostaJSONRapida(resultado)
+
+
+# GET /clientes/perfis
+@router.get("/clientes/perfis")
+async def get_clientes_perfis(ids: list[int] = Query(...), db: AsyncSession = Depends(get_async_db)):
+    """
+    Perfis de vários clientes (``?ids=1&ids=2``), na ordem pedida.
+    """
+    ids = _ids_lote(ids)
+    try:
+        resultado = await cache_rotas.obter_ou_calcular(
+            _chave_lote("/clientes/perfis", ids),
+            lambda: services_sentimentos.get_clientes_perfis_async(ids, db),
+            tags=(TAG_CLIENTE, *(f"{TAG_CLIENTE}:{id}" for id in ids))
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return RespostaJSONRapida(resultado)
+
+
 # GET /cliente/{id}
 @router.get("/cliente/{id}")
-def get_cliente(id: int, db: Session = Depends(get_db)):
+async def get_cliente(id: int, db: AsyncSession = Depends(get_async_db)):
     """
-    Recupera informações de um cliente específico.
+    Recupera o perfil de um cliente, com os mesmos agregados de ``/tecnico/{id}``.
     """
     try:    
-        return services_sentimentos.get_cliente(id, db)
+        return await cache_rotas.obter_ou_calcular(
+            cache_rotas.chave("/cliente", id=id),
+            lambda: services_sentimentos.get_cliente_async(id, db),
+            tags=(TAG_CLIENTE, f"{TAG_CLIENTE}:{id}")
+        )
     
     except Exception as e:
         raise HTTPException(
@@ -168,44 +490,120 @@ def get_cliente(id: int, db: Session = Depends(get_db)):
     
 # GET /tecnicos
 @router.get("/tecnicos-lista")
-def get_tecnicos(db: Session = Depends(get_db)):
+async def get_tecnicos(db: AsyncSession = Depends(get_async_db)):
     try:
-        return services_sentimentos.get_tecnicos(db)
+        return RespostaJSONRapida(await cache_rotas.obter_ou_calcular(
+            "/tecnicos-lista",
+            lambda: services_sentimentos.get_tecnicos_async(db),
+            tags=(TAG_TECNICOS_LISTA,)
+        ))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar técnicos: {str(e)}")
 
 # GET /clientes
 @router.get("/clientes-lista")
-def get_clientes(db: Session = Depends(get_db)):
-    return services_sentimentos.get_clientes(db)
+async def get_clientes(db: AsyncSession = Depends(get_async_db)):
+    return RespostaJSONRapida(await cache_rotas.obter_ou_calcular(
+        "/clientes-lista",
+        lambda: services_sentimentos.get_clientes_async(db),
+        tags=(TAG_CLIENTES_LISTA,)
+    ))
 
 # GET /sentimento/by-score
 @router.get("/sentimento/by-score")
-def get_sentimentos_by_score(min: float = 0.0, max: float = 1.0, db: Session = Depends(get_db)):
-    return services_sentimentos.get_sentimentos_by_score(min, max, db)
+async def get_sentimentos_by_score(min: float = 0.0, max: float = 1.0, db: AsyncSession = Depends(get_async_db)):
+    return RespostaJSONRapida(await services_sentimentos.get_sentimentos_by_score_async(min, max, db))
 
 # GET /sentimento/by-data
 @router.get("/sentimento/by-data")
-def get_sentimentos_by_data(start: datetime.date, end: datetime.date, db: Session = Depends(get_db)):
-    return services_sentimentos.get_sentimentos_by_data(start, end, db)
+async def get_sentimentos_by_data(start: datetime.date, end: datetime.date, db: AsyncSession = Depends(get_async_db)):
+    return RespostaJSONRapida(await services_sentimentos.get_sentimentos_by_data_async(start, end, db))
+
+# GET /sentimento/tendencia
+@router.get("/sentimento/tendencia")
+async def get_tendencia(
+    inicio: datetime.date,
+    fim: datetime.date,
+    granularidade: str = Query("dia", pattern="^(hora|dia|semana)$"),
+    agrupar: str | None = Query(None, pattern="^(tecnico|cliente)$"),
+    agent_id: int | None = None,
+    user_id: int | None = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Quantidade e score médio por sentimento em buckets de hora, dia ou semana
+    (``inicio`` e ``fim`` inclusivos), agregados no banco.
+
+    A resposta é colunar: ``buckets`` e, para cada sentimento (e técnico ou cliente,
+    com ``agrupar``), vetores ``quantidade`` e ``score_medio`` alinhados aos buckets.
+    Semanas começam na segunda-feira; um bucket cortado por ``inicio`` ou ``fim`` traz
+    só a parte dentro do intervalo. Intervalos inteiramente encerrados podem ser
+    guardados pelo navegador/proxy (``Cache-Control: max-age``).
+    """
+    if fim < inicio:
+        raise HTTPException(status_code=400, detail="fim deve ser maior ou igual a inicio")
+    try:
+        dados, encerrado = await tendencias.get_tendencia_async(
+            db, granularidade, inicio, fim, agrupar, agent_id, user_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    cache_control = f"public, max-age={tendencias.TENDENCIA_MAX_AGE}" if encerrado else "no-cache"
+    return RespostaJSONRapida(dados, headers={"Cache-Control": cache_control})
+
+# GET /sentimento/exportar
+@router.get("/sentimento/exportar")
+def exportar_sentimentos(
+    formato: str = Query("csv", pattern="^(csv|arrow|parquet)$"),
+    inicio: datetime.date | None = None,
+    fim: datetime.date | None = None,
+    score_min: float | None = Query(None, ge=0, le=1),
+    score_max: float | None = Query(None, ge=0, le=1),
+    incluir_descricao: bool = False,
+):
+    """
+    Exporta as análises (com ``event_id`` e ``data_acao`` da ação) em CSV, Arrow
+    (stream IPC) ou Parquet, filtradas por data da análise (``inicio``/``fim``
+    inclusivos) e faixa de score.
+
+    O arquivo é transmitido em lotes de ``EXPORTACAO_TAMANHO_LOTE`` linhas lidos de um
+    cursor do lado do servidor; Arrow e Parquet precisam do pacote ``pyarrow``
+    (sem ele, ``501``).
+    """
+    if inicio and fim and fim < inicio:
+        raise HTTPException(status_code=400, detail="fim deve ser maior ou igual a inicio")
+    if score_min is not None and score_max is not None and score_max < score_min:
+        raise HTTPException(status_code=400, detail="score_max deve ser maior ou igual a score_min")
+    try:
+        partes = exportacao.exportar(formato, inicio, fim, score_min, score_max, incluir_descricao)
+    except exportacao.PyArrowAusente as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    media_type, extensao = exportacao.FORMATOS[formato]
+    return StreamingResponse(
+        partes,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="analises.{extensao}"'}
+    )
 
 # Sentimento mais negativo
 @router.get("/sentimento/mais-negativo")
-def get_mais_negativo(db: Session = Depends(get_db)):
-    sentimento_negativo = services_sentimentos.get_sentimento_mais_negativo(db)
+async def get_mais_negativo(db: AsyncSession = Depends(get_async_db)):
+    sentimento_negativo = await services_sentimentos.get_sentimento_mais_negativo_async(db)
 
     return sentimento_negativo
 
 # GET /sentimento/quantidade
 @router.get("/sentimento/quantidade")
-def get_quantidade_sentimentos(db: Session = Depends(get_db)):
+async def get_quantidade_sentimentos(db: AsyncSession = Depends(get_async_db)):
     print("Chamando a função get_quantidade_sentimentos")
-    quantidade = services_sentimentos.get_quantidade_sentimentos(db)
+    quantidade = await services_sentimentos.get_quantidade_sentimentos_async(db)
     print(f"Quantidade de sentimentos: {quantidade}")
     return {"quantidade": quantidade}
 
 
 # Get/ sentimento/mais-frequente
 @router.get("/sentimento/mais-frequente")
-def get_sentimento_mais_frequente(db: Session = Depends(get_db)):
-    return services_sentimentos.get_sentimento_mais_frequente(db)
+async def get_sentimento_mais_frequente(db: AsyncSession = Depends(get_async_db)):
+    return await services_sentimentos.get_sentimento_mais_frequente_async(db)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 
@@ -34,6 +34,46 @@ class Agent(BaseModel):
     }
 
 
+class Tendencia(BaseModel):
+    janela_dias: int
+    quantidade_recente: int
+    quantidade_anterior: int
+    score_recente: Optional[float]
+    score_anterior: Optional[float]
+    negativos_recente: Optional[float]
+    negativos_anterior: Optional[float]
+    variacao_negativos: Optional[float]
+    direcao: Optional[str]
+    dominante_recente: Optional[str]
+
+class PerfilTecnico(Agent):
+    agent_id: int
+    sentimento: Optional[str]
+    sentimento_clientes: Optional[str]
+    termo: Optional[str]
+    score: Optional[float]
+    quantidade: int
+    score_medio: Optional[float]
+    score_min: Optional[float]
+    score_max: Optional[float]
+    distribuicao: dict[str, int]
+    dominante: Optional[str]
+    tendencia: Tendencia
+
+class PerfilCliente(User):
+    user_id: int
+    sentimento: Optional[str]
+    termo: Optional[str]
+    score: Optional[float]
+    quantidade: int
+    score_medio: Optional[float]
+    score_min: Optional[float]
+    score_max: Optional[float]
+    distribuicao: dict[str, int]
+    dominante: Optional[str]
+    tendencia: Tendencia
+
+
 class EventBase(BaseModel):
     descricao: str
     data_abertura: datetime
@@ -85,3 +125,7 @@ class Atendimento(BaseModel):
 class SentimentoRecorrente(BaseModel):
     sentimento: str
     count: int
+
+class TrocaSenha(BaseModel):
+    senha_atual: str
+    senha_nova: str = Field(min_length=8)
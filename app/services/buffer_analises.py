@@ -0,0 +1,249 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from dotenv import load_dotenv
+
+from ..database import SessionLocal
+from .services_sentimentos import preparar_analise, salvar_analises_lote
+
+load_dotenv()
+
+BUFFER_ANALISES_TAMANHO = int(os.getenv("BUFFER_ANALISES_TAMANHO", "500"))
+BUFFER_ANALISES_INTERVALO = float(os.getenv("BUFFER_ANALISES_INTERVALO", "0.2"))
+BUFFER_ANALISES_USAR_COPY = os.getenv("BUFFER_ANALISES_USAR_COPY", "true").lower() == "true"
+
+
+class BufferAnalises:
+    """
+    Buffer de escrita das análises recebidas do consumer.
+
+    As linhas ficam acumuladas em memória e são gravadas em uma única transação
+    (``COPY`` no PostgreSQL, ``INSERT`` em lote nos demais) quando o buffer atinge
+    ``tamanho`` linhas ou quando a linha mais antiga espera ``intervalo`` segundos.
+
+    ``adicionar`` devolve um ``Future`` que só é resolvido depois do commit, então
+    quem confirma o recebimento ao consumer só o faz com o dado já persistido.
+    Se o lote falhar, as linhas são regravadas uma a uma para que uma linha
+    inválida não derrube as demais.
+
+    Args:
+        tamanho (int): Quantidade de linhas que dispara a gravação.
+        intervalo (float): Tempo máximo, em segundos, que uma linha espera no buffer.
+        session_factory (callable): Fábrica de sessões do SQLAlchemy.
+        usar_copy (bool): Usa ``COPY`` quando o banco for PostgreSQL.
+    """
+
+    def __init__(
+        self,
+        tamanho: int = BUFFER_ANALISES_TAMANHO,
+        intervalo: float = BUFFER_ANALISES_INTERVALO,
+        session_factory=SessionLocal,
+        usar_copy: bool = BUFFER_ANALISES_USAR_COPY,
+    ):
+        self.tamanho = tamanho
+        self.intervalo = intervalo
+        self.usar_copy = usar_copy
+        self._session_factory = session_factory
+        self._pendentes: list[tuple[dict, Future, float]] = []
+        self._condicao = threading.Condition()
+        self._fechado = False
+        self._metricas = {
+            "gravacoes": 0,
+            "linhas_gravadas": 0,
+            "linhas_com_erro": 0,
+            "gravacoes_individuais": 0,
+            "latencia_gravacao_ultima_ms": 0.0,
+            "latencia_gravacao_max_ms": 0.0,
+            "latencia_gravacao_total_ms": 0.0,
+            "espera_max_ms": 0.0,
+        }
+        self._thread = threading.Thread(target=self._executar, name="buffer-analises", daemon=True)
+        self._thread.start()
+
+    def adicionar(self, dados: dict) -> Future:
+        """
+        Coloca um resultado no buffer.
+
+        Args:
+            dados (dict): Resultado da análise enviado pelo consumer.
+
+        Returns:
+            Future: Resolvido com ``None`` após o commit ou com a exceção que impediu a gravação.
+
+        Raises:
+            ValueError: Se o resultado for inválido (ver ``preparar_analise``).
+        """
+        linha = preparar_analise(dados)
+        future = Future()
+        self._enfileirar([(linha, future)])
+        return future
+
+    def adicionar_lote(self, itens: list[dict]) -> list[Future]:
+        """
+        Coloca vários resultados no buffer de uma vez.
+
+        Itens inválidos recebem um ``Future`` já resolvido com ``ValueError``
+        em vez de interromper os demais.
+        """
+        futures = []
+        linhas = []
+        for dados in itens:
+            future = Future()
+            futures.append(future)
+            try:
+                linhas.append((preparar_analise(dados), future))
+            except ValueError as e:
+                future.set_exception(e)
+        self._enfileirar(linhas)
+        return futures
+
+    def _enfileirar(self, linhas: list[tuple[dict, Future]]):
+        with self._condicao:
+            if self._fechado:
+                raise RuntimeError("Buffer de análises já foi encerrado")
+            agora = time.perf_counter()
+            self._pendentes.extend((linha, future, agora) for linha, future in linhas)
+            if linhas:
+                self._condicao.notify()
+
+    async def adicionar_async(self, dados: dict):
+        """
+        Versão para rotas ``async``: aguarda o commit sem bloquear o event loop.
+        """
+        await asyncio.wrap_future(self.adicionar(dados))
+
+    async def adicionar_lote_async(self, itens: list[dict]) -> list:
+        """
+        Versão não bloqueante de ``adicionar_lote``.
+
+        Returns:
+            list: Para cada item, ``None`` se foi gravado ou a exceção ocorrida.
+        """
+        futures = [asyncio.wrap_future(f) for f in self.adicionar_lote(itens)]
+        return await asyncio.gather(*futures, return_exceptions=True)
+
+    def _executar(self):
+        while True:
+            with self._condicao:
+                while True:
+                    if self._fechado or len(self._pendentes) >= self.tamanho:
+                        break
+                    if self._pendentes:
+                        restante = self._pendentes[0][2] + self.intervalo - time.perf_counter()
+                        if restante <= 0:
+                            break
+                        self._condicao.wait(restante)
+                    else:
+                        self._condicao.wait()
+                lote = self._pendentes[:self.tamanho]
+                del self._pendentes[:self.tamanho]
+                encerrar = self._fechado and not self._pendentes
+            if lote:
+                try:
+                    self._gravar(lote)
+                except Exception as e:
+                    # A thread é a única que grava o buffer: se morrer, todo ``adicionar`` fica pendurado
+                    print(f"Erro no buffer de análises: {repr(e)}")
+                    for _, future, _ in lote:
+                        if not future.done():
+                            future.set_exception(e)
+            if encerrar:
+                return
+
+    def _gravar(self, lote: list[tuple[dict, Future, float]]):
+        inicio = time.perf_counter()
+        try:
+            db = self._session_factory()
+            try:
+                try:
+                    salvar_analises_lote(db, [linha for linha, _, _ in lote], usar_copy=self.usar_copy)
+                    erros = [None] * len(lote)
+                except Exception:
+                    erros = self._gravar_individualmente(db, lote)
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"Erro ao abrir sessão para o buffer de análises: {repr(e)}")
+            erros = [e] * len(lote)
+        fim = time.perf_counter()
+
+        for (_, future, _), erro in zip(lote, erros):
+            # Quem desistiu da requisição cancela o Future; resolvê-lo levantaria InvalidStateError
+            if future.done():
+                continue
+            if erro is None:
+                future.set_result(None)
+            else:
+                future.set_exception(erro)
+
+        latencia = (fim - inicio) * 1000
+        espera = (fim - min(entrada for _, _, entrada in lote)) * 1000
+        with self._condicao:
+            m = self._metricas
+            m["gravacoes"] += 1
+            m["linhas_gravadas"] += sum(1 for erro in erros if erro is None)
+            m["linhas_com_erro"] += sum(1 for erro in erros if erro is not None)
+            m["latencia_gravacao_ultima_ms"] = latencia
+            m["latencia_gravacao_max_ms"] = max(m["latencia_gravacao_max_ms"], latencia)
+            m["latencia_gravacao_total_ms"] += latencia
+            m["espera_max_ms"] = max(m["espera_max_ms"], espera)
+
+    def _gravar_individualmente(self, db, lote) -> list:
+        with self._condicao:
+            self._metricas["gravacoes_individuais"] += 1
+        erros = []
+        for linha, _, _ in lote:
+            try:
+                salvar_analises_lote(db, [linha], usar_copy=False)
+                erros.append(None)
+            except Exception as e:
+                print(f"Erro ao gravar análise da ação {linha['acao_id']}: {repr(e)}")
+                erros.append(e)
+        return erros
+
+    def metricas(self) -> dict:
+        """
+        Retorna os contadores do buffer e a latência das gravações em milissegundos.
+        """
+        with self._condicao:
+            m = dict(self._metricas)
+            m["pendentes"] = len(self._pendentes)
+        total = m.pop("latencia_gravacao_total_ms")
+        m["latencia_gravacao_media_ms"] = total / m["gravacoes"] if m["gravacoes"] else 0.0
+        return {chave: round(valor, 3) if isinstance(valor, float) else valor for chave, valor in m.items()}
+
+    def fechar(self, timeout: float | None = None):
+        """
+        Para de aceitar resultados e grava tudo o que ainda está no buffer.
+        """
+        with self._condicao:
+            self._fechado = True
+            self._condicao.notify()
+        self._thread.join(timeout)
+
+
+_buffer: BufferAnalises | None = None
+_buffer_lock = threading.Lock()
+
+
+def obter_buffer() -> BufferAnalises:
+    """
+    Retorna o buffer compartilhado da aplicação, criando-o se necessário.
+    """
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = BufferAnalises()
+    return _buffer
+
+
+def encerrar_buffer():
+    global _buffer
+    with _buffer_lock:
+        if _buffer is not None:
+            _buffer.fechar()
+            _buffer = None
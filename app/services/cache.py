@@ -0,0 +1,323 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+
+load_dotenv()
+
+CACHE_HABILITADO = os.getenv("CACHE_HABILITADO", "true").lower() == "true"
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memoria")
+CACHE_TTL = float(os.getenv("CACHE_TTL", "60"))
+CACHE_MAX_ITENS = int(os.getenv("CACHE_MAX_ITENS", "1024"))
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_REDIS_PREFIXO = os.getenv("CACHE_REDIS_PREFIXO", "api-sentimento:")
+
+
+class BackendMemoria:
+    """
+    Cache local ao processo: dicionário ordenado com TTL por item e
+    descarte do item menos usado (LRU) quando passa de ``max_itens``.
+
+    Cada item pode ter tags; ``invalidar`` remove todos os itens de uma tag e
+    incrementa a geração dela (ver ``CacheRotas.obter_ou_calcular``).
+    """
+
+    bloqueante = False
+
+    def __init__(self, max_itens: int = CACHE_MAX_ITENS):
+        self.max_itens = max_itens
+        self._itens: OrderedDict[str, tuple[float, object, tuple]] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._geracoes: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.descartes = 0
+
+    def obter(self, chave: str):
+        """
+        Returns:
+            tuple[bool, object]: ``(encontrado, valor)``.
+        """
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return False, None
+            expira, valor, _ = item
+            if expira < time.monotonic():
+                self._remover(chave)
+                return False, None
+            self._itens.move_to_end(chave)
+            return True, valor
+
+    def geracoes(self, tags) -> tuple:
+        with self._lock:
+            return tuple(self._geracoes.get(tag, 0) for tag in tags)
+
+    def gravar(self, chave: str, valor, ttl: float, tags: tuple = (), geracoes: tuple | None = None) -> bool:
+        """
+        Returns:
+            bool: Falso quando ``geracoes`` foi informado e alguma tag foi invalidada
+            desde então; nesse caso nada é gravado.
+        """
+        with self._lock:
+            if geracoes is not None and geracoes != tuple(self._geracoes.get(tag, 0) for tag in tags):
+                return False
+            if chave in self._itens:
+                self._remover(chave)
+            self._itens[chave] = (time.monotonic() + ttl, valor, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(chave)
+            while len(self._itens) > self.max_itens:
+                self._remover(next(iter(self._itens)))
+                self.descartes += 1
+        return True
+
+    def invalidar(self, tags) -> int:
+        removidos = 0
+        with self._lock:
+            for tag in tags:
+                self._geracoes[tag] = self._geracoes.get(tag, 0) + 1
+                for chave in self._tags.pop(tag, ()):
+                    if chave in self._itens:
+                        self._remover(chave)
+                        removidos += 1
+        return removidos
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self._tags.clear()
+
+    def _remover(self, chave: str):
+        _, _, tags = self._itens.pop(chave)
+        for tag in tags:
+            chaves = self._tags.get(tag)
+            if chaves is not None:
+                chaves.discard(chave)
+                if not chaves:
+                    del self._tags[tag]
+
+    def tamanho(self) -> int:
+        with self._lock:
+            return len(self._itens)
+
+
+class BackendRedis:
+    """
+    Cache compartilhado entre workers em um Redis.
+
+    Os valores são gravados como JSON com expiração; cada tag é um ``SET`` com as
+    chaves que dependem dela, então uma invalidação feita por qualquer worker vale
+    para todos. A geração de cada tag é um contador (``INCR``) observado com
+    ``WATCH`` na gravação. Requer o pacote ``redis``.
+    """
+
+    bloqueante = True
+
+    def __init__(self, url: str = CACHE_REDIS_URL, prefixo: str = CACHE_REDIS_PREFIXO):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requer o pacote 'redis' instalado")
+        self._redis = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+        self._watch_error = redis.WatchError
+        self._prefixo = prefixo
+        self.descartes = 0
+
+    def obter(self, chave: str):
+        valor = self._redis.get(self._prefixo + chave)
+        if valor is None:
+            return False, None
+        return True, json.loads(valor)
+
+    def _chave_geracao(self, tag: str) -> str:
+        return self._prefixo + "geracao:" + tag
+
+    def geracoes(self, tags) -> tuple:
+        if not tags:
+            return ()
+        return tuple(int(valor or 0) for valor in self._redis.mget([self._chave_geracao(tag) for tag in tags]))
+
+    def gravar(self, chave: str, valor, ttl: float, tags: tuple = (), geracoes: tuple | None = None) -> bool:
+        chave = self._prefixo + chave
+        chaves_geracao = [self._chave_geracao(tag) for tag in tags]
+        with self._redis.pipeline() as pipe:
+            try:
+                if geracoes is not None and chaves_geracao:
+                    pipe.watch(*chaves_geracao)
+                    if geracoes != tuple(int(v or 0) for v in pipe.mget(chaves_geracao)):
+                        return False
+                pipe.multi()
+                pipe.set(chave, json.dumps(valor), px=int(ttl * 1000))
+                for tag in tags:
+                    pipe.sadd(self._prefixo + "tag:" + tag, chave)
+                pipe.execute()
+            except self._watch_error:
+                return False
+        return True
+
+    def invalidar(self, tags) -> int:
+        tags = list(tags)
+        chaves_tags = [self._prefixo + "tag:" + tag for tag in tags]
+        if not chaves_tags:
+            return 0
+        chaves = self._redis.sunion(chaves_tags)
+        pipe = self._redis.pipeline()
+        for tag in tags:
+            pipe.incr(self._chave_geracao(tag))
+        if chaves:
+            pipe.delete(*chaves)
+        pipe.delete(*chaves_tags)
+        pipe.execute()
+        return len(chaves)
+
+    def limpar(self):
+        # As gerações ficam: zerá-las poderia validar uma gravação iniciada antes da limpeza
+        for chave in self._redis.scan_iter(self._prefixo + "*"):
+            if b":geracao:" not in chave:
+                self._redis.delete(chave)
+
+    def tamanho(self) -> int:
+        return sum(
+            1 for chave in self._redis.scan_iter(self._prefixo + "*")
+            if b":tag:" not in chave and b":geracao:" not in chave
+        )
+
+
+class CacheRotas:
+    """
+    Cache das respostas das rotas de leitura, com contadores de acerto e erro.
+
+    As chaves são montadas a partir da rota e dos parâmetros e os valores são
+    guardados já convertidos por ``jsonable_encoder``, o que permite usar um
+    backend compartilhado. Escritas de análises chamam ``invalidar_analises``
+    para remover apenas as respostas afetadas.
+
+    Args:
+        backend: ``BackendMemoria`` (padrão) ou ``BackendRedis``.
+        ttl (float): Tempo de vida padrão dos itens, em segundos.
+        habilitado (bool): Quando falso, toda chamada vai direto ao banco.
+    """
+
+    def __init__(self, backend=None, ttl: float = CACHE_TTL, habilitado: bool = CACHE_HABILITADO):
+        self.backend = backend or BackendMemoria()
+        self.ttl = ttl
+        self.habilitado = habilitado
+        self._lock = threading.Lock()
+        self._metricas = {
+            "acertos": 0, "erros": 0, "invalidacoes": 0, "itens_invalidados": 0,
+            "gravacoes_descartadas": 0, "falhas_backend": 0,
+        }
+
+    @staticmethod
+    def chave(rota: str, **parametros) -> str:
+        if not parametros:
+            return rota
+        return rota + "?" + "&".join(f"{nome}={parametros[nome]}" for nome in sorted(parametros))
+
+    def _contar(self, nome: str, quantidade: int = 1):
+        with self._lock:
+            self._metricas[nome] += quantidade
+
+    async def _backend(self, metodo, *args):
+        if self.backend.bloqueante:
+            return await run_in_threadpool(metodo, *args)
+        return metodo(*args)
+
+    async def obter_ou_calcular(self, chave: str, calcular, tags: tuple = (), ttl: float | None = None):
+        """
+        Retorna o valor em cache para ``chave`` ou executa ``calcular()`` (corrotina) e guarda o resultado.
+
+        As gerações das ``tags`` são lidas antes de ``calcular()``; se alguma for
+        invalidada enquanto a consulta roda, o resultado pode ser anterior à
+        escrita e não é gravado. Falhas do backend não derrubam a rota: a
+        consulta é feita normalmente.
+        """
+        if not self.habilitado:
+            return await calcular()
+        try:
+            encontrado, valor = await self._backend(self.backend.obter, chave)
+        except Exception as e:
+            print(f"Falha ao ler o cache: {repr(e)}")
+            self._contar("falhas_backend")
+            encontrado = False
+        if encontrado:
+            self._contar("acertos")
+            return valor
+
+        self._contar("erros")
+        try:
+            geracoes = await self._backend(self.backend.geracoes, tags)
+        except Exception as e:
+            print(f"Falha ao ler as gerações do cache: {repr(e)}")
+            self._contar("falhas_backend")
+            return jsonable_encoder(await calcular())
+        valor = jsonable_encoder(await calcular())
+        try:
+            gravado = await self._backend(self.backend.gravar, chave, valor, ttl or self.ttl, tags, geracoes)
+            if not gravado:
+                self._contar("gravacoes_descartadas")
+        except Exception as e:
+            print(f"Falha ao gravar no cache: {repr(e)}")
+            self._contar("falhas_backend")
+        return valor
+
+    def invalidar(self, tags):
+        if not self.habilitado:
+            return
+        try:
+            removidos = self.backend.invalidar(tags)
+        except Exception as e:
+            print(f"Falha ao invalidar o cache: {repr(e)}")
+            self._contar("falhas_backend")
+            return
+        self._contar("invalidacoes")
+        self._contar("itens_invalidados", removidos)
+
+    def invalidar_analises(self, linhas: list[dict]):
+        """
+        Remove as respostas que dependem das análises recém-gravadas: a contagem
+        de sentimentos recorrentes e o perfil de cada técnico e cliente envolvido.
+        Linhas sem técnico ou cliente invalidam todos os perfis daquele tipo.
+        """
+        tags = {TAG_SENTIMENTOS}
+        for linha in linhas:
+            agent_id = linha.get("agent_id")
+            user_id = linha.get("user_id")
+            tags.add(f"{TAG_TECNICO}:{agent_id}" if agent_id is not None else TAG_TECNICO)
+            tags.add(f"{TAG_CLIENTE}:{user_id}" if user_id is not None else TAG_CLIENTE)
+        self.invalidar(tags)
+
+    def metricas(self) -> dict:
+        with self._lock:
+            dados = dict(self._metricas)
+        consultas = dados["acertos"] + dados["erros"]
+        dados["taxa_acerto"] = round(dados["acertos"] / consultas, 4) if consultas else 0.0
+        dados["backend"] = type(self.backend).__name__
+        dados["descartes_lru"] = self.backend.descartes
+        try:
+            dados["itens"] = self.backend.tamanho()
+        except Exception:
+            dados["itens"] = None
+        return dados
+
+
+# Tags usadas pelas rotas e pela invalidação
+TAG_SENTIMENTOS = "sentimentos"
+TAG_TECNICO = "tecnico"
+TAG_CLIENTE = "cliente"
+TAG_TECNICOS_LISTA = "tecnicos-lista"
+TAG_CLIENTES_LISTA = "clientes-lista"
+
+
+def _criar_cache() -> CacheRotas:
+    if CACHE_BACKEND == "redis":
+        return CacheRotas(BackendRedis())
+    return CacheRotas(BackendMemoria())
+
+
+cache_rotas = _criar_cache()
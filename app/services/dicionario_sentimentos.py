@@ -0,0 +1,114 @@
+import threading
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..database import SessionLocal
+
+Sentimento = models.Sentimento
+
+
+class DicionarioSentimentos:
+    """
+    Cópia em memória de ``cs_sentimento``: rótulo -> código, código -> rótulo e
+    os códigos dos rótulos negativos.
+
+    As análises guardam só o código (``SMALLINT``); a conversão de volta para o
+    rótulo nas respostas é uma consulta a um dicionário, sem join. Rótulos novos
+    são criados em uma transação própria, para que o código já esteja
+    confirmado no banco mesmo que a gravação da análise seja desfeita. Um código
+    desconhecido (criado por outro worker) faz o dicionário ser recarregado.
+
+    Args:
+        session_factory (callable): Fábrica de sessões usada para recarregar o dicionário.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._codigos: dict[str, int] = {}
+        self._nomes: dict[int, str] = {}
+        self._negativos: tuple[int, ...] = ()
+        self._carregado = False
+
+    def carregar(self, db: Session | None = None):
+        """
+        Lê ``cs_sentimento`` inteira (poucas dezenas de linhas) e substitui o dicionário.
+        """
+        if db is None:
+            with self._session_factory() as sessao:
+                linhas = sessao.execute(select(Sentimento.sentimento_id, Sentimento.nome, Sentimento.negativo)).all()
+        else:
+            linhas = db.execute(select(Sentimento.sentimento_id, Sentimento.nome, Sentimento.negativo)).all()
+        with self._lock:
+            self._codigos = {nome: codigo for codigo, nome, _ in linhas}
+            self._nomes = {codigo: nome for codigo, nome, _ in linhas}
+            self._negativos = tuple(codigo for codigo, _, negativo in linhas if negativo)
+            self._carregado = True
+
+    def _garantir_carregado(self, db: Session | None = None):
+        if not self._carregado:
+            self.carregar(db)
+
+    def nome(self, codigo: int | None) -> str | None:
+        """
+        Rótulo do código, como era gravado antes do dicionário.
+        """
+        if codigo is None:
+            return None
+        nome = self._nomes.get(codigo)
+        if nome is None:
+            self.carregar()
+            nome = self._nomes.get(codigo)
+        return nome
+
+    def codigo(self, db: Session, nome: str) -> int:
+        return self.codigos(db, [nome])[nome]
+
+    def codigos(self, db: Session, nomes) -> dict[str, int]:
+        """
+        Retorna o código de cada rótulo (já normalizado), criando os que não existem.
+
+        Args:
+            db (Session): Sessão de quem está gravando; só a conexão (engine) dela é usada
+                para criar rótulos novos, fora da transação em andamento.
+            nomes: Rótulos distintos ou não.
+        """
+        self._garantir_carregado(db)
+        codigos = self._codigos
+        faltantes = {nome for nome in nomes if nome not in codigos}
+        if faltantes:
+            self._criar(db, faltantes)
+            codigos = self._codigos
+        return {nome: codigos[nome] for nome in nomes}
+
+    def _criar(self, db: Session, nomes: set[str]):
+        tabela = Sentimento.__table__
+        bind = db.get_bind()
+        engine = getattr(bind, "engine", bind)
+        dialeto = engine.dialect.name
+        valores = [{"nome": nome} for nome in sorted(nomes)]
+        with engine.begin() as conexao:
+            if dialeto == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as insert_dialeto
+                conexao.execute(insert_dialeto(tabela).on_conflict_do_nothing(index_elements=[tabela.c.nome]), valores)
+            elif dialeto == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert as insert_dialeto
+                conexao.execute(insert_dialeto(tabela).on_conflict_do_nothing(index_elements=[tabela.c.nome]), valores)
+            else:
+                existentes = set(conexao.execute(select(tabela.c.nome).where(tabela.c.nome.in_(nomes))).scalars())
+                novos = [v for v in valores if v["nome"] not in existentes]
+                if novos:
+                    conexao.execute(tabela.insert(), novos)
+        self.carregar(db)
+
+    def negativos(self, db: Session | None = None) -> tuple[int, ...]:
+        """
+        Códigos dos rótulos com ``negativo`` ligado.
+        """
+        self._garantir_carregado(db)
+        return self._negativos
+
+
+dicionario_sentimentos = DicionarioSentimentos()
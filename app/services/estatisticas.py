@@ -0,0 +1,439 @@
+import os
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from dotenv import load_dotenv
+from sqlalchemy import Date, case, cast, func, literal, literal_column
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..database import SessionLocal
+from .cache import TAG_SENTIMENTOS, cache_rotas
+from .dicionario_sentimentos import dicionario_sentimentos
+
+load_dotenv()
+
+# Tamanho, em dias, das duas janelas comparadas na tendência dos perfis
+PERFIL_JANELA_DIAS = int(os.getenv("PERFIL_JANELA_DIAS", "30"))
+# Variação mínima da proporção de sentimentos negativos para a tendência deixar de ser "estavel"
+PERFIL_LIMIAR_TENDENCIA = 0.05
+
+# Valores gravados no lugar de nulos para manter a chave primária da tabela de estatísticas
+SEM_ID = 0
+SEM_DATA = date(1970, 1, 1)
+
+Estatistica = models.EstatisticaSentimento
+Total = models.TotalSentimento
+
+CHAVE_ESTATISTICA = ("dia", "sentimento_id", "agent_id", "user_id")
+CHAVE_TOTAL = ("sentimento_id",)
+
+
+def _dia(valor) -> date:
+    if valor is None:
+        return SEM_DATA
+    if isinstance(valor, str):
+        valor = datetime.fromisoformat(valor.replace("Z", "+00:00"))
+    if isinstance(valor, datetime):
+        return valor.date()
+    return valor
+
+
+def _decimal(valor):
+    return None if valor is None else Decimal(str(valor))
+
+
+def agregar(linhas: list[dict]) -> list[dict]:
+    """
+    Agrupa as análises por (dia, sentimento, técnico, cliente) no formato da tabela de estatísticas.
+
+    Args:
+        linhas (list[dict]): Análises com o rótulo normalizado e o ``sentimento_id`` (ver ``salvar_analises_lote``).
+
+    Returns:
+        list[dict]: Incrementos ordenados pela chave, para que gravações concorrentes
+        travem as linhas sempre na mesma ordem.
+    """
+    grupos: dict[tuple, dict] = {}
+    for linha in linhas:
+        chave = (
+            _dia(linha.get("data_analise")),
+            linha["sentimento_id"],
+            linha.get("agent_id") or SEM_ID,
+            linha.get("user_id") or SEM_ID,
+        )
+        grupo = grupos.get(chave)
+        if grupo is None:
+            grupo = grupos[chave] = {
+                "dia": chave[0],
+                "sentimento_id": chave[1],
+                "agent_id": chave[2],
+                "user_id": chave[3],
+                "quantidade": 0,
+                "quantidade_score": 0,
+                "soma_score": Decimal(0),
+                "score_min": None,
+                "score_max": None,
+            }
+        grupo["quantidade"] += 1
+        score = _decimal(linha.get("score"))
+        if score is not None:
+            grupo["quantidade_score"] += 1
+            grupo["soma_score"] += score
+            grupo["score_min"] = score if grupo["score_min"] is None else min(grupo["score_min"], score)
+            grupo["score_max"] = score if grupo["score_max"] is None else max(grupo["score_max"], score)
+    return [grupos[chave] for chave in sorted(grupos)]
+
+
+def totalizar(incrementos: list[dict]) -> list[dict]:
+    """
+    Soma os incrementos de ``agregar`` por sentimento, no formato de ``cs_total_sentimento``.
+    """
+    totais: dict[int, dict] = {}
+    for incremento in incrementos:
+        total = totais.get(incremento["sentimento_id"])
+        if total is None:
+            totais[incremento["sentimento_id"]] = {
+                campo: incremento[campo]
+                for campo in ("sentimento_id", "quantidade", "quantidade_score", "soma_score", "score_min", "score_max")
+            }
+            continue
+        total["quantidade"] += incremento["quantidade"]
+        total["quantidade_score"] += incremento["quantidade_score"]
+        total["soma_score"] += incremento["soma_score"]
+        for campo, escolher in (("score_min", min), ("score_max", max)):
+            existentes = [v for v in (total[campo], incremento[campo]) if v is not None]
+            total[campo] = escolher(existentes) if existentes else None
+    return [totais[codigo] for codigo in sorted(totais)]
+
+
+def _menor(atual, novo):
+    return case(
+        (atual.is_(None), novo),
+        (novo.is_(None), atual),
+        (novo < atual, novo),
+        else_=atual
+    )
+
+
+def _maior(atual, novo):
+    return case(
+        (atual.is_(None), novo),
+        (novo.is_(None), atual),
+        (novo > atual, novo),
+        else_=atual
+    )
+
+
+def _somar(db: Session, incrementos: list[dict], modelo=Estatistica, chave: tuple = CHAVE_ESTATISTICA):
+    """
+    Soma os incrementos em ``modelo`` (estatísticas ou totais) com ``INSERT ... ON CONFLICT DO UPDATE``
+    (PostgreSQL e SQLite) ou, nos demais bancos, ``UPDATE`` seguido de ``INSERT``.
+    """
+    if not incrementos:
+        return
+    tabela = modelo.__table__
+    dialeto = db.get_bind().dialect.name
+    if dialeto == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as insert_dialeto
+    elif dialeto == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as insert_dialeto
+    else:
+        for incremento in incrementos:
+            atualizadas = db.query(modelo).filter_by(
+                **{coluna: incremento[coluna] for coluna in chave}
+            ).update({
+                modelo.quantidade: modelo.quantidade + incremento["quantidade"],
+                modelo.quantidade_score: modelo.quantidade_score + incremento["quantidade_score"],
+                modelo.soma_score: modelo.soma_score + incremento["soma_score"],
+                modelo.score_min: _menor(modelo.score_min, literal(incremento["score_min"], modelo.score_min.type)),
+                modelo.score_max: _maior(modelo.score_max, literal(incremento["score_max"], modelo.score_max.type)),
+            }, synchronize_session=False)
+            if not atualizadas:
+                db.execute(tabela.insert(), [incremento])
+        return
+
+    stmt = insert_dialeto(tabela)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[tabela.c[coluna] for coluna in chave],
+        set_={
+            "quantidade": tabela.c.quantidade + stmt.excluded.quantidade,
+            "quantidade_score": tabela.c.quantidade_score + stmt.excluded.quantidade_score,
+            "soma_score": tabela.c.soma_score + stmt.excluded.soma_score,
+            "score_min": _menor(tabela.c.score_min, stmt.excluded.score_min),
+            "score_max": _maior(tabela.c.score_max, stmt.excluded.score_max),
+        }
+    )
+    db.execute(stmt, incrementos)
+
+
+def atualizar_estatisticas(db: Session, linhas: list[dict]):
+    """
+    Incrementa as estatísticas e os totais por sentimento com as análises que estão sendo gravadas.
+
+    Deve ser chamada na mesma transação do ``INSERT`` das análises, antes do commit.
+    """
+    incrementos = agregar(linhas)
+    _somar(db, incrementos)
+    _somar(db, totalizar(incrementos), Total, CHAVE_TOTAL)
+
+
+def reconstruir_estatisticas(db: Session):
+    """
+    Recalcula a tabela de estatísticas e a de totais inteiras a partir de ``cs_analise_sentimento``.
+
+    Usada na primeira carga e para corrigir divergências causadas por escritas
+    que não passaram por ``salvar_analise``.
+    """
+    a = models.AnaliseSentimento
+    if db.get_bind().dialect.name == "sqlite":
+        dia = func.date(a.data_analise)
+    else:
+        dia = cast(a.data_analise, Date)
+    grupos = db.query(
+        dia.label("dia"),
+        a.sentimento_id,
+        func.coalesce(a.agent_id, SEM_ID).label("agent_id"),
+        func.coalesce(a.user_id, SEM_ID).label("user_id"),
+        func.count().label("quantidade"),
+        func.count(a.score).label("quantidade_score"),
+        func.coalesce(func.sum(a.score), 0).label("soma_score"),
+        func.min(a.score).label("score_min"),
+        func.max(a.score).label("score_max"),
+    ).group_by(dia, a.sentimento_id, func.coalesce(a.agent_id, SEM_ID), func.coalesce(a.user_id, SEM_ID)).all()
+
+    incrementos: dict[tuple, dict] = {}
+    for grupo in grupos:
+        valores = dict(grupo._mapping)
+        valores["dia"] = _dia(valores["dia"])
+        chave = (valores["dia"], valores["sentimento_id"], valores["agent_id"], valores["user_id"])
+        # Linhas sem data e com data 1970-01-01 caem na mesma chave
+        if chave in incrementos:
+            atual = incrementos[chave]
+            atual["quantidade"] += valores["quantidade"]
+            atual["quantidade_score"] += valores["quantidade_score"]
+            atual["soma_score"] += valores["soma_score"]
+            for campo, escolher in (("score_min", min), ("score_max", max)):
+                existentes = [v for v in (atual[campo], valores[campo]) if v is not None]
+                atual[campo] = escolher(existentes) if existentes else None
+        else:
+            incrementos[chave] = valores
+
+    try:
+        db.query(Estatistica).delete(synchronize_session=False)
+        db.query(Total).delete(synchronize_session=False)
+        incrementos = [incrementos[chave] for chave in sorted(incrementos)]
+        _somar(db, incrementos)
+        _somar(db, totalizar(incrementos), Total, CHAVE_TOTAL)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    cache_rotas.invalidar([TAG_SENTIMENTOS])
+
+
+def garantir_estatisticas(session_factory=SessionLocal):
+    """
+    Reconstrói as estatísticas na inicialização se a tabela ou a de totais estiver vazia
+    mas já existirem análises gravadas (por exemplo, logo após a migração).
+    """
+    db = session_factory()
+    try:
+        vazia = db.query(Estatistica.dia).first() is None or db.query(Total.sentimento_id).first() is None
+        if vazia and db.query(models.AnaliseSentimento.analise_id).first() is not None:
+            print("Reconstruindo cs_estatistica_sentimento e cs_total_sentimento a partir das análises existentes")
+            reconstruir_estatisticas(db)
+    finally:
+        db.close()
+
+
+# Consultas de leitura gerais: leem cs_total_sentimento, uma linha por sentimento
+
+def contagem_por_sentimento(db: Session) -> list[tuple[str, int]]:
+    """
+    Retorna ``(sentimento, quantidade)`` de todas as análises, do mais frequente ao menos frequente.
+    """
+    return [
+        (dicionario_sentimentos.nome(codigo), int(quantidade))
+        for codigo, quantidade in db.query(Total.sentimento_id, Total.quantidade)
+            .filter(Total.quantidade > 0)
+            .order_by(Total.quantidade.desc())
+            .all()
+    ]
+
+
+def total_analises(db: Session) -> int:
+    return int(db.query(func.coalesce(func.sum(Total.quantidade), 0)).scalar())
+
+
+def menor_score_por_sentimento(db: Session, codigos) -> list[tuple[str, Decimal, int]]:
+    """
+    Para cada código de sentimento informado, retorna ``(sentimento, menor score, quantidade)``,
+    ordenado do menor score para o maior.
+    """
+    if not codigos:
+        return []
+    return [
+        (dicionario_sentimentos.nome(codigo), score, quantidade)
+        for codigo, score, quantidade in db.query(Total.sentimento_id, Total.score_min, Total.quantidade)
+            .filter(Total.sentimento_id.in_(codigos), Total.quantidade > 0)
+            .order_by(Total.score_min.is_(None), Total.score_min.asc())
+            .all()
+    ]
+
+
+
+def _media(soma, quantidade):
+    return round(float(soma) / quantidade, 4) if quantidade else None
+
+
+def _novo_acumulado() -> dict:
+    return {"quantidade": 0, "quantidade_score": 0, "soma_score": Decimal(0), "distribuicao": {}}
+
+
+def _acumular(acumulado: dict, sentimento_id, quantidade, quantidade_score, soma_score):
+    acumulado["quantidade"] += quantidade
+    acumulado["quantidade_score"] += quantidade_score
+    acumulado["soma_score"] += soma_score
+    acumulado["distribuicao"][sentimento_id] = acumulado["distribuicao"].get(sentimento_id, 0) + quantidade
+
+
+def _dominante(distribuicao: dict):
+    # Em empate, o menor código (o rótulo mais antigo) vence, para a resposta ser estável
+    return min(distribuicao, key=lambda codigo: (-distribuicao[codigo], codigo)) if distribuicao else None
+
+
+def _proporcao_negativa(acumulado: dict, negativos) -> float | None:
+    if not acumulado["quantidade"]:
+        return None
+    return sum(acumulado["distribuicao"].get(codigo, 0) for codigo in negativos) / acumulado["quantidade"]
+
+
+def _tendencia(recente: dict, anterior: dict, negativos, janela_dias: int) -> dict:
+    negativa_recente = _proporcao_negativa(recente, negativos)
+    negativa_anterior = _proporcao_negativa(anterior, negativos)
+    variacao = direcao = None
+    if negativa_recente is not None and negativa_anterior is not None:
+        variacao = round(negativa_recente - negativa_anterior, 4)
+        if variacao > PERFIL_LIMIAR_TENDENCIA:
+            direcao = "piora"
+        elif variacao < -PERFIL_LIMIAR_TENDENCIA:
+            direcao = "melhora"
+        else:
+            direcao = "estavel"
+    return {
+        "janela_dias": janela_dias,
+        "quantidade_recente": recente["quantidade"],
+        "quantidade_anterior": anterior["quantidade"],
+        "score_recente": _media(recente["soma_score"], recente["quantidade_score"]),
+        "score_anterior": _media(anterior["soma_score"], anterior["quantidade_score"]),
+        "negativos_recente": None if negativa_recente is None else round(negativa_recente, 4),
+        "negativos_anterior": None if negativa_anterior is None else round(negativa_anterior, 4),
+        "variacao_negativos": variacao,
+        "direcao": direcao,
+        "dominante_recente": dicionario_sentimentos.nome(_dominante(recente["distribuicao"])),
+    }
+
+
+def perfis(
+    db: Session,
+    coluna_id,
+    coluna_nome,
+    coluna_estatistica,
+    ids,
+    hoje: date | None = None,
+    janela_dias: int = PERFIL_JANELA_DIAS,
+) -> dict[int, dict]:
+    """
+    Agregados de sentimento de vários técnicos ou clientes em uma única consulta.
+
+    Junta a entidade (``coluna_id``/``coluna_nome``, de ``cs_agents`` ou ``cs_user``) com
+    a tabela de estatísticas por ``coluna_estatistica`` e agrupa por entidade, sentimento
+    e período (últimos ``janela_dias`` dias, os ``janela_dias`` anteriores e o restante).
+    O custo é proporcional a ids x sentimentos x dias com análises, não ao número de análises.
+
+    As estatísticas usam o ``agent_id``/``user_id`` gravado na análise.
+
+    Returns:
+        dict[int, dict]: Perfil de cada id encontrado; ids inexistentes ficam de fora.
+    """
+    if not ids:
+        return {}
+    hoje = hoje or date.today()
+    inicio_recente = hoje - timedelta(days=janela_dias - 1)
+    inicio_anterior = inicio_recente - timedelta(days=janela_dias)
+    # Datas e códigos como literais: com parâmetros, o PostgreSQL não reconhece a expressão
+    # do SELECT como a mesma do GROUP BY
+    periodo = case(
+        (Estatistica.dia >= literal_column(f"'{inicio_recente.isoformat()}'"), literal_column("2")),
+        (Estatistica.dia >= literal_column(f"'{inicio_anterior.isoformat()}'"), literal_column("1")),
+        else_=literal_column("0"),
+    ).label("periodo")
+    linhas = db.query(
+        coluna_id,
+        coluna_nome,
+        Estatistica.sentimento_id,
+        periodo,
+        func.sum(Estatistica.quantidade),
+        func.sum(Estatistica.quantidade_score),
+        func.sum(Estatistica.soma_score),
+        func.min(Estatistica.score_min),
+        func.max(Estatistica.score_max),
+    ).outerjoin(Estatistica, coluna_estatistica == coluna_id)\
+        .filter(coluna_id.in_(list(ids)))\
+        .group_by(coluna_id, coluna_nome, Estatistica.sentimento_id, periodo)\
+        .all()
+
+    negativos = dicionario_sentimentos.negativos(db)
+    grupos: dict[int, dict] = {}
+    for entidade_id, nome, sentimento_id, periodo_linha, quantidade, quantidade_score, soma, menor, maior in linhas:
+        grupo = grupos.get(entidade_id)
+        if grupo is None:
+            grupo = grupos[entidade_id] = {
+                "nome": nome, "total": _novo_acumulado(), "periodos": {1: _novo_acumulado(), 2: _novo_acumulado()},
+                "score_min": None, "score_max": None,
+            }
+        if sentimento_id is None:
+            # Entidade sem nenhuma análise (linha do outer join)
+            continue
+        quantidade, quantidade_score, soma = int(quantidade or 0), int(quantidade_score or 0), _decimal(soma or 0)
+        _acumular(grupo["total"], sentimento_id, quantidade, quantidade_score, soma)
+        if periodo_linha in grupo["periodos"]:
+            _acumular(grupo["periodos"][periodo_linha], sentimento_id, quantidade, quantidade_score, soma)
+        if menor is not None:
+            grupo["score_min"] = menor if grupo["score_min"] is None else min(grupo["score_min"], menor)
+        if maior is not None:
+            grupo["score_max"] = maior if grupo["score_max"] is None else max(grupo["score_max"], maior)
+
+    resultado = {}
+    for entidade_id, grupo in grupos.items():
+        total = grupo["total"]
+        distribuicao = sorted(total["distribuicao"].items(), key=lambda item: (-item[1], item[0]))
+        resultado[entidade_id] = {
+            "nome": grupo["nome"],
+            "quantidade": total["quantidade"],
+            "score_medio": _media(total["soma_score"], total["quantidade_score"]),
+            "score_min": None if grupo["score_min"] is None else float(grupo["score_min"]),
+            "score_max": None if grupo["score_max"] is None else float(grupo["score_max"]),
+            "distribuicao": {dicionario_sentimentos.nome(codigo): quantidade for codigo, quantidade in distribuicao},
+            "dominante": dicionario_sentimentos.nome(_dominante(total["distribuicao"])),
+            "tendencia": _tendencia(grupo["periodos"][2], grupo["periodos"][1], negativos, janela_dias),
+        }
+    return resultado
+
+
+def perfis_tecnicos(db: Session, ids, hoje: date | None = None) -> dict[int, dict]:
+    return perfis(db, models.Agent.agent_id, models.Agent.nome, Estatistica.agent_id, ids, hoje)
+
+
+def perfis_clientes(db: Session, ids, hoje: date | None = None) -> dict[int, dict]:
+    return perfis(db, models.User.user_id, models.User.name, Estatistica.user_id, ids, hoje)
+
+
+if __name__ == "__main__":
+    sessao = SessionLocal()
+    try:
+        reconstruir_estatisticas(sessao)
+        print("Estatísticas reconstruídas")
+    finally:
+        sessao.close()
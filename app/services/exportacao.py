@@ -0,0 +1,260 @@
+import argparse
+import csv
+import io
+import os
+import sys
+from datetime import date, timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..database import SessionLocal
+from .dicionario_sentimentos import dicionario_sentimentos
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+load_dotenv()
+
+EXPORTACAO_TAMANHO_LOTE = int(os.getenv("EXPORTACAO_TAMANHO_LOTE", "50000"))
+
+FORMATOS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+Analise = models.AnaliseSentimento
+Acao = models.Acao
+
+# (nome, coluna) na ordem de saída; ``sentimento`` sai como rótulo
+COLUNAS = (
+    ("analise_id", Analise.analise_id),
+    ("acao_id", Analise.acao_id),
+    ("event_id", Acao.event_id),
+    ("agent_id", Analise.agent_id),
+    ("user_id", Analise.user_id),
+    ("sentimento", Analise.sentimento_id),
+    ("score", Analise.score),
+    ("data_analise", Analise.data_analise),
+    ("data_acao", Acao.data_acao),
+)
+COLUNA_DESCRICAO = ("descricao", Acao.descricao)
+
+
+class PyArrowAusente(Exception):
+    pass
+
+
+def _schema(incluir_descricao: bool):
+    campos = [
+        ("analise_id", pa.int64()),
+        ("acao_id", pa.int64()),
+        ("event_id", pa.int64()),
+        ("agent_id", pa.int64()),
+        ("user_id", pa.int64()),
+        ("sentimento", pa.string()),
+        ("score", pa.float64()),
+        ("data_analise", pa.timestamp("us")),
+        ("data_acao", pa.timestamp("us")),
+    ]
+    if incluir_descricao:
+        campos.append(("descricao", pa.string()))
+    return pa.schema(campos)
+
+
+def verificar_formato(formato: str):
+    """
+    Valida o formato e, para Arrow/Parquet, se o pyarrow está instalado.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconhecido: {formato}")
+    if formato != "csv" and pa is None:
+        raise PyArrowAusente(f"A exportação em {formato} precisa do pacote pyarrow")
+
+
+def montar_consulta(
+    inicio: date | None = None,
+    fim: date | None = None,
+    score_min: float | None = None,
+    score_max: float | None = None,
+    incluir_descricao: bool = False,
+):
+    """
+    ``SELECT`` das análises com a ação, filtrado por data da análise (``inicio``/``fim``
+    inclusivos) e por faixa de score, em ordem de ``analise_id``.
+    """
+    colunas = [coluna for _, coluna in COLUNAS]
+    if incluir_descricao:
+        colunas.append(COLUNA_DESCRICAO[1])
+    consulta = select(*colunas).join(Acao, Acao.acao_id == Analise.acao_id)
+    if inicio is not None:
+        consulta = consulta.where(Analise.data_analise >= inicio)
+    if fim is not None:
+        consulta = consulta.where(Analise.data_analise < fim + timedelta(days=1))
+    if score_min is not None:
+        consulta = consulta.where(Analise.score >= score_min)
+    if score_max is not None:
+        consulta = consulta.where(Analise.score <= score_max)
+    return consulta.order_by(Analise.analise_id)
+
+
+def _lotes(consulta, tamanho_lote: int, session_factory):
+    """
+    Gera listas de até ``tamanho_lote`` linhas lidas com cursor do lado do servidor,
+    já com o rótulo do sentimento no lugar do código.
+    """
+    db: Session = session_factory()
+    try:
+        resultado = db.execute(consulta.execution_options(stream_results=True, yield_per=tamanho_lote))
+        indice_sentimento = 5
+        for lote in resultado.partitions():
+            linhas = []
+            for row in lote:
+                linha = list(row)
+                linha[indice_sentimento] = dicionario_sentimentos.nome(linha[indice_sentimento])
+                linhas.append(linha)
+            yield linhas
+    finally:
+        db.close()
+
+
+def _csv(lotes, nomes):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(nomes)
+    for lote in lotes:
+        writer.writerows(["" if valor is None else valor for valor in linha] for linha in lote)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _Saida(io.RawIOBase):
+    """
+    Destino de escrita do pyarrow que acumula os bytes até o gerador entregá-los.
+    """
+
+    def __init__(self):
+        self._partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def drenar(self) -> bytes:
+        dados = b"".join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+def _record_batch(lote, schema):
+    colunas = list(zip(*lote)) if lote else [[] for _ in schema]
+    score = schema.get_field_index("score")
+    arrays = []
+    for i, (campo, valores) in enumerate(zip(schema, colunas)):
+        if i == score:
+            valores = [None if valor is None else float(valor) for valor in valores]
+        arrays.append(pa.array(valores, type=campo.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _arrow(lotes, schema):
+    saida = _Saida()
+    with pa.ipc.new_stream(saida, schema) as writer:
+        for lote in lotes:
+            writer.write_batch(_record_batch(lote, schema))
+            yield saida.drenar()
+    yield saida.drenar()
+
+
+def _parquet(lotes, schema):
+    saida = _Saida()
+    with pq.ParquetWriter(saida, schema, compression="zstd") as writer:
+        for lote in lotes:
+            writer.write_batch(_record_batch(lote, schema))
+            yield saida.drenar()
+    # O rodapé (metadados dos row groups) só é escrito no fechamento
+    yield saida.drenar()
+
+
+def exportar(
+    formato: str = "csv",
+    inicio: date | None = None,
+    fim: date | None = None,
+    score_min: float | None = None,
+    score_max: float | None = None,
+    incluir_descricao: bool = False,
+    tamanho_lote: int = EXPORTACAO_TAMANHO_LOTE,
+    session_factory=SessionLocal,
+):
+    """
+    Gera a exportação em CSV, Arrow (stream IPC) ou Parquet, em pedaços de ``bytes``.
+
+    As linhas vêm de um cursor do lado do servidor em lotes de ``tamanho_lote``; cada
+    lote vira um pedaço de CSV, um record batch do Arrow ou um row group do Parquet
+    e é entregue antes de o próximo ser lido, então a memória fica limitada ao lote.
+    Arrow e Parquet precisam do pacote ``pyarrow``.
+
+    O gerador abre a própria sessão, como ``stream_sentimentos_ndjson``, porque é
+    consumido pela ``StreamingResponse`` depois que a rota retornou.
+
+    Raises:
+        ValueError: Formato desconhecido.
+        PyArrowAusente: Arrow ou Parquet sem o pyarrow instalado.
+    """
+    verificar_formato(formato)
+    consulta = montar_consulta(inicio, fim, score_min, score_max, incluir_descricao)
+    lotes = _lotes(consulta, tamanho_lote, session_factory)
+    if formato == "csv":
+        nomes = [nome for nome, _ in COLUNAS] + ([COLUNA_DESCRICAO[0]] if incluir_descricao else [])
+        return _csv(lotes, nomes)
+    schema = _schema(incluir_descricao)
+    if formato == "arrow":
+        return _arrow(lotes, schema)
+    return _parquet(lotes, schema)
+
+
+def _data(valor: str) -> date:
+    return date.fromisoformat(valor)
+
+
+# python -m app.services.exportacao --formato parquet --saida analises.parquet --inicio 2024-01-01
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta as análises de sentimento")
+    parser.add_argument("--formato", choices=sorted(FORMATOS), default="csv")
+    parser.add_argument("--saida", help="Arquivo de saída; sem ele, escreve na saída padrão")
+    parser.add_argument("--inicio", type=_data, help="Data inicial da análise (AAAA-MM-DD, inclusiva)")
+    parser.add_argument("--fim", type=_data, help="Data final da análise (AAAA-MM-DD, inclusiva)")
+    parser.add_argument("--score-min", type=float)
+    parser.add_argument("--score-max", type=float)
+    parser.add_argument("--incluir-descricao", action="store_true", help="Inclui o texto da ação")
+    parser.add_argument("--tamanho-lote", type=int, default=EXPORTACAO_TAMANHO_LOTE)
+    args = parser.parse_args()
+
+    try:
+        partes = exportar(
+            args.formato, args.inicio, args.fim, args.score_min, args.score_max,
+            args.incluir_descricao, args.tamanho_lote,
+        )
+    except PyArrowAusente as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    destino = open(args.saida, "wb") if args.saida else sys.stdout.buffer
+    try:
+        for parte in partes:
+            destino.write(parte)
+    finally:
+        if args.saida:
+            destino.close()
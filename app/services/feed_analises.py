@@ -0,0 +1,166 @@
+import asyncio
+import itertools
+import os
+import threading
+
+from dotenv import load_dotenv
+
+from ..respostas import codificar_json
+
+load_dotenv()
+
+FEED_MAX_ASSINANTES = int(os.getenv("FEED_MAX_ASSINANTES", "1000"))
+FEED_BUFFER_ASSINANTE = int(os.getenv("FEED_BUFFER_ASSINANTE", "256"))
+FEED_HEARTBEAT = float(os.getenv("FEED_HEARTBEAT", "15"))
+
+
+class Assinante:
+    """
+    Uma conexão aberta no feed, com seus filtros e uma fila limitada de eventos.
+
+    Quando a fila enche (cliente lento), o evento mais antigo é descartado e
+    contado em ``perdidos``; o cliente é avisado com um evento ``perdidos`` para
+    que possa se ressincronizar pelas rotas GET.
+    """
+
+    def __init__(self, identificador: int, agent_id: int | None, sentimento: str | None, tamanho: int):
+        self.identificador = identificador
+        self.agent_id = agent_id
+        self.sentimento = sentimento
+        self.fila: asyncio.Queue[bytes] = asyncio.Queue(maxsize=tamanho)
+        self.perdidos = 0
+        self.perdidos_total = 0
+
+    def aceita(self, linha: dict) -> bool:
+        if self.agent_id is not None and linha.get("agent_id") != self.agent_id:
+            return False
+        if self.sentimento is not None and linha.get("sentimento") != self.sentimento:
+            return False
+        return True
+
+    def entregar(self, evento: bytes):
+        if self.fila.full():
+            self.fila.get_nowait()
+            self.perdidos += 1
+            self.perdidos_total += 1
+        self.fila.put_nowait(evento)
+
+
+class FeedAnalises:
+    """
+    Distribui as análises recém-gravadas para os clientes conectados em
+    ``GET /sentimento/stream`` (server-sent events).
+
+    ``publicar`` pode ser chamado de qualquer thread (buffer de escrita, rotas
+    síncronas); a distribuição é feita no event loop da aplicação. Cada evento é
+    serializado uma única vez e a mesma sequência de bytes vai para todos os
+    assinantes cujos filtros aceitam a linha.
+
+    O feed é local ao processo: com vários workers, cada cliente recebe as
+    análises gravadas pelo worker em que está conectado e pelo buffer dele.
+
+    Args:
+        max_assinantes (int): Conexões simultâneas aceitas.
+        tamanho_buffer (int): Eventos guardados por assinante antes de descartar os mais antigos.
+    """
+
+    def __init__(self, max_assinantes: int = FEED_MAX_ASSINANTES, tamanho_buffer: int = FEED_BUFFER_ASSINANTE):
+        self.max_assinantes = max_assinantes
+        self.tamanho_buffer = tamanho_buffer
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._assinantes: dict[int, Assinante] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._metricas = {"publicados": 0, "entregues": 0, "descartados": 0, "recusados": 0}
+
+    def iniciar(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    def assinar(self, agent_id: int | None = None, sentimento: str | None = None) -> Assinante | None:
+        """
+        Registra um novo assinante. Deve ser chamado no event loop.
+
+        Returns:
+            Assinante | None: ``None`` se o limite de conexões foi atingido.
+        """
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        if len(self._assinantes) >= self.max_assinantes:
+            with self._lock:
+                self._metricas["recusados"] += 1
+            return None
+        assinante = Assinante(next(self._ids), agent_id, sentimento, self.tamanho_buffer)
+        self._assinantes[assinante.identificador] = assinante
+        return assinante
+
+    def cancelar(self, assinante: Assinante):
+        self._assinantes.pop(assinante.identificador, None)
+
+    def publicar(self, linhas: list[dict]):
+        """
+        Envia as análises gravadas aos assinantes. Não bloqueia quem grava:
+        sem assinantes, a chamada retorna sem serializar nada.
+        """
+        if not self._assinantes or self._loop is None or self._loop.is_closed():
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._distribuir, linhas)
+        except RuntimeError:
+            # Loop encerrado durante o desligamento
+            pass
+
+    def _distribuir(self, linhas: list[dict]):
+        entregues = 0
+        descartados = 0
+        assinantes = list(self._assinantes.values())
+        for linha in linhas:
+            evento = None
+            for assinante in assinantes:
+                if not assinante.aceita(linha):
+                    continue
+                if evento is None:
+                    evento = b"event: analise\ndata: " + codificar_json(linha) + b"\n\n"
+                cheia = assinante.fila.full()
+                assinante.entregar(evento)
+                entregues += 1
+                descartados += cheia
+        with self._lock:
+            self._metricas["publicados"] += len(linhas)
+            self._metricas["entregues"] += entregues
+            self._metricas["descartados"] += descartados
+
+    async def eventos(self, assinante: Assinante, desconectado, heartbeat: float = FEED_HEARTBEAT):
+        """
+        Gera os eventos SSE de um assinante até o cliente desconectar.
+
+        Args:
+            assinante (Assinante): Retornado por ``assinar``.
+            desconectado (callable): Corrotina que informa se o cliente fechou a conexão.
+            heartbeat (float): Intervalo, em segundos, dos comentários que mantêm a conexão viva.
+        """
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    evento = await asyncio.wait_for(assinante.fila.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    if await desconectado():
+                        return
+                    yield b": heartbeat\n\n"
+                    continue
+                if assinante.perdidos:
+                    yield b"event: perdidos\ndata: " + codificar_json({"quantidade": assinante.perdidos}) + b"\n\n"
+                    assinante.perdidos = 0
+                yield evento
+        finally:
+            self.cancelar(assinante)
+
+    def metricas(self) -> dict:
+        with self._lock:
+            dados = dict(self._metricas)
+        dados["assinantes"] = len(self._assinantes)
+        dados["eventos_pendentes"] = sum(a.fila.qsize() for a in list(self._assinantes.values()))
+        return dados
+
+
+feed_analises = FeedAnalises()
@@ -0,0 +1,80 @@
+import os
+import unicodedata
+from functools import lru_cache
+
+from dotenv import load_dotenv
+from sqlalchemy import column, delete, select, table, update
+
+load_dotenv()
+
+NORMALIZACAO_CACHE = int(os.getenv("NORMALIZACAO_CACHE", "4096"))
+
+# Marcas diacríticas combinantes (U+0300 a U+036F), que sobram depois da
+# decomposição NFD, e a pontuação removida dos rótulos: ', ", vírgula e ponto.
+_PONTUACAO = "'\".,"
+_TABELA_ASCII = str.maketrans("", "", _PONTUACAO)
+_TABELA = str.maketrans({**{chr(c): None for c in range(0x0300, 0x0370)}, **{c: None for c in _PONTUACAO}})
+
+
+@lru_cache(maxsize=NORMALIZACAO_CACHE)
+def normalizar_rotulo(rotulo: str) -> str:
+    """
+    Normaliza o rótulo de sentimento: minúsculas, sem acentos e sem pontuação.
+
+    O vocabulário de rótulos é pequeno, então o resultado fica memorizado e a
+    maior parte das chamadas é uma consulta ao dicionário do ``lru_cache``.
+
+    Args:
+        rotulo (str): Rótulo como veio do modelo de análise (ex.: ``"Frustração"``).
+
+    Returns:
+        str: Rótulo canônico (ex.: ``"frustracao"``).
+    """
+    rotulo = rotulo.lower()
+    if rotulo.isascii():
+        # Texto ASCII não tem o que decompor
+        return rotulo.translate(_TABELA_ASCII)
+    return unicodedata.normalize("NFD", rotulo).translate(_TABELA)
+
+
+def normalizar_rotulos(rotulos: list[str]) -> list[str]:
+    """
+    Normaliza uma lista de rótulos de uma vez, calculando cada rótulo distinto uma única vez.
+    """
+    canonicos = {rotulo: normalizar_rotulo(rotulo) for rotulo in set(rotulos)}
+    return [canonicos[rotulo] for rotulo in rotulos]
+
+
+# Definições mínimas das tabelas, para que a migração 0005 não dependa dos modelos atuais
+_ANALISES = table("cs_analise_sentimento", column("sentimento"))
+_ESTATISTICAS = table("cs_estatistica_sentimento")
+
+
+def canonizar_rotulos_gravados(conexao) -> dict[str, str]:
+    """
+    Regrava na forma canônica os rótulos de ``cs_analise_sentimento`` que
+    foram salvos antes da normalização.
+
+    Faz um ``UPDATE`` por rótulo distinto fora do padrão. Se algum for
+    alterado, a tabela de estatísticas é esvaziada para ser reconstruída com
+    os rótulos novos (``garantir_estatisticas`` faz isso na inicialização).
+    Não faz commit. Usada pela migração 0005; a partir da 0006 os rótulos ficam
+    em ``cs_sentimento`` e já são gravados na forma canônica.
+
+    Args:
+        conexao: ``Session`` ou ``Connection`` do SQLAlchemy.
+
+    Returns:
+        dict[str, str]: Rótulo antigo -> rótulo canônico, para os que mudaram.
+    """
+    tabela = _ANALISES
+    distintos = conexao.execute(
+        select(tabela.c.sentimento).where(tabela.c.sentimento.isnot(None)).distinct()
+    ).scalars().all()
+    alterados = {rotulo: normalizar_rotulo(rotulo) for rotulo in distintos if normalizar_rotulo(rotulo) != rotulo}
+    for antigo, canonico in alterados.items():
+        conexao.execute(update(tabela).where(tabela.c.sentimento == antigo).values(sentimento=canonico))
+    if alterados:
+        conexao.execute(delete(_ESTATISTICAS))
+    return alterados
+
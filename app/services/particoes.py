@@ -0,0 +1,191 @@
+import os
+import re
+import threading
+from datetime import date, datetime
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+from ..database import engine
+
+load_dotenv()
+
+TABELA = "cs_analise_sentimento"
+PARTICAO_PADRAO = f"{TABELA}_padrao"
+SCHEMA_ARQUIVO = os.getenv("PARTICOES_SCHEMA_ARQUIVO", "arquivo")
+MESES_FUTUROS = int(os.getenv("PARTICOES_MESES_FUTUROS", "3"))
+# 0 mantém todas as partições
+RETENCAO_MESES = int(os.getenv("PARTICOES_RETENCAO_MESES", "0"))
+# Com retenção ligada: true move as partições antigas para SCHEMA_ARQUIVO, false as apaga
+ARQUIVAR = os.getenv("PARTICOES_ARQUIVAR", "true").lower() == "true"
+INTERVALO_MANUTENCAO = float(os.getenv("PARTICOES_INTERVALO_MANUTENCAO", "86400"))
+
+_NOME_PARTICAO = re.compile(rf"^{TABELA}_(\d{{4}})_(\d{{2}})$")
+
+
+def inicio_mes(valor) -> date:
+    return date(valor.year, valor.month, 1)
+
+
+def proximo_mes(mes: date) -> date:
+    return date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+
+
+def _somar_meses(mes: date, meses: int) -> date:
+    total = mes.year * 12 + mes.month - 1 + meses
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def nome_particao(mes: date) -> str:
+    return f"{TABELA}_{mes.year:04d}_{mes.month:02d}"
+
+
+def criar_particao_mes(conexao, mes: date) -> bool:
+    """
+    Cria a partição do mês, se ainda não existir.
+
+    Returns:
+        bool: ``True`` se a partição foi criada agora.
+    """
+    nome = nome_particao(mes)
+    existe = conexao.execute(text("SELECT to_regclass(:nome) IS NOT NULL"), {"nome": nome}).scalar()
+    if existe:
+        return False
+    conexao.execute(text(
+        f"CREATE TABLE {nome} PARTITION OF {TABELA} "
+        f"FOR VALUES FROM ('{mes.isoformat()}') TO ('{proximo_mes(mes).isoformat()}')"
+    ))
+    return True
+
+
+def _particoes_mensais(conexao) -> list[tuple[str, date]]:
+    nomes = conexao.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "JOIN pg_namespace n ON n.oid = p.relnamespace "
+        "WHERE p.relname = :tabela AND n.nspname = current_schema()"
+    ), {"tabela": TABELA}).scalars().all()
+    particoes = []
+    for nome in nomes:
+        encontrado = _NOME_PARTICAO.match(nome)
+        if encontrado:
+            particoes.append((nome, date(int(encontrado.group(1)), int(encontrado.group(2)), 1)))
+    return sorted(particoes, key=lambda p: p[1])
+
+
+def particionada(conexao) -> bool:
+    return bool(conexao.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table t "
+        "JOIN pg_class c ON c.oid = t.partrelid "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE c.relname = :tabela AND n.nspname = current_schema())"
+    ), {"tabela": TABELA}).scalar())
+
+
+def manter_particoes(
+    hoje: date | None = None,
+    meses_futuros: int = MESES_FUTUROS,
+    retencao_meses: int = RETENCAO_MESES,
+    arquivar: bool = ARQUIVAR,
+) -> dict:
+    """
+    Garante as partições do mês atual e dos próximos ``meses_futuros`` meses e
+    aplica a retenção: partições que terminam antes de ``retencao_meses`` meses
+    atrás são desanexadas e movidas para o schema de arquivo (ou apagadas).
+
+    Não faz nada se o banco não for PostgreSQL ou a tabela não estiver particionada.
+    Cada partição é tratada na sua própria transação para que uma falha
+    (por exemplo, linhas do mês já presentes na partição DEFAULT) não impeça as demais.
+
+    Returns:
+        dict: Partições criadas, arquivadas e removidas.
+    """
+    resultado = {"criadas": [], "arquivadas": [], "removidas": [], "erros": []}
+    if engine.dialect.name != "postgresql":
+        return resultado
+    with engine.connect() as conexao:
+        if not particionada(conexao):
+            return resultado
+        conexao.commit()
+
+        mes = inicio_mes(hoje or datetime.now())
+        for _ in range(meses_futuros + 1):
+            try:
+                if criar_particao_mes(conexao, mes):
+                    resultado["criadas"].append(nome_particao(mes))
+                conexao.commit()
+            except Exception as e:
+                conexao.rollback()
+                resultado["erros"].append(f"{nome_particao(mes)}: {e}")
+            mes = proximo_mes(mes)
+
+        if retencao_meses > 0:
+            corte = _somar_meses(inicio_mes(hoje or datetime.now()), -retencao_meses)
+            for nome, mes in _particoes_mensais(conexao):
+                if proximo_mes(mes) > corte:
+                    continue
+                try:
+                    conexao.execute(text(f"ALTER TABLE {TABELA} DETACH PARTITION {nome}"))
+                    if arquivar:
+                        conexao.execute(text(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA_ARQUIVO}"))
+                        conexao.execute(text(f"ALTER TABLE {nome} SET SCHEMA {SCHEMA_ARQUIVO}"))
+                        resultado["arquivadas"].append(nome)
+                    else:
+                        conexao.execute(text(f"DROP TABLE {nome}"))
+                        resultado["removidas"].append(nome)
+                    conexao.commit()
+                except Exception as e:
+                    conexao.rollback()
+                    resultado["erros"].append(f"{nome}: {e}")
+
+    for erro in resultado["erros"]:
+        print(f"Erro na manutenção de partições: {erro}")
+    return resultado
+
+
+class ManutencaoParticoes:
+    """
+    Executa ``manter_particoes`` na inicialização e depois a cada ``intervalo`` segundos.
+    """
+
+    def __init__(self, intervalo: float = INTERVALO_MANUTENCAO):
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name="manutencao-particoes", daemon=True)
+
+    def iniciar(self):
+        self._thread.start()
+
+    def _executar(self):
+        while not self._parar.is_set():
+            try:
+                manter_particoes()
+            except Exception as e:
+                print(f"Erro na manutenção de partições: {repr(e)}")
+            self._parar.wait(self.intervalo)
+
+    def fechar(self):
+        self._parar.set()
+        self._thread.join(5)
+
+
+_manutencao: ManutencaoParticoes | None = None
+
+
+def iniciar_manutencao_particoes():
+    global _manutencao
+    if _manutencao is None and engine.dialect.name == "postgresql":
+        _manutencao = ManutencaoParticoes()
+        _manutencao.iniciar()
+
+
+def encerrar_manutencao_particoes():
+    global _manutencao
+    if _manutencao is not None:
+        _manutencao.fechar()
+        _manutencao = None
+
+
+if __name__ == "__main__":
+    print(manter_particoes())
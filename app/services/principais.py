@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+AUTH_CACHE_HABILITADO = os.getenv("AUTH_CACHE_HABILITADO", "true").lower() == "true"
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+AUTH_CACHE_MAX_ITENS = int(os.getenv("AUTH_CACHE_MAX_ITENS", "10000"))
+
+
+class CachePrincipais:
+    """
+    Cache dos usuários autenticados, indexado pelo próprio token.
+
+    Um acerto evita tanto a verificação da assinatura do JWT quanto a consulta
+    do usuário no banco. Cada item vale até ``ttl`` segundos ou até o ``exp``
+    do token, o que vier primeiro, e o item menos usado é descartado quando o
+    cache passa de ``max_itens``.
+
+    Revogações valem mesmo para tokens fora do cache: ``revogar_token`` guarda o
+    token até ele expirar e ``revogar_usuario`` recusa todos os tokens do
+    usuário emitidos antes da revogação (``iat``, com fração de segundo, comparado
+    a ``time.time()``). ``POST /logout`` revoga o token e ``POST /senha`` o usuário.
+    As revogações são locais ao processo; com vários workers, cada um precisa recebê-las.
+
+    Os usuários guardados são objetos desanexados da sessão e compartilhados
+    entre requisições, então não devem ser alterados por quem os recebe.
+
+    Args:
+        ttl (float): Tempo máximo, em segundos, que um token fica sem ser reverificado.
+        max_itens (int): Quantidade máxima de tokens guardados.
+        habilitado (bool): Quando falso, toda requisição verifica o token e consulta o banco.
+    """
+
+    def __init__(self, ttl: float = AUTH_CACHE_TTL, max_itens: int = AUTH_CACHE_MAX_ITENS,
+                 habilitado: bool = AUTH_CACHE_HABILITADO):
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self.habilitado = habilitado
+        self._itens: OrderedDict[str, tuple[float, str, float, object]] = OrderedDict()
+        self._tokens_revogados: dict[str, float] = {}
+        self._usuarios_revogados: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._metricas = {"acertos": 0, "erros": 0, "descartes": 0, "revogacoes": 0}
+
+    def obter(self, token: str):
+        """
+        Returns:
+            O usuário guardado para o token, ou ``None`` se for preciso verificá-lo de novo.
+        """
+        if not self.habilitado:
+            return None
+        with self._lock:
+            item = self._itens.get(token)
+            if item is None or item[0] < time.time():
+                if item is not None:
+                    del self._itens[token]
+                self._metricas["erros"] += 1
+                return None
+            self._itens.move_to_end(token)
+            self._metricas["acertos"] += 1
+            return item[3]
+
+    def gravar(self, token: str, payload: dict, usuario):
+        if not self.habilitado:
+            return
+        agora = time.time()
+        expira = agora + self.ttl
+        if payload.get("exp") is not None:
+            expira = min(expira, float(payload["exp"]))
+        with self._lock:
+            self._itens[token] = (expira, str(payload.get("sub")), float(payload.get("iat") or 0), usuario)
+            self._itens.move_to_end(token)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+                self._metricas["descartes"] += 1
+
+    def revogado(self, token: str, payload: dict) -> bool:
+        """
+        Indica se um token já verificado foi revogado, por ele mesmo ou pelo usuário.
+        """
+        with self._lock:
+            if token in self._tokens_revogados:
+                return True
+            revogado_em = self._usuarios_revogados.get(str(payload.get("sub")))
+            return revogado_em is not None and float(payload.get("iat") or 0) <= revogado_em
+
+    def revogar_token(self, token: str, expira_em: float | None = None):
+        """
+        Recusa o token a partir de agora (logout). Ele é esquecido depois de ``expira_em``.
+        """
+        with self._lock:
+            self._itens.pop(token, None)
+            self._tokens_revogados[token] = expira_em if expira_em is not None else time.time() + self.ttl
+            self._metricas["revogacoes"] += 1
+            self._limpar_revogados()
+
+    def revogar_usuario(self, user_id):
+        """
+        Recusa todos os tokens já emitidos para o usuário (troca de senha, remoção).
+        """
+        user_id = str(user_id)
+        with self._lock:
+            self._usuarios_revogados[user_id] = time.time()
+            for token in [t for t, item in self._itens.items() if item[1] == user_id]:
+                del self._itens[token]
+            self._metricas["revogacoes"] += 1
+
+    def _limpar_revogados(self):
+        agora = time.time()
+        for token in [t for t, expira in self._tokens_revogados.items() if expira < agora]:
+            del self._tokens_revogados[token]
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+    def metricas(self) -> dict:
+        with self._lock:
+            dados = dict(self._metricas)
+            dados["itens"] = len(self._itens)
+            dados["tokens_revogados"] = len(self._tokens_revogados)
+        consultas = dados["acertos"] + dados["erros"]
+        dados["taxa_acerto"] = round(dados["acertos"] / consultas, 4) if consultas else 0.0
+        return dados
+
+
+cache_principais = CachePrincipais()
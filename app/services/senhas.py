@@ -0,0 +1,172 @@
+import asyncio
+import getpass
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+from passlib.context import CryptContext
+
+load_dotenv()
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+SENHAS_THREADS = int(os.getenv("SENHAS_THREADS", str(min(4, os.cpu_count() or 1))))
+SENHAS_CONCORRENCIA = int(os.getenv("SENHAS_CONCORRENCIA", str(SENHAS_THREADS * 4)))
+SENHAS_ESPERA_MAX = float(os.getenv("SENHAS_ESPERA_MAX", "2"))
+
+# Hashes com custo diferente de BCRYPT_ROUNDS são marcados para atualização,
+# então mudar o custo faz cada usuário ser rehasheado no próximo login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+
+class SenhasOcupadas(Exception):
+    """
+    Lançada quando a fila de verificações de senha está cheia por mais de ``espera_max`` segundos.
+    """
+
+
+class PoolSenhas:
+    """
+    Executa o bcrypt (cerca de 100 ms de CPU por chamada) em um pool de threads
+    limitado, fora do event loop.
+
+    O pacote ``bcrypt`` libera o GIL durante o cálculo, então as demais rotas
+    continuam respondendo enquanto os logins são processados. ``concorrencia``
+    limita quantas verificações podem estar no pool ou esperando por ele; quem
+    não consegue vaga em ``espera_max`` segundos recebe ``SenhasOcupadas``, o
+    que evita que uma rajada de logins acumule uma fila sem fim.
+
+    Args:
+        threads (int): Threads que calculam hashes ao mesmo tempo.
+        concorrencia (int): Verificações aceitas ao mesmo tempo (em execução ou na fila).
+        espera_max (float): Tempo máximo, em segundos, esperando uma vaga.
+    """
+
+    def __init__(self, threads: int = SENHAS_THREADS, concorrencia: int = SENHAS_CONCORRENCIA,
+                 espera_max: float = SENHAS_ESPERA_MAX, contexto: CryptContext = pwd_context):
+        self.threads = threads
+        self.concorrencia = concorrencia
+        self.espera_max = espera_max
+        self.contexto = contexto
+        self._executor: ThreadPoolExecutor | None = None
+        self._semaforo: asyncio.Semaphore | None = None
+        self._lock = threading.Lock()
+        self._metricas = {
+            "verificacoes": 0,
+            "hashes": 0,
+            "rehashes": 0,
+            "recusadas": 0,
+            "em_andamento": 0,
+            "latencia_total_ms": 0.0,
+            "latencia_max_ms": 0.0,
+        }
+
+    def _obter_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _executar(self, funcao, *args):
+        if self._semaforo is None:
+            self._semaforo = asyncio.Semaphore(self.concorrencia)
+        try:
+            await asyncio.wait_for(self._semaforo.acquire(), timeout=self.espera_max)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._metricas["recusadas"] += 1
+            raise SenhasOcupadas("Muitas verificações de senha em andamento")
+
+        inicio = time.perf_counter()
+        with self._lock:
+            self._metricas["em_andamento"] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._obter_executor(), funcao, *args)
+        finally:
+            self._semaforo.release()
+            latencia = (time.perf_counter() - inicio) * 1000
+            with self._lock:
+                m = self._metricas
+                m["em_andamento"] -= 1
+                m["latencia_total_ms"] += latencia
+                m["latencia_max_ms"] = max(m["latencia_max_ms"], latencia)
+
+    async def verificar(self, senha: str, hash_senha: str) -> tuple[bool, str | None]:
+        """
+        Confere a senha e, se o hash usa um custo diferente do atual, calcula um novo.
+
+        Returns:
+            tuple[bool, str | None]: ``(senha_correta, novo_hash)``; ``novo_hash`` é
+            ``None`` quando o hash guardado já está atualizado.
+        """
+        correta, novo_hash = await self._executar(self.contexto.verify_and_update, senha, hash_senha)
+        with self._lock:
+            self._metricas["verificacoes"] += 1
+            if correta and novo_hash:
+                self._metricas["rehashes"] += 1
+        return correta, novo_hash if correta else None
+
+    async def gerar_hash(self, senha: str) -> str:
+        hash_senha = await self._executar(self.contexto.hash, senha)
+        with self._lock:
+            self._metricas["hashes"] += 1
+        return hash_senha
+
+    def metricas(self) -> dict:
+        with self._lock:
+            m = dict(self._metricas)
+        total = m.pop("latencia_total_ms")
+        chamadas = m["verificacoes"] + m["hashes"]
+        m["latencia_media_ms"] = round(total / chamadas, 3) if chamadas else 0.0
+        m["latencia_max_ms"] = round(m["latencia_max_ms"], 3)
+        m["threads"] = self.threads
+        m["concorrencia"] = self.concorrencia
+        return m
+
+    def fechar(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+pool_senhas = PoolSenhas()
+
+
+def encerrar_pool_senhas():
+    pool_senhas.fechar()
+
+
+# Define a senha de um usuário de cs_user (os existentes ficam sem senha depois da migração 0004):
+# python -m app.services.senhas <username>
+if __name__ == "__main__":
+    from sqlalchemy import select
+
+    from ..database import SessionLocal
+    from ..models import User
+
+    if len(sys.argv) != 2:
+        print("Uso: python -m app.services.senhas <username>", file=sys.stderr)
+        sys.exit(2)
+    senha = getpass.getpass("Nova senha: ")
+    if len(senha) < 8 or senha != getpass.getpass("Repita a senha: "):
+        print("As senhas não conferem ou têm menos de 8 caracteres", file=sys.stderr)
+        sys.exit(1)
+    with SessionLocal() as sessao:
+        usuario = sessao.execute(select(User).where(User.username == sys.argv[1])).scalars().first()
+        if usuario is None:
+            print(f"Usuário {sys.argv[1]} não encontrado", file=sys.stderr)
+            sys.exit(1)
+        usuario.hashed_password = pwd_context.hash(senha)
+        sessao.commit()
+    print(f"Senha de {sys.argv[1]} definida")
@@ -1,15 +1,33 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, contains_eager, selectinload
+from sqlalchemy import insert, text
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.schemas import Agent, Atendimento, SentimentoRecorrente, User
-from app.producers.producer import RabbitMQProducer
-from app.models import AnaliseSentimento
+from app.schemas import SentimentoRecorrente
+from app.producers.producer import RabbitMQProducer, obter_publisher
+from app.database import SessionLocal
 from .. import models
 from .. import schemas
+from . import estatisticas
+from .tendencias import invalidar_buckets_fechados
+from .cache import cache_rotas
+from .versao_dados import versao_dados
+from .feed_analises import feed_analises
+from .normalizacao import normalizar_rotulo as normalizar_sentimento, normalizar_rotulos
+from .dicionario_sentimentos import dicionario_sentimentos
+from .estatisticas import atualizar_estatisticas
 from fastapi.encoders import jsonable_encoder
-import re
-import unicodedata
+from ..respostas import codificar_json
+from ..telemetria import telemetria
+from datetime import date, datetime, timedelta
+import csv
+import io
+
+# Campos do resultado enviado pelo consumer e colunas gravadas em cs_analise_sentimento
+COLUNAS_RESULTADO = ("acao_id", "user_id", "agent_id", "sentimento", "score", "data_analise")
+COLUNAS_ANALISE = ("acao_id", "user_id", "agent_id", "sentimento_id", "score", "data_analise")
+# Campos dos eventos do feed (SSE), iguais para gravações individuais e em lote
+COLUNAS_EVENTO = ("analise_id", "acao_id", "user_id", "agent_id", "sentimento", "score", "data_analise")
 
 def salvar_analise(db: Session, analise: models.AnaliseSentimento):
     """
@@ -23,27 +41,154 @@ def salvar_analise(db: Session, analise: models.AnaliseSentimento):
         models.AnaliseSentimento: O objeto salvo no banco de dados.
     """
     try:
-        
-        def normalize_word(word: str) -> str:
-            # Convert to lowercase
-            word = word.lower()
-            # Normalize to NFD (decompose characters)
-            word = unicodedata.normalize('NFD', word)
-            # Remove diacritical marks
-            word = re.sub(r'[\u0300-\u036f]', '', word)
-            # Remove punctuation: ', ", ,, .
-            word = re.sub(r"[\'\".,]", '', word)
-            return word
-
-        analise.sentimento = normalize_word(analise.sentimento)
+        analise.sentimento = normalizar_sentimento(analise.sentimento)
+        analise.sentimento_id = dicionario_sentimentos.codigo(db, analise.sentimento)
+        if analise.data_analise is None:
+            analise.data_analise = datetime.now()
 
         db.add(analise)
+        linha = {coluna: getattr(analise, coluna) for coluna in COLUNAS_ANALISE}
+        linha["sentimento"] = analise.sentimento
+        atualizar_estatisticas(db, [linha])
         db.commit()
         db.refresh(analise)
-        return analise
     except SQLAlchemyError as e:
         db.rollback()
         raise Exception(f"Erro ao salvar a análise: {str(e)}")
+    linha["analise_id"] = analise.analise_id
+    _notificar_escrita([linha])
+    return analise
+
+def preparar_analise(dados: dict) -> dict:
+    """
+    Converte o resultado enviado pelo consumer em uma linha de ``cs_analise_sentimento``.
+
+    Valida os campos obrigatórios; a normalização do rótulo é feita para o lote
+    inteiro em ``salvar_analises_lote``.
+
+    Args:
+        dados (dict): Resultado da análise (acao_id, user_id, agent_id, sentimento, score, data_analise).
+
+    Returns:
+        dict: Linha com o rótulo em ``sentimento``; ``salvar_analises_lote`` o normaliza
+        e acrescenta o ``sentimento_id``.
+
+    Raises:
+        ValueError: Se ``acao_id`` ou ``sentimento`` estiverem ausentes ou a data for inválida.
+    """
+    if not isinstance(dados, dict):
+        raise ValueError("Resultado da análise deve ser um objeto JSON")
+    linha = {coluna: dados.get(coluna) for coluna in COLUNAS_RESULTADO}
+    if linha["acao_id"] is None:
+        raise ValueError("acao_id é obrigatório")
+    if not isinstance(linha["sentimento"], str) or not linha["sentimento"].strip():
+        raise ValueError("sentimento é obrigatório")
+    if linha["data_analise"] is None:
+        # data_analise é a chave de partição e não aceita nulos
+        linha["data_analise"] = datetime.now()
+    elif isinstance(linha["data_analise"], str):
+        try:
+            linha["data_analise"] = datetime.fromisoformat(linha["data_analise"].replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError("data_analise inválida")
+    return linha
+
+def _copiar_analises(db: Session, linhas: list[dict]):
+    """
+    Grava as linhas com ``COPY ... FROM STDIN`` (PostgreSQL + psycopg2).
+
+    O ``COPY`` não devolve os ids gerados, então eles são reservados antes na
+    sequência de ``analise_id`` e gravados junto com as linhas.
+    """
+    tabela = models.AnaliseSentimento.__tablename__
+    ids = db.execute(
+        text("SELECT nextval(pg_get_serial_sequence(:tabela, 'analise_id')) FROM generate_series(1, :quantidade)"),
+        {"tabela": tabela, "quantidade": len(linhas)}
+    ).scalars().all()
+    colunas = ("analise_id",) + COLUNAS_ANALISE
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for linha, analise_id in zip(linhas, ids):
+        linha["analise_id"] = analise_id
+        writer.writerow(["" if linha[c] is None else linha[c] for c in colunas])
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {tabela} ({', '.join(colunas)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+def salvar_analises_lote(db: Session, linhas: list[dict], usar_copy: bool = True):
+    """
+    Grava várias análises em uma única transação.
+
+    No PostgreSQL com psycopg2 usa ``COPY``; nos demais bancos um ``INSERT``
+    em lote (executemany). As linhas devem ter passado por ``preparar_analise``;
+    os rótulos são normalizados aqui, de uma vez para o lote, e cada linha
+    recebe o ``analise_id`` gerado.
+
+    Args:
+        db (Session): A sessão do banco de dados SQLAlchemy.
+        linhas (list[dict]): Linhas preparadas por ``preparar_analise``.
+        usar_copy (bool): Permite desligar o ``COPY`` mesmo no PostgreSQL.
+    """
+    if not linhas:
+        return
+    try:
+        rotulos = normalizar_rotulos([linha["sentimento"] for linha in linhas])
+        codigos = dicionario_sentimentos.codigos(db, set(rotulos))
+        for linha, rotulo in zip(linhas, rotulos):
+            linha["sentimento"] = rotulo
+            linha["sentimento_id"] = codigos[rotulo]
+        bind = db.get_bind()
+        if usar_copy and bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2":
+            _copiar_analises(db, linhas)
+        else:
+            valores = [{coluna: linha[coluna] for coluna in COLUNAS_ANALISE} for linha in linhas]
+            if bind.dialect.insert_executemany_returning_sort_by_parameter_order:
+                ids = db.execute(
+                    insert(models.AnaliseSentimento).returning(
+                        models.AnaliseSentimento.analise_id, sort_by_parameter_order=True
+                    ),
+                    valores
+                ).scalars().all()
+                for linha, analise_id in zip(linhas, ids):
+                    linha["analise_id"] = analise_id
+            else:
+                db.execute(insert(models.AnaliseSentimento), valores)
+        atualizar_estatisticas(db, linhas)
+        db.commit()
+    except Exception as e:
+        # O COPY usa o cursor do psycopg2 diretamente, então os erros não são SQLAlchemyError
+        db.rollback()
+        raise Exception(f"Erro ao salvar as análises: {str(e)}")
+    _notificar_escrita(linhas)
+
+def evento_analise(linha: dict) -> dict:
+    """
+    Evento do feed para uma análise gravada, com o rótulo vindo do dicionário.
+    """
+    evento = {coluna: linha.get(coluna) for coluna in COLUNAS_EVENTO}
+    evento["sentimento"] = dicionario_sentimentos.nome(linha["sentimento_id"])
+    return evento
+
+def _notificar_escrita(linhas: list[dict]):
+    """
+    Avisa o cache, a versão dos dados e o feed sobre linhas já confirmadas.
+
+    Fica fora da transação: uma falha aqui não pode fazer quem chamou achar que
+    as linhas não foram gravadas (o buffer as regravaria, duplicando-as).
+    """
+    try:
+        cache_rotas.invalidar_analises(linhas)
+        invalidar_buckets_fechados(linhas)
+        versao_dados.registrar_escrita()
+        feed_analises.publicar([evento_analise(linha) for linha in linhas])
+    except Exception as e:
+        print(f"Erro ao notificar a gravação de {len(linhas)} análises: {repr(e)}")
 
 
 # salvar analise 
@@ -56,12 +201,29 @@ def save_analise(db: Session, analise: models.AnaliseSentimento):
     publisher.close_connection()  
 
 def enviar_mensagem(acao: schemas.Acao):
+    """
+    Publica a ação para análise usando o publisher compartilhado da aplicação.
+    """
+    obter_publisher().publicar(jsonable_encoder(acao))
 
-    publisher = RabbitMQProducer()
-    
-    publisher.send_menssage(jsonable_encoder(acao))
+async def enviar_mensagem_async(acao: schemas.Acao):
+    """
+    Versão de ``enviar_mensagem`` que não bloqueia o event loop.
+    """
+    await obter_publisher().publicar_async(jsonable_encoder(acao))
+
+async def enviar_mensagens_lote(acoes: list[schemas.Acao]) -> list:
+    """
+    Publica várias ações em um único canal do RabbitMQ.
+
+    Args:
+        acoes (list[schemas.Acao]): Ações já validadas.
+
+    Returns:
+        list: Para cada ação, ``None`` se foi publicada ou a exceção ocorrida.
+    """
+    return await obter_publisher().publicar_lote_async([jsonable_encoder(acao) for acao in acoes])
 
-    publisher.close_connection()  
 # Pegar sentimentos
 def get_sentimentos(db: Session):
     """
@@ -71,14 +233,142 @@ def get_sentimentos(db: Session):
         db (Session): A sessão do banco de dados SQLAlchemy.
 
     Returns:
-        list[models.AnaliseSentimento]: Uma lista de todos os registros de AnaliseSentimento.
+        list[dict]: Uma lista com as colunas de todos os registros de AnaliseSentimento.
     """
     try: 
-        return db.query(models.AnaliseSentimento).all()
+        return [serializar_analise(row) for row in db.query(*COLUNAS_SENTIMENTO).all()]
     
     except SQLAlchemyError:
         raise Exception("Erro ao buscar os sentimentos")
 
+COLUNAS_SENTIMENTO = (
+    models.AnaliseSentimento.analise_id,
+    models.AnaliseSentimento.acao_id,
+    models.AnaliseSentimento.user_id,
+    models.AnaliseSentimento.agent_id,
+    models.AnaliseSentimento.sentimento_id,
+    models.AnaliseSentimento.score,
+    models.AnaliseSentimento.data_analise,
+)
+
+def serializar_analise(row) -> dict:
+    """
+    Converte uma linha de ``COLUNAS_SENTIMENTO`` em dicionário.
+
+    O código do sentimento volta a ser o rótulo pelo dicionário em memória. ``score``
+    (``Decimal``) e ``data_analise`` ficam como estão; ``codificar_json`` os converte.
+    """
+    analise_id, acao_id, user_id, agent_id, sentimento_id, score, data_analise = row
+    return {
+        "analise_id": analise_id,
+        "acao_id": acao_id,
+        "user_id": user_id,
+        "agent_id": agent_id,
+        "sentimento": dicionario_sentimentos.nome(sentimento_id),
+        "score": score,
+        "data_analise": data_analise,
+    }
+
+# Opções de carregamento para as listas que percorrem relacionamentos: sem elas, cada
+# ``analise.acao`` acessado dispara uma consulta por linha (N+1).
+# Use ``CARREGAR_ACAO_DO_JOIN`` quando a consulta já faz join com ``cs_acoes`` para filtrar.
+CARREGAR_ACAO = (selectinload(models.AnaliseSentimento.acao),)
+CARREGAR_ACAO_DO_JOIN = (contains_eager(models.AnaliseSentimento.acao),)
+
+def serializar_acao(acao: models.Acao | None) -> dict | None:
+    """
+    Converte uma ``models.Acao`` já carregada no formato de ``schemas.Acao``.
+    """
+    if acao is None:
+        return None
+    return {
+        "acao_id": acao.acao_id,
+        "event_id": acao.event_id,
+        "descricao": acao.descricao,
+        "agent_id": acao.agent_id,
+        "user_id": acao.user_id,
+        "data_acao": acao.data_acao,
+    }
+
+def serializar_analise_com_acao(analise: models.AnaliseSentimento) -> dict:
+    """
+    Converte uma ``models.AnaliseSentimento`` no formato de ``schemas.AnaliseSentimento``.
+    A ação deve ter sido carregada junto (``CARREGAR_ACAO*``).
+    """
+    dados = serializar_analise((
+        analise.analise_id, analise.acao_id, analise.user_id, analise.agent_id,
+        analise.sentimento_id, analise.score, analise.data_analise,
+    ))
+    dados["acao"] = serializar_acao(analise.acao)
+    return dados
+
+def get_sentimentos_pagina(db: Session, limite: int, apos: int | None = None, incluir_acao: bool = False):
+    """
+    Recupera uma página de sentimentos ordenada por ``analise_id`` (paginação por cursor).
+
+    Args:
+        db (Session): A sessão do banco de dados SQLAlchemy.
+        limite (int): Quantidade máxima de registros na página.
+        apos (int | None): ``analise_id`` do último registro da página anterior.
+        incluir_acao (bool): Inclui a ação de cada análise, carregada com ``selectinload``
+            (uma consulta a mais por página, não uma por linha).
+
+    Returns:
+        dict: ``items`` com os registros e ``proximo_cursor`` (``None`` na última página).
+    """
+    try:
+        if incluir_acao:
+            query = db.query(models.AnaliseSentimento).options(*CARREGAR_ACAO)
+        else:
+            query = db.query(*COLUNAS_SENTIMENTO)
+        if apos is not None:
+            query = query.filter(models.AnaliseSentimento.analise_id > apos)
+        rows = query.order_by(models.AnaliseSentimento.analise_id).limit(limite + 1).all()
+
+    except SQLAlchemyError:
+        raise Exception("Erro ao buscar os sentimentos")
+
+    serializar = serializar_analise_com_acao if incluir_acao else serializar_analise
+    items = [serializar(row) for row in rows[:limite]]
+    proximo = items[-1]["analise_id"] if len(rows) > limite else None
+    return {"items": items, "proximo_cursor": proximo}
+
+def _stream_ndjson(montar_query, serializar, tamanho_lote: int, session_factory):
+    """
+    Executa a query montada por ``montar_query(db)`` com cursor do lado do servidor
+    e gera cada linha serializada como NDJSON.
+
+    O gerador abre a própria sessão porque é consumido pela ``StreamingResponse``
+    depois que as dependências da rota já foram encerradas. Apenas ``tamanho_lote``
+    linhas ficam em memória por vez.
+    """
+    db = session_factory()
+    try:
+        query = montar_query(db).execution_options(stream_results=True, yield_per=tamanho_lote)
+        for row in query:
+            yield codificar_json(serializar(row)) + b"\n"
+    finally:
+        db.close()
+
+def stream_sentimentos_ndjson(apos: int | None = None, tamanho_lote: int = 1000, session_factory=SessionLocal):
+    """
+    Gera todos os sentimentos como linhas NDJSON usando um cursor do lado do servidor.
+
+    Args:
+        apos (int | None): Começa depois deste ``analise_id``.
+        tamanho_lote (int): Linhas buscadas do cursor a cada ida ao banco.
+
+    Yields:
+        bytes: Um registro JSON por linha.
+    """
+    def montar_query(db: Session):
+        query = db.query(*COLUNAS_SENTIMENTO)
+        if apos is not None:
+            query = query.filter(models.AnaliseSentimento.analise_id > apos)
+        return query.order_by(models.AnaliseSentimento.analise_id)
+
+    return _stream_ndjson(montar_query, serializar_analise, tamanho_lote, session_factory)
+
 # sentimentos recorrentes
 def sentimentos_recorrentes(db: Session):
     """
@@ -91,12 +381,7 @@ def sentimentos_recorrentes(db: Session):
         list[models.AnaliseSentimento]: Uma lista de todos os registros de AnaliseSentimento.
     """
     try: 
-        results = db.query(
-                models.AnaliseSentimento.sentimento,
-                func.count(models.AnaliseSentimento.sentimento).label("count")
-                ).group_by(models.AnaliseSentimento.sentimento)\
-                        .order_by(func.count(models.AnaliseSentimento.sentimento).desc())\
-                        .all()
+        results = estatisticas.contagem_por_sentimento(db)
     
     except SQLAlchemyError:
         raise Exception("Erro ao buscar os sentimentos")
@@ -105,207 +390,338 @@ def sentimentos_recorrentes(db: Session):
     return data
 
 # Sentimentos do técnico por id
-def get_sentimentos_por_id(id: int, db: Session):
+def get_sentimentos_por_id(id: int, db: Session, incluir_acao: bool = False):
     """
     Recupera os sentimentos associados a um técnico específico.
 
+    O técnico é o ``agent_id`` gravado na análise, o mesmo das estatísticas e de
+    ``/tecnico/{id}``.
+
     Args:
         db (Session): A sessão do banco de dados SQLAlchemy.
         tecnico_id (int): O ID do técnico.
+        incluir_acao (bool): Inclui a ação de cada análise (``acao`` de ``schemas.AnaliseSentimento``).
+            A ação vem do mesmo join usado no filtro (``contains_eager``), sem uma consulta por linha.
 
     Returns:
-        list[models.AnaliseSentimento]: Uma lista de registros de AnaliseSentimento associados ao técnico.
+        list[dict]: Os registros de AnaliseSentimento associados ao técnico.
     """
     try:
-        sentimentos = db.query(models.AnaliseSentimento)\
-                        .join(models.Acao)\
-                        .filter(models.Acao.agent_id == id).all()
+        if incluir_acao:
+            analises = db.query(models.AnaliseSentimento)\
+                            .join(models.AnaliseSentimento.acao)\
+                            .options(*CARREGAR_ACAO_DO_JOIN)\
+                            .filter(models.AnaliseSentimento.agent_id == id).all()
+
+            if not analises:
+                raise Exception("Nenhum sentimento encontrado")
+
+            return [serializar_analise_com_acao(analise) for analise in analises]
+
+        sentimentos = db.query(*COLUNAS_SENTIMENTO)\
+                        .filter(models.AnaliseSentimento.agent_id == id).all()
         
         if not sentimentos:
             raise Exception("Nenhum sentimento encontrado")
 
-        return sentimentos
+        return [serializar_analise(row) for row in sentimentos]
     
     except SQLAlchemyError:
         raise Exception("Erro ao buscar os sentimentos")
 
 # retornar uma lista de atendimentos incluindo informações como conversa o sentimento.
-def get_atendimento(db: Session):
+def _query_atendimento(
+    db: Session,
+    start: date | None = None,
+    end: date | None = None,
+    agent_id: int | None = None,
+    user_id: int | None = None,
+    apos: int | None = None,
+):
+    query = db.query(
+        models.AnaliseSentimento.analise_id,
+        models.Event.descricao.label("conversa"),
+        models.AnaliseSentimento.score,
+        models.AnaliseSentimento.sentimento_id,
+        models.Agent.nome.label("atendente"),
+        models.User.name.label("user"),
+        models.Acao.data_acao,
+        ).join(models.Acao, models.Acao.event_id == models.Event.event_id
+        ).join(models.AnaliseSentimento, models.AnaliseSentimento.acao_id == models.Acao.acao_id
+        ).join(models.Agent, models.Acao.agent_id == models.Agent.agent_id
+        ).join(models.User, models.Acao.user_id == models.User.user_id)
+
+    if start is not None:
+        query = query.filter(models.Acao.data_acao >= start)
+    if end is not None:
+        # ``end`` é inclusivo: entra o dia inteiro
+        query = query.filter(models.Acao.data_acao < end + timedelta(days=1))
+    if agent_id is not None:
+        query = query.filter(models.Acao.agent_id == agent_id)
+    if user_id is not None:
+        query = query.filter(models.Acao.user_id == user_id)
+    if apos is not None:
+        query = query.filter(models.AnaliseSentimento.analise_id > apos)
+    return query.order_by(models.AnaliseSentimento.analise_id)
+
+def serializar_atendimento(row) -> dict:
+    """
+    Monta o JSON de um atendimento direto de ``row._mapping``, sem instanciar ``Atendimento``.
+    """
+    m = row._mapping
+    data_acao = m["data_acao"]
+    score = m["score"]
+    return {
+        "conversa": m["conversa"],
+        "score": None if score is None else float(score),
+        "sentimento": dicionario_sentimentos.nome(m["sentimento_id"]),
+        "atendente": m["atendente"],
+        "user": m["user"],
+        "data_acao": None if data_acao is None else data_acao.isoformat(),
+    }
+
+def get_atendimento(
+    db: Session,
+    start: date | None = None,
+    end: date | None = None,
+    agent_id: int | None = None,
+    user_id: int | None = None,
+):
     """
     Recupera informações de atendimento incluindo conversas, sentimentos, atendentes, etc.
 
     Args:
         db (Session): A sessão do banco de dados SQLAlchemy.
+        start (date | None): Data inicial de ``data_acao`` (inclusiva).
+        end (date | None): Data final de ``data_acao`` (inclusiva).
+        agent_id (int | None): Filtra por técnico.
+        user_id (int | None): Filtra por cliente.
 
     Returns:
-        list[tuple]: Uma lista de tuplas contendo informações de atendimento.
+        list[dict]: Uma lista de atendimentos no formato de ``Atendimento``.
     """
     try: 
-        results = db.query(
-            models.Event.descricao.label("conversa"),
-            models.AnaliseSentimento.score,
-            models.AnaliseSentimento.sentimento.label("sentimento"),
-            models.Agent.nome.label("atendente"),
-            models.User.name.label("user"),
-            models.Acao.data_acao,
-            ).join(models.Acao, models.Acao.event_id == models.Event.event_id
-            ).join(models.AnaliseSentimento, models.AnaliseSentimento.acao_id == models.Acao.acao_id
-            ).join(models.Agent, models.Acao.agent_id == models.Agent.agent_id
-            ).join(models.User, models.Acao.user_id == models.User.user_id
-            ).all()
-                        
+        results = _query_atendimento(db, start, end, agent_id, user_id).all()
     
     except SQLAlchemyError:
         raise Exception("Erro ao buscar os sentimentos")
 
-    data = [Atendimento(**row._mapping) for row in results]
-    return data
+    with telemetria.medir("serializar_atendimento"):
+        return [serializar_atendimento(row) for row in results]
+
+def get_atendimento_pagina(
+    db: Session,
+    limite: int,
+    apos: int | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    agent_id: int | None = None,
+    user_id: int | None = None,
+):
+    """
+    Recupera uma página de atendimentos, com os filtros aplicados no SQL.
+
+    O cursor é o ``analise_id`` da última linha devolvida.
+
+    Returns:
+        dict: ``items`` com os atendimentos e ``proximo_cursor`` (``None`` na última página).
+    """
+    try:
+        rows = _query_atendimento(db, start, end, agent_id, user_id, apos).limit(limite + 1).all()
+
+    except SQLAlchemyError:
+        raise Exception("Erro ao buscar os sentimentos")
+
+    proximo = rows[limite - 1].analise_id if len(rows) > limite else None
+    return {"items": [serializar_atendimento(row) for row in rows[:limite]], "proximo_cursor": proximo}
+
+def stream_atendimento_ndjson(
+    start: date | None = None,
+    end: date | None = None,
+    agent_id: int | None = None,
+    user_id: int | None = None,
+    apos: int | None = None,
+    tamanho_lote: int = 1000,
+    session_factory=SessionLocal,
+):
+    """
+    Gera os atendimentos filtrados como linhas NDJSON usando um cursor do lado do servidor.
+    """
+    return _stream_ndjson(
+        lambda db: _query_atendimento(db, start, end, agent_id, user_id, apos),
+        serializar_atendimento,
+        tamanho_lote,
+        session_factory
+    )
+
+def _agregados(perfil: dict) -> dict:
+    return {
+        "quantidade": perfil["quantidade"],
+        "score_medio": perfil["score_medio"],
+        "score_min": perfil["score_min"],
+        "score_max": perfil["score_max"],
+        "distribuicao": perfil["distribuicao"],
+        "dominante": perfil["dominante"],
+        "tendencia": perfil["tendencia"],
+    }
+
+def serializar_perfil_tecnico(agent_id: int, perfil: dict) -> dict:
+    """
+    Monta o JSON de ``PerfilTecnico``. Os campos de ``Agent`` continuam presentes:
+    ``sentimento``/``termo`` são o sentimento dominante e ``sentimento_clientes`` o
+    dominante da janela recente (ou o geral, se não houver análises recentes).
+    """
+    dominante = perfil["dominante"]
+    return {
+        "agent_id": agent_id,
+        "atendente": perfil["nome"],
+        "sentimento": dominante,
+        "sentimento_clientes": perfil["tendencia"]["dominante_recente"] or dominante,
+        "termo": dominante,
+        "score": perfil["score_medio"],
+        **_agregados(perfil),
+    }
+
+def serializar_perfil_cliente(user_id: int, perfil: dict) -> dict:
+    """
+    Monta o JSON de ``PerfilCliente``; ``sentimento``/``termo`` são o sentimento dominante.
+    """
+    dominante = perfil["dominante"]
+    return {
+        "user_id": user_id,
+        "cliente": perfil["nome"],
+        "sentimento": dominante,
+        "termo": dominante,
+        "score": perfil["score_medio"],
+        **_agregados(perfil),
+    }
+
+def _perfis_lote(db: Session, ids: list[int], calcular, serializar) -> dict:
+    try:
+        perfis = calcular(db, ids)
+    except SQLAlchemyError:
+        raise Exception("Erro ao buscar os sentimentos")
+    return {
+        "items": [serializar(id, perfis[id]) for id in ids if id in perfis],
+        "nao_encontrados": [id for id in ids if id not in perfis],
+    }
 
 # Buscar técnico por id
 def get_tecnico(id: int, db: Session):
     """
-    Recupera informações de um técnico específico.
+    Recupera o perfil de um técnico: média, mínimo e máximo do score, distribuição
+    dos sentimentos, sentimento dominante e tendência recente, em uma única consulta
+    agrupada sobre a tabela de estatísticas.
 
     Args:
         db (Session): A sessão do banco de dados SQLAlchemy.
         tecnico_id (int): O ID do técnico.
 
     Returns:
-        models.Agent | None: As informações do técnico ou None se não encontrado.
+        dict: O perfil no formato de ``PerfilTecnico``.
     """
-    try: 
-        if not id or id <= 0:
-            raise Exception("ID inválido")
-        
-        agente = db.query(
-                models.Agent.nome.label("atendente"),
-                models.AnaliseSentimento.sentimento.label("sentimento"),
-                models.AnaliseSentimento.sentimento.label("sentimento_clientes"),
-                models.AnaliseSentimento.sentimento.label("termo"),
-                models.AnaliseSentimento.score
-                ).join(models.Acao, models.Acao.agent_id == models.Agent.agent_id)\
-                        .join(models.AnaliseSentimento, models.AnaliseSentimento.acao_id == models.Acao.acao_id)\
-                        .filter(models.Agent.agent_id == id).first()
-
-        if agente is None:
-            raise Exception("Nenhum tecnico encontrado")
-    
-    except SQLAlchemyError:
-        raise Exception("Erro ao buscar os sentimentos")
+    if not id or id <= 0:
+        raise Exception("ID inválido")
+
+    perfis = _perfis_lote(db, [id], estatisticas.perfis_tecnicos, serializar_perfil_tecnico)["items"]
+    if not perfis:
+        raise Exception("Nenhum tecnico encontrado")
+    return perfis[0]
 
-    return Agent(**agente._asdict())
+def get_tecnicos_perfis(ids: list[int], db: Session):
+    """
+    Perfis de vários técnicos de uma vez (rankings), na mesma consulta de ``get_tecnico``.
+
+    Returns:
+        dict: ``items`` na ordem dos ids pedidos e ``nao_encontrados``.
+    """
+    return _perfis_lote(db, ids, estatisticas.perfis_tecnicos, serializar_perfil_tecnico)
 
 # Buscar cliente por id 
 
 def get_cliente(id: int, db: Session):
     """
-    Recupera informações de um cliente específico.
+    Recupera o perfil de um cliente, com os mesmos agregados de ``get_tecnico``.
 
     Args:
         db (Session): A sessão do banco de dados SQLAlchemy.
         cliente_id (int): O ID do cliente.
 
     Returns:
-        models.User | None: As informações do cliente ou None se não encontrado.
+        dict: O perfil no formato de ``PerfilCliente``.
     """
-    
-    try: 
-        if not id or id <= 0:
-            raise Exception("ID inválido")
-            
-        cliente = db.query(
-                models.User.name.label("cliente"),
-                models.AnaliseSentimento.sentimento,
-                models.AnaliseSentimento.sentimento.label("termo"),
-                models.AnaliseSentimento.score
-                ).join(models.Acao, models.Acao.user_id == models.User.user_id)\
-                        .join(models.AnaliseSentimento, models.AnaliseSentimento.acao_id == models.Acao.acao_id)\
-                        .filter(models.User.user_id == id).first()
-
-        if cliente is None:
-            raise Exception("Nenhum cliente encontrado")
-    
-    except SQLAlchemyError:
-        raise Exception("Erro ao buscar os sentimentos")
+    if not id or id <= 0:
+        raise Exception("ID inválido")
+
+    perfis = _perfis_lote(db, [id], estatisticas.perfis_clientes, serializar_perfil_cliente)["items"]
+    if not perfis:
+        raise Exception("Nenhum cliente encontrado")
+    return perfis[0]
+
+def get_clientes_perfis(ids: list[int], db: Session):
+    """
+    Perfis de vários clientes de uma vez, na mesma consulta de ``get_cliente``.
+    """
+    return _perfis_lote(db, ids, estatisticas.perfis_clientes, serializar_perfil_cliente)
 
-    return User(**cliente._asdict())
+COLUNAS_TECNICO = (models.Agent.agent_id, models.Agent.nome, models.Agent.email, models.Agent.username)
+COLUNAS_CLIENTE = (models.User.user_id, models.User.name, models.User.email, models.User.username)
 
 def get_tecnicos(db: Session):
-    return db.query(models.Agent).all()
+    return [dict(row._mapping) for row in db.query(*COLUNAS_TECNICO).all()]
 
 def get_clientes(db: Session):
-    return db.query(models.User).all()
+    return [dict(row._mapping) for row in db.query(*COLUNAS_CLIENTE).all()]
 
 def get_sentimentos_by_score(min_score: float, max_score: float, db: Session):
-    return db.query(models.AnaliseSentimento).filter(
+    return [serializar_analise(row) for row in db.query(*COLUNAS_SENTIMENTO).filter(
         models.AnaliseSentimento.score >= min_score,
         models.AnaliseSentimento.score <= max_score
-    ).all()
+    ).all()]
 
 def get_sentimentos_by_data(start: str, end: str, db: Session):
     start_date = start
     end_date = end
-    return db.query(models.AnaliseSentimento).filter(
+    return [serializar_analise(row) for row in db.query(*COLUNAS_SENTIMENTO).filter(
         models.AnaliseSentimento.data_analise >= start_date,
         models.AnaliseSentimento.data_analise <= end_date
-    ).all()
+    ).all()]
 
 # Sentimento negativo com o menor score
 def get_sentimento_mais_negativo(db: Session):
-    sentimentos_negativos = ["raiva", "frustração", "confusão", "urgência"]
-    
-    total_count = db.query(func.count(models.AnaliseSentimento.analise_id)).scalar()
+    total_count = estatisticas.total_analises(db)
 
     if total_count == 0:
         return None
 
-    resultado = db.query(models.AnaliseSentimento).filter(
-        func.lower(models.AnaliseSentimento.sentimento).in_(
-            [s.lower() for s in sentimentos_negativos]
-        )
-    ).order_by(models.AnaliseSentimento.score.asc()).first()
+    # Os rótulos negativos são os marcados com ``negativo`` em cs_sentimento
+    resultado = estatisticas.menor_score_por_sentimento(db, dicionario_sentimentos.negativos(db))
 
     if not resultado:
         return None
 
-    count_sentimento = db.query(func.count(models.AnaliseSentimento.analise_id)).filter(
-        func.lower(models.AnaliseSentimento.sentimento) == resultado.sentimento.lower()
-    ).scalar()
+    sentimento, score, count_sentimento = resultado[0]
 
     percentage = (count_sentimento / total_count) * 100
 
     return {
-        "sentimento": resultado.sentimento,
-        "score": resultado.score,
+        "sentimento": sentimento,
+        "score": score,
         "porcentagem": round(percentage, 2)
     }
 
 def get_quantidade_sentimentos(db: Session):
     """
-    Conta a quantidade de cada sentimento no banco de dados.
+    Conta a quantidade de análises de sentimento no banco de dados.
     """
-    # Agrupar os sentimentos e contar a quantidade de cada um
-    result = db.query(AnaliseSentimento.sentimento, func.count(AnaliseSentimento.sentimento).label('quantidade'))\
-               .group_by(AnaliseSentimento.sentimento)\
-               .all()
-    
-    return db.query(models.AnaliseSentimento).count()
+    return estatisticas.total_analises(db)
 
 def get_sentimento_mais_frequente(db):
-    total = db.query(func.count(AnaliseSentimento.sentimento)).scalar()
-
-    resultado = db.query(
-        AnaliseSentimento.sentimento,
-        func.count(AnaliseSentimento.sentimento).label("quantidade")
-    ).group_by(
-        AnaliseSentimento.sentimento
-    ).order_by(
-        func.count(AnaliseSentimento.sentimento).desc()
-    ).first()
-
-    if resultado:
-        sentimento = resultado[0]
-        quantidade = resultado[1]
+    contagens = estatisticas.contagem_por_sentimento(db)
+    total = sum(quantidade for _, quantidade in contagens)
+
+    if contagens:
+        sentimento, quantidade = contagens[0]
         porcentagem = round((quantidade / total) * 100, 2) if total else 0
 
         return {
@@ -315,3 +731,83 @@ def get_sentimento_mais_frequente(db):
         }
     else:
         return {"message": "Não há sentimentos registrados ainda."}
+
+# Versões assíncronas
+#
+# Executam as mesmas consultas acima em uma ``AsyncSession`` via ``run_sync``:
+# o SQL é o mesmo, mas o I/O passa pelo driver assíncrono (asyncpg/aiosqlite)
+# e não bloqueia o event loop.
+
+async def salvar_analise_async(db: AsyncSession, analise: models.AnaliseSentimento):
+    return await db.run_sync(lambda s: salvar_analise(s, analise))
+
+async def salvar_analises_lote_async(db: AsyncSession, linhas: list[dict]):
+    # COPY depende do cursor do psycopg2, então o caminho assíncrono usa INSERT em lote
+    return await db.run_sync(lambda s: salvar_analises_lote(s, linhas, usar_copy=False))
+
+async def get_sentimentos_async(db: AsyncSession):
+    return await db.run_sync(get_sentimentos)
+
+async def get_sentimentos_pagina_async(db: AsyncSession, limite: int, apos: int | None = None, incluir_acao: bool = False):
+    return await db.run_sync(lambda s: get_sentimentos_pagina(s, limite, apos, incluir_acao))
+
+async def sentimentos_recorrentes_async(db: AsyncSession):
+    return await db.run_sync(sentimentos_recorrentes)
+
+async def get_sentimentos_por_id_async(id: int, db: AsyncSession, incluir_acao: bool = False):
+    return await db.run_sync(lambda s: get_sentimentos_por_id(id, s, incluir_acao))
+
+async def get_atendimento_async(
+    db: AsyncSession,
+    start: date | None = None,
+    end: date | None = None,
+    agent_id: int | None = None,
+    user_id: int | None = None,
+):
+    return await db.run_sync(lambda s: get_atendimento(s, start, end, agent_id, user_id))
+
+async def get_atendimento_pagina_async(
+    db: AsyncSession,
+    limite: int,
+    apos: int | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    agent_id: int | None = None,
+    user_id: int | None = None,
+):
+    return await db.run_sync(
+        lambda s: get_atendimento_pagina(s, limite, apos, start, end, agent_id, user_id)
+    )
+
+async def get_tecnico_async(id: int, db: AsyncSession):
+    return await db.run_sync(lambda s: get_tecnico(id, s))
+
+async def get_cliente_async(id: int, db: AsyncSession):
+    return await db.run_sync(lambda s: get_cliente(id, s))
+
+async def get_tecnicos_perfis_async(ids: list[int], db: AsyncSession):
+    return await db.run_sync(lambda s: get_tecnicos_perfis(ids, s))
+
+async def get_clientes_perfis_async(ids: list[int], db: AsyncSession):
+    return await db.run_sync(lambda s: get_clientes_perfis(ids, s))
+
+async def get_tecnicos_async(db: AsyncSession):
+    return await db.run_sync(get_tecnicos)
+
+async def get_clientes_async(db: AsyncSession):
+    return await db.run_sync(get_clientes)
+
+async def get_sentimentos_by_score_async(min_score: float, max_score: float, db: AsyncSession):
+    return await db.run_sync(lambda s: get_sentimentos_by_score(min_score, max_score, s))
+
+async def get_sentimentos_by_data_async(start: date, end: date, db: AsyncSession):
+    return await db.run_sync(lambda s: get_sentimentos_by_data(start, end, s))
+
+async def get_sentimento_mais_negativo_async(db: AsyncSession):
+    return await db.run_sync(get_sentimento_mais_negativo)
+
+async def get_quantidade_sentimentos_async(db: AsyncSession):
+    return await db.run_sync(get_quantidade_sentimentos)
+
+async def get_sentimento_mais_frequente_async(db: AsyncSession):
+    return await db.run_sync(get_sentimento_mais_frequente)
@@ -0,0 +1,255 @@
+import os
+from datetime import date, datetime, time, timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy import func, literal_column
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .. import models
+from .cache import cache_rotas
+from .dicionario_sentimentos import dicionario_sentimentos
+from .estatisticas import SEM_ID
+
+load_dotenv()
+
+# Tempo, em segundos, que a parte encerrada do intervalo fica no cache das rotas; análises
+# gravadas com data já encerrada (resultados atrasados) a invalidam antes disso
+TENDENCIA_TTL_FECHADOS = int(os.getenv("TENDENCIA_TTL_FECHADOS", "3600"))
+# max-age de intervalos inteiramente encerrados: navegador e proxy não recebem a invalidação
+TENDENCIA_MAX_AGE = int(os.getenv("TENDENCIA_MAX_AGE", "60"))
+# Quantidade máxima de buckets por requisição (um ano por hora passa de 8 mil)
+TENDENCIA_MAX_BUCKETS = int(os.getenv("TENDENCIA_MAX_BUCKETS", "2000"))
+
+GRANULARIDADES = {"hora": timedelta(hours=1), "dia": timedelta(days=1), "semana": timedelta(weeks=1)}
+# Agrupamento opcional -> coluna da análise/estatística
+AGRUPAMENTOS = {"tecnico": "agent_id", "cliente": "user_id"}
+TAG_TENDENCIA = "tendencia"
+
+Analise = models.AnaliseSentimento
+Estatistica = models.EstatisticaSentimento
+
+
+def inicio_bucket(momento: datetime, granularidade: str) -> datetime:
+    """
+    Início do bucket que contém ``momento`` (semanas começam na segunda-feira, como no ``date_trunc``).
+    """
+    if granularidade == "hora":
+        return momento.replace(minute=0, second=0, microsecond=0)
+    inicio = datetime.combine(momento.date(), time())
+    if granularidade == "semana":
+        inicio -= timedelta(days=inicio.weekday())
+    return inicio
+
+
+def formatar_bucket(valor, granularidade: str) -> str:
+    """
+    Converte o bucket devolvido pelo banco (``datetime`` no PostgreSQL, texto no SQLite) em ISO 8601.
+    """
+    if isinstance(valor, str):
+        valor = datetime.fromisoformat(valor)
+    elif isinstance(valor, date) and not isinstance(valor, datetime):
+        valor = datetime.combine(valor, time())
+    if granularidade == "hora":
+        return valor.replace(tzinfo=None).isoformat()
+    return valor.date().isoformat()
+
+
+def invalidar_buckets_fechados(linhas: list[dict], agora: datetime | None = None):
+    """
+    Descarta do cache, por granularidade, os intervalos encerrados em que alguma das
+    análises recém-gravadas caiu (``data_analise`` anterior ao bucket corrente).
+    """
+    datas = []
+    for linha in linhas:
+        data = linha.get("data_analise")
+        if isinstance(data, datetime):
+            # A coluna é TIMESTAMP sem fuso; datas com fuso vão para a hora local, como no banco
+            datas.append(data.astimezone().replace(tzinfo=None) if data.tzinfo else data)
+    if not datas:
+        return
+    agora = agora or datetime.now()
+    mais_antiga = min(datas)
+    tags = [f"{TAG_TENDENCIA}:{g}" for g in GRANULARIDADES if mais_antiga < inicio_bucket(agora, g)]
+    if tags:
+        cache_rotas.invalidar(tags)
+
+
+def buckets_do_intervalo(inicio: datetime, fim: datetime, granularidade: str) -> list[str]:
+    passo = GRANULARIDADES[granularidade]
+    atual = inicio_bucket(inicio, granularidade)
+    buckets = []
+    while atual < fim:
+        buckets.append(formatar_bucket(atual, granularidade))
+        atual += passo
+    return buckets
+
+
+def _expressao_bucket(dialeto: str, granularidade: str, coluna):
+    # A unidade vai como literal: com parâmetro, o PostgreSQL não reconhece a expressão
+    # do SELECT como a mesma do GROUP BY
+    if dialeto == "postgresql":
+        unidade = {"hora": "hour", "dia": "day", "semana": "week"}[granularidade]
+        return func.date_trunc(literal_column(f"'{unidade}'"), coluna)
+    if dialeto == "sqlite":
+        if granularidade == "hora":
+            return func.strftime(literal_column("'%Y-%m-%d %H:00:00'"), coluna)
+        if granularidade == "dia":
+            return func.date(coluna)
+        return func.date(coluna, literal_column("'weekday 0'"), literal_column("'-6 days'"))
+    raise Exception(f"Tendência não suportada no banco {dialeto}")
+
+
+def consultar_buckets(
+    db: Session,
+    granularidade: str,
+    inicio: datetime,
+    fim: datetime,
+    agrupar: str | None = None,
+    agent_id: int | None = None,
+    user_id: int | None = None,
+) -> list[list]:
+    """
+    Agrega as análises de ``[inicio, fim)`` por bucket, sentimento e, opcionalmente, técnico ou cliente.
+
+    ``dia`` e ``semana`` leem a tabela de estatísticas (já agregada por dia);
+    ``hora`` precisa de ``cs_analise_sentimento``, filtrada pelo índice de ``data_analise``.
+
+    Returns:
+        list[list]: ``[bucket, sentimento_id, grupo, quantidade, quantidade_score, soma_score]``,
+        só com tipos JSON para poder ir ao cache.
+    """
+    dialeto = db.get_bind().dialect.name
+    if granularidade == "hora":
+        tabela, coluna_data = Analise, Analise.data_analise
+        limites = (coluna_data >= inicio, coluna_data < fim)
+        agregados = (func.count(), func.count(Analise.score), func.coalesce(func.sum(Analise.score), 0))
+    else:
+        tabela, coluna_data = Estatistica, Estatistica.dia
+        limites = (coluna_data >= inicio.date(), coluna_data < fim.date())
+        agregados = (
+            func.sum(Estatistica.quantidade),
+            func.sum(Estatistica.quantidade_score),
+            func.sum(Estatistica.soma_score),
+        )
+
+    bucket = _expressao_bucket(dialeto, granularidade, coluna_data).label("bucket")
+    chaves = [bucket, tabela.sentimento_id]
+    if agrupar:
+        chaves.append(getattr(tabela, AGRUPAMENTOS[agrupar]))
+    query = db.query(*chaves, *agregados).filter(*limites)
+    if agent_id is not None:
+        query = query.filter(tabela.agent_id == agent_id)
+    if user_id is not None:
+        query = query.filter(tabela.user_id == user_id)
+
+    try:
+        linhas = query.group_by(*chaves).all()
+    except SQLAlchemyError:
+        raise Exception("Erro ao buscar os sentimentos")
+
+    resultado = []
+    for linha in linhas:
+        grupo = linha[2] if agrupar else None
+        quantidade, quantidade_score, soma = linha[-3:]
+        resultado.append([
+            formatar_bucket(linha[0], granularidade),
+            linha[1],
+            None if grupo == SEM_ID else grupo,
+            int(quantidade or 0),
+            int(quantidade_score or 0),
+            float(soma or 0),
+        ])
+    return resultado
+
+
+def montar_colunas(linhas: list[list], buckets: list[str], granularidade: str, agrupar: str | None) -> dict:
+    """
+    Monta a resposta colunar: um vetor ``buckets`` e, por série (sentimento e grupo),
+    vetores ``quantidade`` e ``score_medio`` alinhados a ele. Buckets sem análises
+    ficam com ``0`` e ``null``.
+    """
+    indice = {bucket: i for i, bucket in enumerate(buckets)}
+    total = len(buckets)
+    series: dict[tuple, list] = {}
+    for bucket, sentimento_id, grupo, quantidade, quantidade_score, soma in linhas:
+        i = indice.get(bucket)
+        if i is None:
+            continue
+        serie = series.get((sentimento_id, grupo))
+        if serie is None:
+            serie = series[(sentimento_id, grupo)] = [[0] * total, [0] * total, [0.0] * total]
+        serie[0][i] += quantidade
+        serie[1][i] += quantidade_score
+        serie[2][i] += soma
+
+    saida = []
+    for (sentimento_id, grupo), (quantidades, quantidades_score, somas) in series.items():
+        item = {"sentimento": dicionario_sentimentos.nome(sentimento_id)}
+        if agrupar:
+            item[AGRUPAMENTOS[agrupar]] = grupo
+        item["quantidade"] = quantidades
+        item["score_medio"] = [round(s / q, 4) if q else None for s, q in zip(somas, quantidades_score)]
+        saida.append(item)
+    saida.sort(key=lambda item: (-sum(item["quantidade"]), item["sentimento"] or ""))
+    return {"granularidade": granularidade, "buckets": buckets, "series": saida}
+
+
+def dividir_intervalo(inicio: datetime, fim: datetime, granularidade: str, agora: datetime | None = None):
+    """
+    Separa ``[inicio, fim)`` na parte de buckets já encerrados e na parte que ainda recebe análises.
+
+    Returns:
+        tuple: ``(fechado, aberto)``, cada um ``(inicio, fim)`` ou ``None``.
+    """
+    corte = inicio_bucket(agora or datetime.now(), granularidade)
+    fechado = (inicio, min(fim, corte)) if inicio < corte else None
+    aberto = (max(inicio, corte), fim) if fim > corte else None
+    return fechado, aberto
+
+
+async def get_tendencia_async(
+    db: AsyncSession,
+    granularidade: str,
+    inicio: date,
+    fim: date,
+    agrupar: str | None = None,
+    agent_id: int | None = None,
+    user_id: int | None = None,
+) -> tuple[dict, bool]:
+    """
+    Tendência de sentimentos de ``inicio`` a ``fim`` (inclusivos) em buckets de ``granularidade``.
+
+    A parte do intervalo com buckets encerrados vem do cache das rotas (``TENDENCIA_TTL_FECHADOS``);
+    só o bucket corrente é consultado a cada chamada. Uma análise gravada com data já
+    encerrada invalida a parte em cache (``invalidar_buckets_fechados``); se a invalidação
+    chegar durante a consulta, o resultado não é guardado (gerações de ``obter_ou_calcular``).
+
+    Returns:
+        tuple[dict, bool]: A resposta colunar e se o intervalo inteiro já está encerrado.
+    """
+    inicio_dt = datetime.combine(inicio, time())
+    fim_dt = datetime.combine(fim + timedelta(days=1), time())
+    buckets = buckets_do_intervalo(inicio_dt, fim_dt, granularidade)
+    if len(buckets) > TENDENCIA_MAX_BUCKETS:
+        raise ValueError(f"O intervalo gera {len(buckets)} buckets; o máximo é {TENDENCIA_MAX_BUCKETS}")
+
+    def consultar(intervalo):
+        return db.run_sync(lambda s: consultar_buckets(s, granularidade, *intervalo, agrupar, agent_id, user_id))
+
+    fechado, aberto = dividir_intervalo(inicio_dt, fim_dt, granularidade)
+    linhas = []
+    if fechado:
+        linhas += await cache_rotas.obter_ou_calcular(
+            cache_rotas.chave(
+                "/sentimento/tendencia", granularidade=granularidade, inicio=fechado[0].isoformat(),
+                fim=fechado[1].isoformat(), agrupar=agrupar, agent_id=agent_id, user_id=user_id,
+            ),
+            lambda: consultar(fechado),
+            tags=(f"{TAG_TENDENCIA}:{granularidade}",),
+            ttl=TENDENCIA_TTL_FECHADOS,
+        )
+    if aberto:
+        linhas += await consultar(aberto)
+    return montar_colunas(linhas, buckets, granularidade, agrupar), aberto is None
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .. import models
+
+load_dotenv()
+
+VERSAO_DADOS_TTL = float(os.getenv("VERSAO_DADOS_TTL", "1"))
+
+
+class VersaoDados:
+    """
+    Versão barata dos dados de análises, usada para montar o ETag das rotas do painel.
+
+    A versão sai só do banco: o maior ``analise_id`` (uma leitura do índice da
+    chave primária) e o total de análises de ``cs_total_sentimento`` (uma linha
+    por sentimento), que muda também com remoções e reconstruções. Assim todos os workers chegam ao mesmo
+    ETag para os mesmos dados, inclusive depois de reiniciar.
+    O valor fica guardado por ``ttl`` segundos, então a maior parte das
+    requisições condicionais responde 304 sem ir ao banco; escritas de outros
+    workers aparecem em no máximo ``ttl`` segundos.
+
+    Args:
+        ttl (float): Tempo, em segundos, que a versão lida do banco é reaproveitada.
+    """
+
+    def __init__(self, ttl: float = VERSAO_DADOS_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._versao = None
+        self._lido_em = 0.0
+
+    def registrar_escrita(self):
+        """
+        Chamada depois do commit de novas análises: a próxima leitura vai ao banco.
+        """
+        with self._lock:
+            self._versao = None
+
+    def _em_cache(self) -> str | None:
+        with self._lock:
+            if self._versao is not None and time.monotonic() - self._lido_em < self.ttl:
+                return self._versao
+        return None
+
+    @staticmethod
+    def _ler(db: Session) -> str:
+        total = select(func.coalesce(func.sum(models.TotalSentimento.quantidade), 0)).scalar_subquery()
+        ultimo_id, quantidade = db.execute(
+            select(func.coalesce(func.max(models.AnaliseSentimento.analise_id), 0), total)
+        ).one()
+        return f"{ultimo_id}.{quantidade}"
+
+    def _guardar(self, versao: str) -> str:
+        with self._lock:
+            self._versao = versao
+            self._lido_em = time.monotonic()
+        return versao
+
+    def atual(self, db: Session) -> str:
+        versao = self._em_cache()
+        if versao is not None:
+            return versao
+        return self._guardar(self._ler(db))
+
+    async def atual_async(self, db: AsyncSession) -> str:
+        versao = self._em_cache()
+        if versao is not None:
+            return versao
+        return self._guardar(await db.run_sync(self._ler))
+
+
+def gerar_etag(versao: str, rota: str, consulta: str = "") -> str:
+    """
+    Monta um ETag fraco a partir da versão dos dados, da rota e da query string.
+    """
+    resumo = hashlib.sha1(f"{rota}?{consulta}".encode()).hexdigest()[:12]
+    return f'W/"{resumo}-{versao}"'
+
+
+def etag_confere(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (valor.strip() for valor in if_none_match.split(","))
+
+
+versao_dados = VersaoDados()
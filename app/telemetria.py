@@ -0,0 +1,295 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+load_dotenv()
+
+TELEMETRIA_HABILITADA = os.getenv("TELEMETRIA_HABILITADA", "false").lower() == "true"
+# Limite de consultas distintas com série própria; as demais caem em "outras"
+TELEMETRIA_MAX_CONSULTAS = int(os.getenv("TELEMETRIA_MAX_CONSULTAS", "500"))
+
+BALDES_SEGUNDOS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BALDES_LINHAS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+_LITERAIS = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"%\(\w+\)s|\$\d+|(?<![:\w]):\w+|\?"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)"), "(...)"),
+    (re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+"), "(...)"),
+    (re.compile(r"\s+"), " "),
+)
+
+
+@lru_cache(maxsize=2048)
+def impressao_consulta(sql: str) -> tuple[str, str]:
+    """
+    Normaliza um comando SQL para agrupar execuções da mesma consulta.
+
+    Literais, parâmetros e listas de ``IN``/``VALUES`` viram ``?``/``(...)``, de modo
+    que ``WHERE id IN (1, 2)`` e ``WHERE id IN (3, 4, 5)`` tenham a mesma impressão.
+
+    Returns:
+        tuple[str, str]: Hash curto da consulta normalizada e a própria consulta normalizada.
+    """
+    normalizada = sql
+    for padrao, troca in _LITERAIS:
+        normalizada = padrao.sub(troca, normalizada)
+    normalizada = normalizada.strip()
+    return hashlib.sha1(normalizada.encode()).hexdigest()[:12], normalizada
+
+
+class Histograma:
+    """
+    Histograma cumulativo no formato do Prometheus (baldes fixos, soma e contagem).
+    """
+
+    __slots__ = ("baldes", "contagens", "soma", "total")
+
+    def __init__(self, baldes):
+        self.baldes = baldes
+        self.contagens = [0] * len(baldes)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        indice = bisect_left(self.baldes, valor)
+        if indice < len(self.contagens):
+            self.contagens[indice] += 1
+        self.soma += valor
+        self.total += 1
+
+    def linhas(self, nome: str, rotulos: str) -> list[str]:
+        separador = "," if rotulos else ""
+        saida = []
+        acumulado = 0
+        for limite, contagem in zip(self.baldes, self.contagens):
+            acumulado += contagem
+            saida.append(f'{nome}_bucket{{{rotulos}{separador}le="{limite}"}} {acumulado}')
+        saida.append(f'{nome}_bucket{{{rotulos}{separador}le="+Inf"}} {self.total}')
+        saida.append(f"{nome}_sum{{{rotulos}}} {self.soma}")
+        saida.append(f"{nome}_count{{{rotulos}}} {self.total}")
+        return saida
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _rotulos(**valores) -> str:
+    return ",".join(f'{chave}="{_escapar(valor)}"' for chave, valor in valores.items())
+
+
+class Telemetria:
+    """
+    Métricas de latência por rota, por consulta SQL, por etapa do processamento
+    (serialização, montagem de schemas) e da publicação no RabbitMQ, expostas no
+    formato texto do Prometheus em ``/metrics``.
+
+    Desligada (``TELEMETRIA_HABILITADA=false``), o middleware e os eventos do
+    SQLAlchemy não são instalados e ``medir`` devolve um contexto vazio; o custo
+    nas rotas e na publicação é uma checagem de ``habilitada``.
+
+    Os contadores são do processo; com vários workers, cada um expõe os seus.
+    """
+
+    def __init__(self, habilitada: bool = TELEMETRIA_HABILITADA, max_consultas: int = TELEMETRIA_MAX_CONSULTAS):
+        self.habilitada = habilitada
+        self.max_consultas = max_consultas
+        self._lock = threading.Lock()
+        self._requisicoes: dict[tuple, Histograma] = {}
+        self._erros: dict[tuple, int] = {}
+        self._consultas: dict[str, tuple[Histograma, Histograma]] = {}
+        self._sql: dict[str, str] = {}
+        self._etapas: dict[str, Histograma] = {}
+        self._publicacoes: dict[str, Histograma] = {}
+
+    def _observar(self, series: dict, chave, baldes, valor: float):
+        with self._lock:
+            histograma = series.get(chave)
+            if histograma is None:
+                histograma = series[chave] = Histograma(baldes)
+            histograma.observar(valor)
+
+    def observar_requisicao(self, metodo: str, rota: str, status: int, segundos: float):
+        self._observar(self._requisicoes, (metodo, rota, status), BALDES_SEGUNDOS, segundos)
+
+    def registrar_erro(self, rota: str, erro: BaseException):
+        chave = (rota, type(erro).__name__)
+        with self._lock:
+            self._erros[chave] = self._erros.get(chave, 0) + 1
+
+    def observar_consulta(self, sql: str, segundos: float, linhas: int):
+        impressao, normalizada = impressao_consulta(sql)
+        with self._lock:
+            series = self._consultas.get(impressao)
+            if series is None:
+                if len(self._consultas) >= self.max_consultas:
+                    impressao, normalizada = "outras", "outras"
+                    series = self._consultas.get(impressao)
+                if series is None:
+                    series = self._consultas[impressao] = (Histograma(BALDES_SEGUNDOS), Histograma(BALDES_LINHAS))
+                    self._sql[impressao] = normalizada
+            series[0].observar(segundos)
+            if linhas >= 0:
+                series[1].observar(linhas)
+
+    def observar_etapa(self, etapa: str, segundos: float):
+        self._observar(self._etapas, etapa, BALDES_SEGUNDOS, segundos)
+
+    def observar_publicacao(self, resultado: str, segundos: float):
+        self._observar(self._publicacoes, resultado, BALDES_SEGUNDOS, segundos)
+
+    def medir(self, etapa: str):
+        """
+        Context manager que registra a duração do bloco em ``sentimentos_etapa_segundos``.
+        """
+        if not self.habilitada:
+            return nullcontext()
+        return self._medir(etapa)
+
+    @contextmanager
+    def _medir(self, etapa: str):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar_etapa(etapa, time.perf_counter() - inicio)
+
+    def ligar_engine(self, engine):
+        """
+        Instala os eventos que medem cada comando executado pelo ``engine`` (síncrono;
+        para o assíncrono, passe ``async_engine.sync_engine``).
+
+        As linhas vêm de ``cursor.rowcount``: o asyncpg e o psycopg2 informam as linhas
+        de ``SELECT``; drivers que não informam (SQLite) registram só o tempo.
+        """
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _antes(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("telemetria_inicio", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _depois(conn, cursor, statement, parameters, context, executemany):
+            inicio = conn.info["telemetria_inicio"].pop()
+            self.observar_consulta(statement, time.perf_counter() - inicio, getattr(cursor, "rowcount", -1))
+
+        @event.listens_for(engine, "handle_error")
+        def _erro(contexto):
+            pilha = contexto.connection.info.get("telemetria_inicio") if contexto.connection is not None else None
+            if pilha:
+                pilha.pop()
+
+    def limpar(self):
+        with self._lock:
+            self._requisicoes.clear()
+            self._erros.clear()
+            self._consultas.clear()
+            self._sql.clear()
+            self._etapas.clear()
+            self._publicacoes.clear()
+
+    def exposicao(self) -> str:
+        """
+        Todas as séries no formato texto de exposição do Prometheus (versão 0.0.4).
+        """
+        saida = []
+        with self._lock:
+            saida += [
+                "# HELP sentimentos_http_requisicao_segundos Latência das requisições por rota.",
+                "# TYPE sentimentos_http_requisicao_segundos histogram",
+            ]
+            for (metodo, rota, status), histograma in sorted(self._requisicoes.items()):
+                saida += histograma.linhas(
+                    "sentimentos_http_requisicao_segundos", _rotulos(metodo=metodo, rota=rota, status=status)
+                )
+            saida += [
+                "# HELP sentimentos_http_excecoes_total Exceções não tratadas por rota e tipo.",
+                "# TYPE sentimentos_http_excecoes_total counter",
+            ]
+            for (rota, tipo), total in sorted(self._erros.items()):
+                saida.append(f"sentimentos_http_excecoes_total{{{_rotulos(rota=rota, tipo=tipo)}}} {total}")
+            saida += [
+                "# HELP sentimentos_db_consulta_segundos Tempo de cada comando SQL, pela impressão da consulta.",
+                "# TYPE sentimentos_db_consulta_segundos histogram",
+            ]
+            for impressao, (tempo, _) in sorted(self._consultas.items()):
+                saida += tempo.linhas("sentimentos_db_consulta_segundos", _rotulos(consulta=impressao))
+            saida += [
+                "# HELP sentimentos_db_consulta_linhas Linhas retornadas ou afetadas por comando SQL.",
+                "# TYPE sentimentos_db_consulta_linhas histogram",
+            ]
+            for impressao, (_, linhas) in sorted(self._consultas.items()):
+                if linhas.total:
+                    saida += linhas.linhas("sentimentos_db_consulta_linhas", _rotulos(consulta=impressao))
+            saida += [
+                "# HELP sentimentos_db_consulta_info SQL normalizado de cada impressão de consulta.",
+                "# TYPE sentimentos_db_consulta_info gauge",
+            ]
+            for impressao, sql in sorted(self._sql.items()):
+                saida.append(f"sentimentos_db_consulta_info{{{_rotulos(consulta=impressao, sql=sql[:300])}}} 1")
+            saida += [
+                "# HELP sentimentos_etapa_segundos Duração de etapas do processamento (serialização, schemas).",
+                "# TYPE sentimentos_etapa_segundos histogram",
+            ]
+            for etapa, histograma in sorted(self._etapas.items()):
+                saida += histograma.linhas("sentimentos_etapa_segundos", _rotulos(etapa=etapa))
+            saida += [
+                "# HELP sentimentos_amqp_publicacao_segundos Publicação no RabbitMQ até a confirmação do broker.",
+                "# TYPE sentimentos_amqp_publicacao_segundos histogram",
+            ]
+            for resultado, histograma in sorted(self._publicacoes.items()):
+                saida += histograma.linhas("sentimentos_amqp_publicacao_segundos", _rotulos(resultado=resultado))
+        return "\n".join(saida) + "\n"
+
+
+telemetria = Telemetria()
+
+
+class TelemetriaMiddleware:
+    """
+    Middleware ASGI que mede cada requisição HTTP até o último byte da resposta.
+
+    A rota é o caminho declarado (``/tecnico/{id}``), não a URL, para que a
+    quantidade de séries não cresça com os ids; requisições sem rota
+    correspondente ficam em ``nao_encontrada``.
+    """
+
+    def __init__(self, app, telemetria: Telemetria = telemetria):
+        self.app = app
+        self.telemetria = telemetria
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        status = 500
+
+        async def send_medido(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, send_medido)
+        except Exception as e:
+            self.telemetria.registrar_erro(_rota(scope), e)
+            raise
+        finally:
+            self.telemetria.observar_requisicao(scope["method"], _rota(scope), status, time.perf_counter() - inicio)
+
+
+def _rota(scope) -> str:
+    rota = scope.get("route")
+    return getattr(rota, "path", None) or "nao_encontrada"
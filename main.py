@@ -1,12 +1,50 @@
 # main.py
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import Response
 from app.routers import sentimento, auth # Importe o roteador de autenticação
-from app.database import Base, engine
+from app.compressao import CompressaoMiddleware
+from app.database import async_engine, engine, metricas_banco
+from app.migracoes import executar_migracoes
+from app.producers.producer import iniciar_publisher, encerrar_publisher
+from app.producers.consumer import iniciar_consumer, encerrar_consumer
+from app.services.buffer_analises import obter_buffer, encerrar_buffer
+from app.services.cache import cache_rotas
+from app.services.estatisticas import garantir_estatisticas
+from app.services.feed_analises import feed_analises
+from app.services.principais import cache_principais
+from app.services.senhas import encerrar_pool_senhas, pool_senhas
+from app.services.particoes import iniciar_manutencao_particoes, encerrar_manutencao_particoes
+from app.telemetria import TelemetriaMiddleware, telemetria
+from app.diagnostico_sql import DiagnosticoSQLMiddleware, diagnostico_sql
 from fastapi.middleware.cors import CORSMiddleware
 
-Base.metadata.create_all(bind=engine)
+executar_migracoes()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    garantir_estatisticas()
+    # O buffer e as rotas síncronas publicam no feed a partir de outras threads
+    feed_analises.iniciar(asyncio.get_running_loop())
+    iniciar_manutencao_particoes()
+    # Conexões com o RabbitMQ vivem enquanto a aplicação estiver de pé
+    iniciar_publisher()
+    obter_buffer()
+    iniciar_consumer()
+    yield
+    # O consumer para primeiro para que os acks das linhas em voo ainda sejam enviados
+    encerrar_consumer()
+    # Grava o que ainda estiver no buffer antes de encerrar
+    encerrar_buffer()
+    encerrar_publisher()
+    encerrar_manutencao_particoes()
+    encerrar_pool_senhas()
+    await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 origins=[
     "http://localhost",
@@ -22,11 +60,63 @@ app.add_middleware(
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["ETag"]
 )
+# Comprime com brotli (se instalado) ou gzip as respostas acima de COMPRESSAO_MINIMO bytes
+app.add_middleware(CompressaoMiddleware)
+# Latência por rota, por consulta SQL e da publicação no RabbitMQ em /metrics;
+# com TELEMETRIA_HABILITADA=false nada disso é instalado
+if telemetria.habilitada:
+    app.add_middleware(TelemetriaMiddleware)
+    telemetria.ligar_engine(engine)
+    telemetria.ligar_engine(async_engine.sync_engine)
+# Comandos por requisição, N+1 e consultas lentas com EXPLAIN no log (DIAGNOSTICO_SQL_HABILITADO)
+if diagnostico_sql.habilitado:
+    app.add_middleware(DiagnosticoSQLMiddleware)
+    diagnostico_sql.ligar_engine(engine)
+    diagnostico_sql.ligar_engine(async_engine.sync_engine)
 app.include_router(sentimento.router)
 app.include_router(auth.router) # Inclua o roteador de autenticação
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the FastAPI service 🚀"}
+
+@app.get("/metricas/banco")
+def get_metricas_banco():
+    """
+    Estado dos pools de conexão e das sessões abertas pelas rotas.
+    """
+    return metricas_banco()
+
+@app.get("/metricas/cache")
+def get_metricas_cache():
+    """
+    Acertos, erros e invalidações do cache das rotas de leitura.
+    """
+    return cache_rotas.metricas()
+
+@app.get("/metricas/auth")
+def get_metricas_auth():
+    """
+    Acertos e revogações do cache de usuários autenticados e uso do pool de senhas.
+    """
+    return dict(cache_principais.metricas(), senhas=pool_senhas.metricas())
+
+@app.get("/metricas/sql")
+def get_metricas_sql():
+    """
+    Requisições com N+1 detectado (por rota e consulta) e quantidade de consultas lentas.
+    """
+    return diagnostico_sql.metricas()
+
+@app.get("/metrics")
+def get_metrics():
+    """
+    Histogramas de latência das rotas, das consultas SQL, das etapas de serialização
+    e da publicação no RabbitMQ, no formato texto do Prometheus.
+    """
+    if not telemetria.habilitada:
+        raise HTTPException(status_code=404, detail="Telemetria desabilitada (TELEMETRIA_HABILITADA=false)")
+    return Response(telemetria.exposicao(), media_type="text/plain; version=0.0.4; charset=utf-8")
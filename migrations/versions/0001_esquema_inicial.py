@@ -0,0 +1,94 @@
+"""Esquema inicial (tabelas criadas até então por Base.metadata.create_all)
+
+Bancos que já foram criados pelo create_all mantêm as tabelas existentes;
+só as que faltarem são criadas.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _existe(tabela: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(tabela)
+
+
+def upgrade():
+    if not _existe("cs_user"):
+        op.create_table(
+            "cs_user",
+            sa.Column("user_id", sa.Integer, primary_key=True, index=True),
+            sa.Column("name", sa.String(150), nullable=False),
+            sa.Column("email", sa.String(70)),
+            sa.Column("username", sa.String(255)),
+        )
+    if not _existe("cs_agents"):
+        op.create_table(
+            "cs_agents",
+            sa.Column("agent_id", sa.Integer, primary_key=True, index=True),
+            sa.Column("nome", sa.String(150)),
+            sa.Column("email", sa.String),
+            sa.Column("username", sa.String),
+        )
+    if not _existe("cs_events"):
+        op.create_table(
+            "cs_events",
+            sa.Column("event_id", sa.Integer, primary_key=True, index=True),
+            sa.Column("descricao", sa.String, nullable=False),
+            sa.Column("data_abertura", sa.TIMESTAMP, nullable=False),
+            sa.Column("data_baixa", sa.TIMESTAMP),
+            sa.Column("status_id", sa.Integer, nullable=False),
+        )
+    if not _existe("cs_acoes"):
+        op.create_table(
+            "cs_acoes",
+            sa.Column("acao_id", sa.Integer, primary_key=True, index=True),
+            sa.Column("event_id", sa.Integer, sa.ForeignKey("cs_events.event_id"), nullable=False),
+            sa.Column("descricao", sa.Text, nullable=False),
+            sa.Column("agent_id", sa.Integer, sa.ForeignKey("cs_agents.agent_id")),
+            sa.Column("user_id", sa.Integer, sa.ForeignKey("cs_user.user_id")),
+            sa.Column("data_acao", sa.TIMESTAMP),
+        )
+    if not _existe("cs_analise_sentimento"):
+        op.create_table(
+            "cs_analise_sentimento",
+            sa.Column("analise_id", sa.Integer, primary_key=True, index=True, autoincrement=True),
+            sa.Column("acao_id", sa.Integer, sa.ForeignKey("cs_acoes.acao_id"), nullable=False),
+            sa.Column("user_id", sa.Integer, sa.ForeignKey("cs_user.user_id")),
+            sa.Column("agent_id", sa.Integer, sa.ForeignKey("cs_agents.agent_id")),
+            sa.Column("sentimento", sa.String(50), nullable=False),
+            sa.Column("score", sa.DECIMAL(5, 2)),
+            sa.Column("data_analise", sa.TIMESTAMP),
+        )
+    if not _existe("cs_estatistica_sentimento"):
+        op.create_table(
+            "cs_estatistica_sentimento",
+            sa.Column("dia", sa.Date, primary_key=True),
+            sa.Column("sentimento", sa.String(50), primary_key=True),
+            sa.Column("agent_id", sa.Integer, primary_key=True),
+            sa.Column("user_id", sa.Integer, primary_key=True),
+            sa.Column("quantidade", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("quantidade_score", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("soma_score", sa.DECIMAL(14, 2), nullable=False, server_default="0"),
+            sa.Column("score_min", sa.DECIMAL(5, 2)),
+            sa.Column("score_max", sa.DECIMAL(5, 2)),
+        )
+
+
+def downgrade():
+    for tabela in (
+        "cs_estatistica_sentimento",
+        "cs_analise_sentimento",
+        "cs_acoes",
+        "cs_events",
+        "cs_agents",
+        "cs_user",
+    ):
+        op.drop_table(tabela)
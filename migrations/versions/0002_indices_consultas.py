@@ -0,0 +1,38 @@
+"""Índices para os filtros e joins usados pelos serviços
+
+- cs_acoes: agent_id/user_id (com data_acao, para os filtros do /atendimento)
+  e event_id (join com cs_events).
+- cs_analise_sentimento: acao_id (join com cs_acoes), score (/sentimento/by-score),
+  data_analise (/sentimento/by-data) e sentimento.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDICES = [
+    ("ix_cs_acoes_agent_id_data_acao", "cs_acoes", ["agent_id", "data_acao"]),
+    ("ix_cs_acoes_user_id_data_acao", "cs_acoes", ["user_id", "data_acao"]),
+    ("ix_cs_acoes_event_id", "cs_acoes", ["event_id"]),
+    ("ix_cs_acoes_data_acao", "cs_acoes", ["data_acao"]),
+    ("ix_cs_analise_sentimento_acao_id", "cs_analise_sentimento", ["acao_id"]),
+    ("ix_cs_analise_sentimento_score", "cs_analise_sentimento", ["score"]),
+    ("ix_cs_analise_sentimento_data_analise", "cs_analise_sentimento", ["data_analise"]),
+    ("ix_cs_analise_sentimento_sentimento", "cs_analise_sentimento", ["sentimento"]),
+]
+
+
+def upgrade():
+    for nome, tabela, colunas in INDICES:
+        op.create_index(nome, tabela, colunas, if_not_exists=True)
+
+
+def downgrade():
+    for nome, tabela, _ in reversed(INDICES):
+        op.drop_index(nome, table_name=tabela)
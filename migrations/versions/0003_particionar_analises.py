@@ -0,0 +1,116 @@
+"""Particiona cs_analise_sentimento por mês de data_analise (PostgreSQL)
+
+A tabela é recriada como ``PARTITION BY RANGE (data_analise)`` com uma partição
+por mês já existente nos dados, as dos próximos meses e uma partição DEFAULT.
+Como a chave de partição precisa fazer parte da chave primária, ela passa a ser
+(analise_id, data_analise) e data_analise vira NOT NULL (padrão now()); linhas
+antigas sem data recebem a data da ação ou, na falta dela, o momento da migração.
+
+Em outros bancos a migração não faz nada.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.particoes import (
+    MESES_FUTUROS,
+    PARTICAO_PADRAO,
+    TABELA,
+    criar_particao_mes,
+    inicio_mes,
+    proximo_mes,
+)
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+SEQUENCIA = "cs_analise_sentimento_analise_id_seq"
+COLUNAS = "analise_id, acao_id, user_id, agent_id, sentimento, score, data_analise"
+INDICES_ANALISE = [
+    ("ix_cs_analise_sentimento_acao_id", ["acao_id"]),
+    ("ix_cs_analise_sentimento_score", ["score"]),
+    ("ix_cs_analise_sentimento_data_analise", ["data_analise"]),
+    ("ix_cs_analise_sentimento_sentimento", ["sentimento"]),
+]
+
+
+def _postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade():
+    if not _postgres():
+        return
+    conexao = op.get_bind()
+
+    op.execute(f"ALTER TABLE {TABELA} RENAME TO {TABELA}_antiga")
+    op.execute(f"ALTER SEQUENCE IF EXISTS {SEQUENCIA} OWNED BY NONE")
+    op.execute(f"CREATE SEQUENCE IF NOT EXISTS {SEQUENCIA}")
+    op.execute(f"""
+        CREATE TABLE {TABELA} (
+            analise_id integer NOT NULL DEFAULT nextval('{SEQUENCIA}'),
+            acao_id integer NOT NULL REFERENCES cs_acoes (acao_id),
+            user_id integer REFERENCES cs_user (user_id),
+            agent_id integer REFERENCES cs_agents (agent_id),
+            sentimento varchar(50) NOT NULL,
+            score numeric(5, 2),
+            data_analise timestamp NOT NULL DEFAULT now(),
+            PRIMARY KEY (analise_id, data_analise)
+        ) PARTITION BY RANGE (data_analise)
+    """)
+    op.execute(f"ALTER SEQUENCE {SEQUENCIA} OWNED BY {TABELA}.analise_id")
+    op.execute(f"CREATE TABLE {PARTICAO_PADRAO} PARTITION OF {TABELA} DEFAULT")
+
+    # Uma partição por mês presente nos dados até alguns meses à frente
+    menor, maior = conexao.execute(sa.text(
+        f"SELECT min(data_analise), greatest(max(data_analise), now()) FROM {TABELA}_antiga"
+    )).one()
+    mes = inicio_mes(menor) if menor is not None else inicio_mes(maior)
+    limite = inicio_mes(maior)
+    for _ in range(MESES_FUTUROS + 1):
+        limite = proximo_mes(limite)
+    while mes < limite:
+        criar_particao_mes(conexao, mes)
+        mes = proximo_mes(mes)
+
+    op.execute(f"""
+        INSERT INTO {TABELA} ({COLUNAS})
+        SELECT a.analise_id, a.acao_id, a.user_id, a.agent_id, a.sentimento, a.score,
+               coalesce(a.data_analise, c.data_acao, now())
+        FROM {TABELA}_antiga a
+        LEFT JOIN cs_acoes c ON c.acao_id = a.acao_id
+    """)
+    op.execute(f"DROP TABLE {TABELA}_antiga")
+    op.execute(f"SELECT setval('{SEQUENCIA}', coalesce((SELECT max(analise_id) FROM {TABELA}), 0) + 1, false)")
+
+    # Índices no pai são criados em todas as partições, inclusive nas futuras
+    for nome, colunas in INDICES_ANALISE:
+        op.execute(f"CREATE INDEX {nome} ON {TABELA} ({', '.join(colunas)})")
+
+
+def downgrade():
+    if not _postgres():
+        return
+    op.execute(f"ALTER TABLE {TABELA} RENAME TO {TABELA}_particionada")
+    op.execute(f"ALTER SEQUENCE {SEQUENCIA} OWNED BY NONE")
+    op.execute(f"""
+        CREATE TABLE {TABELA} (
+            analise_id integer PRIMARY KEY DEFAULT nextval('{SEQUENCIA}'),
+            acao_id integer NOT NULL REFERENCES cs_acoes (acao_id),
+            user_id integer REFERENCES cs_user (user_id),
+            agent_id integer REFERENCES cs_agents (agent_id),
+            sentimento varchar(50) NOT NULL,
+            score numeric(5, 2),
+            data_analise timestamp
+        )
+    """)
+    op.execute(f"ALTER SEQUENCE {SEQUENCIA} OWNED BY {TABELA}.analise_id")
+    op.execute(f"INSERT INTO {TABELA} ({COLUNAS}) SELECT {COLUNAS} FROM {TABELA}_particionada")
+    op.execute(f"DROP TABLE {TABELA}_particionada CASCADE")
+    for nome, colunas in INDICES_ANALISE:
+        op.execute(f"CREATE INDEX {nome} ON {TABELA} ({', '.join(colunas)})")
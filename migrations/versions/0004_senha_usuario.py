@@ -0,0 +1,27 @@
+"""Coluna hashed_password em cs_user
+
+O login compara a senha com o hash bcrypt guardado no próprio usuário.
+Usuários existentes ficam sem senha (NULL) e não conseguem entrar até que
+uma seja definida.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    colunas = {coluna["name"] for coluna in sa.inspect(op.get_bind()).get_columns("cs_user")}
+    if "hashed_password" not in colunas:
+        op.add_column("cs_user", sa.Column("hashed_password", sa.String(255), nullable=True))
+
+
+def downgrade():
+    op.drop_column("cs_user", "hashed_password")
@@ -0,0 +1,31 @@
+"""Regrava os rótulos de sentimento na forma canônica
+
+Análises gravadas antes da normalização podem ter rótulos com maiúsculas,
+acentos ou pontuação ("Frustração", "raiva."). Elas passam pela mesma
+``normalizar_rotulo`` usada na escrita, para que as consultas comparem os
+rótulos diretamente, sem ``lower()``. Se algum rótulo mudar, a tabela de
+estatísticas é esvaziada e reconstruída na inicialização da aplicação.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+from app.services.normalizacao import canonizar_rotulos_gravados
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    alterados = canonizar_rotulos_gravados(op.get_bind())
+    for antigo, canonico in alterados.items():
+        print(f"Sentimento {antigo!r} regravado como {canonico!r}")
+
+
+def downgrade():
+    # A forma original dos rótulos não é guardada
+    pass
@@ -0,0 +1,104 @@
+"""Dicionário de sentimentos com códigos inteiros
+
+Cria ``cs_sentimento`` (código ``SMALLINT``, rótulo único e a marca
+``negativo``) com os rótulos já gravados e os negativos que antes eram fixos
+em ``get_sentimento_mais_negativo``. ``cs_analise_sentimento.sentimento``
+(``VARCHAR(50)``) é substituída por ``sentimento_id``, com chave estrangeira
+para o dicionário.
+
+A tabela de estatísticas passa a usar o código na chave primária; ela é
+recriada vazia e reconstruída na inicialização da aplicação
+(``garantir_estatisticas``).
+
+No PostgreSQL o ``UPDATE`` reescreve todas as linhas da tabela; rode um
+``VACUUM ANALYZE cs_analise_sentimento`` depois da migração.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+NEGATIVOS = ("raiva", "frustracao", "confusao", "urgencia")
+
+
+def _tabela_estatisticas(coluna_sentimento: sa.Column):
+    op.create_table(
+        "cs_estatistica_sentimento",
+        sa.Column("dia", sa.Date, primary_key=True),
+        coluna_sentimento,
+        sa.Column("agent_id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, primary_key=True),
+        sa.Column("quantidade", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("quantidade_score", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("soma_score", sa.DECIMAL(14, 2), nullable=False, server_default="0"),
+        sa.Column("score_min", sa.DECIMAL(5, 2)),
+        sa.Column("score_max", sa.DECIMAL(5, 2)),
+    )
+
+
+def upgrade():
+    conexao = op.get_bind()
+    op.create_table(
+        "cs_sentimento",
+        sa.Column("sentimento_id", sa.SmallInteger().with_variant(sa.Integer, "sqlite"),
+                  primary_key=True, autoincrement=True),
+        sa.Column("nome", sa.String(50), nullable=False, unique=True),
+        sa.Column("negativo", sa.Boolean, nullable=False, server_default=sa.false()),
+    )
+    conexao.execute(sa.text(
+        "INSERT INTO cs_sentimento (nome) "
+        "SELECT DISTINCT sentimento FROM cs_analise_sentimento WHERE sentimento IS NOT NULL"
+    ))
+    for nome in NEGATIVOS:
+        conexao.execute(sa.text(
+            "INSERT INTO cs_sentimento (nome) SELECT :nome "
+            "WHERE NOT EXISTS (SELECT 1 FROM cs_sentimento WHERE nome = :nome)"
+        ), {"nome": nome})
+    conexao.execute(
+        sa.text("UPDATE cs_sentimento SET negativo = :sim WHERE nome IN :nomes")
+            .bindparams(sa.bindparam("nomes", expanding=True), sa.bindparam("sim", type_=sa.Boolean)),
+        {"nomes": list(NEGATIVOS), "sim": True},
+    )
+
+    op.add_column("cs_analise_sentimento", sa.Column("sentimento_id", sa.SmallInteger, nullable=True))
+    conexao.execute(sa.text(
+        "UPDATE cs_analise_sentimento SET sentimento_id = ("
+        "SELECT s.sentimento_id FROM cs_sentimento s WHERE s.nome = cs_analise_sentimento.sentimento)"
+    ))
+    op.drop_index("ix_cs_analise_sentimento_sentimento", table_name="cs_analise_sentimento", if_exists=True)
+    with op.batch_alter_table("cs_analise_sentimento") as batch:
+        batch.alter_column("sentimento_id", existing_type=sa.SmallInteger, nullable=False)
+        batch.create_foreign_key(
+            "fk_cs_analise_sentimento_sentimento_id", "cs_sentimento", ["sentimento_id"], ["sentimento_id"]
+        )
+        batch.drop_column("sentimento")
+    op.create_index("ix_cs_analise_sentimento_sentimento_id", "cs_analise_sentimento", ["sentimento_id"])
+
+    op.drop_table("cs_estatistica_sentimento")
+    _tabela_estatisticas(sa.Column("sentimento_id", sa.SmallInteger, primary_key=True))
+
+
+def downgrade():
+    conexao = op.get_bind()
+    op.add_column("cs_analise_sentimento", sa.Column("sentimento", sa.String(50), nullable=True))
+    conexao.execute(sa.text(
+        "UPDATE cs_analise_sentimento SET sentimento = ("
+        "SELECT s.nome FROM cs_sentimento s WHERE s.sentimento_id = cs_analise_sentimento.sentimento_id)"
+    ))
+    op.drop_index("ix_cs_analise_sentimento_sentimento_id", table_name="cs_analise_sentimento")
+    with op.batch_alter_table("cs_analise_sentimento") as batch:
+        batch.alter_column("sentimento", existing_type=sa.String(50), nullable=False)
+        batch.drop_constraint("fk_cs_analise_sentimento_sentimento_id", type_="foreignkey")
+        batch.drop_column("sentimento_id")
+    op.create_index("ix_cs_analise_sentimento_sentimento", "cs_analise_sentimento", ["sentimento"])
+
+    op.drop_table("cs_estatistica_sentimento")
+    _tabela_estatisticas(sa.Column("sentimento", sa.String(50), primary_key=True))
+    op.drop_table("cs_sentimento")
@@ -0,0 +1,27 @@
+"""Índice de cs_analise_sentimento.agent_id
+
+``/sentimento/tecnico/{id}`` passa a filtrar pelo ``agent_id`` gravado na
+análise, o mesmo usado pela tabela de estatísticas e pelos perfis, em vez do
+``agent_id`` da ação. No PostgreSQL o índice no pai é criado em todas as
+partições.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_cs_analise_sentimento_agent_id", "cs_analise_sentimento", ["agent_id"], if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index("ix_cs_analise_sentimento_agent_id", table_name="cs_analise_sentimento")
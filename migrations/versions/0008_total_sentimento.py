@@ -0,0 +1,42 @@
+"""Totais por sentimento em cs_total_sentimento
+
+``cs_estatistica_sentimento`` é agregada por dia, sentimento, técnico e
+cliente; como quase toda combinação é única, ela tem perto de uma linha por
+análise e não serve para as contagens gerais (``/sentimento/quantidade``,
+``/sentimento/recorrente``, ``/sentimento/mais-frequente`` e
+``/sentimento/mais-negativo``). A nova tabela tem uma linha por sentimento e é
+preenchida a partir das estatísticas existentes.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "cs_total_sentimento",
+        sa.Column("sentimento_id", sa.SmallInteger, primary_key=True),
+        sa.Column("quantidade", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("quantidade_score", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("soma_score", sa.DECIMAL(18, 2), nullable=False, server_default="0"),
+        sa.Column("score_min", sa.DECIMAL(5, 2)),
+        sa.Column("score_max", sa.DECIMAL(5, 2)),
+    )
+    op.execute(
+        "INSERT INTO cs_total_sentimento "
+        "(sentimento_id, quantidade, quantidade_score, soma_score, score_min, score_max) "
+        "SELECT sentimento_id, sum(quantidade), sum(quantidade_score), sum(soma_score), min(score_min), max(score_max) "
+        "FROM cs_estatistica_sentimento GROUP BY sentimento_id"
+    )
+
+
+def downgrade():
+    op.drop_table("cs_total_sentimento")
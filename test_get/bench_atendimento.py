@@ -0,0 +1,64 @@
+"""
+Mede linhas/s e pico de memória do /atendimento dentro do processo, sem HTTP.
+
+Compara a montagem antiga (um ``schemas.Atendimento`` por linha), a lista
+enxuta a partir de ``row._mapping`` e o fluxo NDJSON com cursor do servidor.
+Usa o DATABASE_URL do .env.
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database import SessionLocal  # noqa: E402
+from app.schemas import Atendimento  # noqa: E402
+from app.services import services_sentimentos  # noqa: E402
+from app.services.dicionario_sentimentos import dicionario_sentimentos  # noqa: E402
+
+
+def medir(nome, funcao):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    linhas = funcao()
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"\n{nome}")
+    print(f"Linhas: {linhas}")
+    print(f"Tempo: {duracao:.4f} segundos ({linhas / duracao if duracao else 0:.0f} linhas/s)")
+    print(f"Pico de memória: {pico / 1024 / 1024:.2f} MiB")
+
+
+def modelos_pydantic():
+    db = SessionLocal()
+    try:
+        rows = services_sentimentos._query_atendimento(db).all()
+        atendimentos = []
+        for row in rows:
+            campos = dict(row._mapping)
+            campos["sentimento"] = dicionario_sentimentos.nome(campos.pop("sentimento_id"))
+            atendimentos.append(Atendimento(**campos).model_dump(mode="json"))
+        return len(atendimentos)
+    finally:
+        db.close()
+
+
+def lista_enxuta():
+    db = SessionLocal()
+    try:
+        return len(services_sentimentos.get_atendimento(db))
+    finally:
+        db.close()
+
+
+def fluxo_ndjson():
+    return sum(1 for _ in services_sentimentos.stream_atendimento_ndjson())
+
+
+if __name__ == "__main__":
+    medir("Atendimento (modelo Pydantic por linha)", modelos_pydantic)
+    medir("Atendimento (dicionário a partir de row._mapping)", lista_enxuta)
+    medir("Atendimento (NDJSON com cursor do servidor)", fluxo_ndjson)
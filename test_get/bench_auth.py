@@ -0,0 +1,49 @@
+"""
+Mede o custo de autenticação por requisição dentro do processo, sem HTTP.
+
+Compara ``obter_usuario_atual`` sem cache (decodificação do JWT + consulta do
+usuário) com o caminho de acerto do ``cache_principais``. Usa o DATABASE_URL e
+o JWT_SECRET_KEY do .env; o ``user_id`` do token é o primeiro argumento.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database import AsyncSessionLocal, async_engine  # noqa: E402
+from app.routers.auth import criar_access_token, obter_usuario_atual  # noqa: E402
+from app.services.principais import cache_principais  # noqa: E402
+
+
+async def medir(nome, token, repeticoes):
+    tempos = []
+    async with AsyncSessionLocal() as db:
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            await obter_usuario_atual(token, db)
+            tempos.append(time.perf_counter() - inicio)
+    tempos.sort()
+    print(f"\n{nome}")
+    print(f"Média: {statistics.mean(tempos) * 1e6:.1f} µs | "
+          f"p50: {tempos[len(tempos) // 2] * 1e6:.1f} µs | "
+          f"p99: {tempos[int(len(tempos) * 0.99)] * 1e6:.1f} µs")
+
+
+async def comparar(user_id, repeticoes=2000):
+    token = criar_access_token({"sub": str(user_id)})
+
+    cache_principais.habilitado = False
+    await medir("Sem cache (JWT + banco)", token, repeticoes)
+
+    cache_principais.habilitado = True
+    cache_principais.limpar()
+    await medir("Com cache de principais", token, repeticoes)
+    print("\nMétricas:", cache_principais.metricas())
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(comparar(int(sys.argv[1]) if len(sys.argv) > 1 else 1))
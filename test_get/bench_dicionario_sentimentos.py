@@ -0,0 +1,118 @@
+"""
+Compara o rótulo de sentimento em texto (``VARCHAR(50)`` em cada linha) com o
+código inteiro de ``cs_sentimento`` (PostgreSQL).
+
+Cria duas tabelas de rascunho em um schema temporário, com a mesma massa de
+dados e um índice no sentimento, e mede:
+
+- tamanho da tabela e do índice do sentimento;
+- tempo (EXPLAIN ANALYZE) do GROUP BY por sentimento e de um filtro por rótulo.
+
+O schema é removido no final. Usa o DATABASE_URL do .env.
+
+    python bench_dicionario_sentimentos.py [linhas]
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.database import engine  # noqa: E402
+
+SCHEMA = "bench_dicionario"
+ROTULOS = "ARRAY['raiva','frustracao','satisfacao','neutro','confusao','urgencia','alegria','tristeza']"
+CONSULTAS = {
+    "GROUP BY sentimento": {
+        "texto": "SELECT sentimento, count(*), min(score) FROM {s}.texto GROUP BY sentimento",
+        "codigo": "SELECT sentimento_id, count(*), min(score) FROM {s}.codigo GROUP BY sentimento_id",
+    },
+    "filtro por rótulo": {
+        "texto": "SELECT count(*) FROM {s}.texto WHERE sentimento = 'frustracao'",
+        "codigo": "SELECT count(*) FROM {s}.codigo WHERE sentimento_id = "
+                  "(SELECT sentimento_id FROM {s}.sentimento WHERE nome = 'frustracao')",
+    },
+}
+
+
+def criar_tabelas(conexao, linhas: int):
+    conexao.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conexao.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    conexao.execute(text(
+        f"CREATE TABLE {SCHEMA}.sentimento (sentimento_id smallserial PRIMARY KEY, nome varchar(50) UNIQUE NOT NULL)"
+    ))
+    conexao.execute(text(f"INSERT INTO {SCHEMA}.sentimento (nome) SELECT unnest({ROTULOS})"))
+    conexao.execute(text(
+        f"CREATE TABLE {SCHEMA}.texto (analise_id integer PRIMARY KEY, acao_id integer NOT NULL, "
+        "user_id integer, agent_id integer, sentimento varchar(50) NOT NULL, score numeric(5, 2), "
+        "data_analise timestamp NOT NULL)"
+    ))
+    conexao.execute(text(
+        f"CREATE TABLE {SCHEMA}.codigo (analise_id integer PRIMARY KEY, acao_id integer NOT NULL, "
+        f"user_id integer, agent_id integer, sentimento_id smallint NOT NULL REFERENCES {SCHEMA}.sentimento, "
+        "score numeric(5, 2), data_analise timestamp NOT NULL)"
+    ))
+    conexao.execute(text(
+        f"INSERT INTO {SCHEMA}.texto "
+        f"SELECT g, g % 50000, g % 5000, g % 200, ({ROTULOS})[1 + g % 8], round((g % 100) / 100.0, 2), "
+        "timestamp '2023-01-01' + (g || ' seconds')::interval FROM generate_series(1, :linhas) g"
+    ), {"linhas": linhas})
+    conexao.execute(text(
+        f"INSERT INTO {SCHEMA}.codigo "
+        "SELECT t.analise_id, t.acao_id, t.user_id, t.agent_id, s.sentimento_id, t.score, t.data_analise "
+        f"FROM {SCHEMA}.texto t JOIN {SCHEMA}.sentimento s ON s.nome = t.sentimento"
+    ))
+    conexao.execute(text(f"CREATE INDEX texto_sentimento ON {SCHEMA}.texto (sentimento)"))
+    conexao.execute(text(f"CREATE INDEX codigo_sentimento ON {SCHEMA}.codigo (sentimento_id)"))
+
+
+def medir_tamanhos(conexao):
+    print()
+    for tabela, indice in (("texto", "texto_sentimento"), ("codigo", "codigo_sentimento")):
+        tabela_bytes, indice_bytes = conexao.execute(text(
+            "SELECT pg_relation_size(:tabela), pg_relation_size(:indice)"
+        ), {"tabela": f"{SCHEMA}.{tabela}", "indice": f"{SCHEMA}.{indice}"}).one()
+        print(f"{tabela:<7} tabela {tabela_bytes / 1024 / 1024:8.1f} MiB | "
+              f"índice do sentimento {indice_bytes / 1024 / 1024:7.1f} MiB")
+
+
+def medir_consultas(conexao, repeticoes=5):
+    for nome, variantes in CONSULTAS.items():
+        print(f"\n{nome}")
+        for variante, sql in variantes.items():
+            tempos = []
+            for _ in range(repeticoes):
+                plano = conexao.execute(text(
+                    "EXPLAIN (ANALYZE, FORMAT JSON) " + sql.format(s=SCHEMA)
+                )).scalar()
+                plano = (json.loads(plano) if isinstance(plano, str) else plano)[0]
+                tempos.append(plano["Execution Time"])
+            tempos.sort()
+            print(f"  {variante:<7} mediana {tempos[len(tempos) // 2]:9.2f} ms | melhor {tempos[0]:9.2f} ms")
+
+
+def executar(linhas=2_000_000):
+    if engine.dialect.name != "postgresql":
+        print("O benchmark do dicionário de sentimentos só roda no PostgreSQL")
+        return
+    try:
+        with engine.begin() as conexao:
+            inicio = time.perf_counter()
+            criar_tabelas(conexao, linhas)
+            print(f"{linhas} linhas carregadas em {time.perf_counter() - inicio:.1f} segundos")
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conexao:
+            conexao.execute(text(f"VACUUM ANALYZE {SCHEMA}.texto"))
+            conexao.execute(text(f"VACUUM ANALYZE {SCHEMA}.codigo"))
+        with engine.connect() as conexao:
+            medir_tamanhos(conexao)
+            medir_consultas(conexao)
+    finally:
+        with engine.begin() as conexao:
+            conexao.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    executar(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
@@ -0,0 +1,46 @@
+"""
+Compara a normalização antiga dos rótulos (``unicodedata`` + dois ``re.sub``
+por linha) com ``normalizar_rotulo`` (tabela de tradução + memorização) e com a
+API em lote ``normalizar_rotulos``. Não precisa de banco.
+"""
+import os
+import re
+import sys
+import time
+import unicodedata
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.normalizacao import normalizar_rotulo, normalizar_rotulos  # noqa: E402
+
+ROTULOS = ["Satisfação", "Raiva", "Frustração", "Neutro", "Confusão", "Urgência", "alegria.", "\"Tristeza\""]
+
+
+def normalizar_antigo(word: str) -> str:
+    word = word.lower()
+    word = unicodedata.normalize('NFD', word)
+    word = re.sub(r'[\u0300-\u036f]', '', word)
+    word = re.sub(r"[\'\".,]", '', word)
+    return word
+
+
+def medir(nome, funcao, linhas):
+    inicio = time.perf_counter()
+    resultado = funcao(linhas)
+    duracao = time.perf_counter() - inicio
+    print(f"{nome:<32} {duracao * 1000:8.1f} ms ({len(linhas) / duracao:,.0f} rótulos/s)")
+    return resultado
+
+
+def comparar(quantidade=1_000_000):
+    linhas = [ROTULOS[i % len(ROTULOS)] for i in range(quantidade)]
+    print(f"{quantidade} rótulos, {len(ROTULOS)} distintos\n")
+    antigo = medir("re.sub por linha", lambda l: [normalizar_antigo(r) for r in l], linhas)
+    novo = medir("normalizar_rotulo por linha", lambda l: [normalizar_rotulo(r) for r in l], linhas)
+    lote = medir("normalizar_rotulos (lote)", normalizar_rotulos, linhas)
+    assert antigo == novo == lote, "As normalizações divergem"
+    print("\nResultados idênticos:", sorted(set(novo)))
+
+
+if __name__ == "__main__":
+    comparar(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
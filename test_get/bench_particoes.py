@@ -0,0 +1,137 @@
+"""
+Compara cs_analise_sentimento simples e particionada por mês (PostgreSQL).
+
+Cria duas tabelas de rascunho em um schema temporário, com a mesma massa de
+dados espalhada por vários anos, e mede:
+
+- tempo de execução (EXPLAIN ANALYZE) de consultas por intervalo de datas;
+- quantas partições cada consulta realmente lê;
+- tempo de VACUUM ANALYZE de cada tabela.
+
+O schema é removido no final. Usa o DATABASE_URL do .env.
+
+    python bench_particoes.py [linhas] [anos]
+"""
+import json
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.database import engine  # noqa: E402
+from app.services.particoes import proximo_mes  # noqa: E402
+
+SCHEMA = "bench_particoes"
+COLUNAS = """
+    analise_id integer NOT NULL,
+    acao_id integer NOT NULL,
+    user_id integer,
+    agent_id integer,
+    sentimento varchar(50) NOT NULL,
+    score numeric(5, 2),
+    data_analise timestamp NOT NULL
+"""
+CONSULTAS = {
+    "um dia": ("2023-06-10", "2023-06-11"),
+    "um mês": ("2023-06-01", "2023-07-01"),
+    "um trimestre": ("2023-04-01", "2023-07-01"),
+}
+
+
+def criar_tabelas(conexao, linhas: int, anos: int):
+    inicio = date(2024 - anos, 1, 1)
+    conexao.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conexao.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    conexao.execute(text(f"CREATE TABLE {SCHEMA}.simples ({COLUNAS}, PRIMARY KEY (analise_id))"))
+    conexao.execute(text(
+        f"CREATE TABLE {SCHEMA}.particionada ({COLUNAS}, PRIMARY KEY (analise_id, data_analise)) "
+        "PARTITION BY RANGE (data_analise)"
+    ))
+    mes = inicio
+    while mes < date(2024, 1, 1):
+        conexao.execute(text(
+            f"CREATE TABLE {SCHEMA}.particionada_{mes:%Y_%m} PARTITION OF {SCHEMA}.particionada "
+            f"FOR VALUES FROM ('{mes.isoformat()}') TO ('{proximo_mes(mes).isoformat()}')"
+        ))
+        mes = proximo_mes(mes)
+
+    minutos = anos * 365 * 24 * 60
+    for tabela in ("simples", "particionada"):
+        conexao.execute(text(
+            f"INSERT INTO {SCHEMA}.{tabela} "
+            "SELECT g, g % 50000, g % 5000, g % 200, "
+            "(ARRAY['raiva','frustracao','satisfacao','neutro','confusao'])[1 + g % 5], "
+            "round((g % 100) / 100.0, 2), "
+            f"timestamp '{inicio.isoformat()}' + ((g::bigint * {minutos} / :linhas) || ' minutes')::interval "
+            "FROM generate_series(1, :linhas) g"
+        ), {"linhas": linhas})
+        conexao.execute(text(f"CREATE INDEX ON {SCHEMA}.{tabela} (data_analise)"))
+
+
+def medir_consultas(conexao):
+    for nome, (inicio, fim) in CONSULTAS.items():
+        print(f"\nIntervalo de {nome} ({inicio} a {fim})")
+        for tabela in ("simples", "particionada"):
+            plano = conexao.execute(text(
+                f"EXPLAIN (ANALYZE, FORMAT JSON) SELECT * FROM {SCHEMA}.{tabela} "
+                "WHERE data_analise >= :inicio AND data_analise < :fim"
+            ), {"inicio": inicio, "fim": fim}).scalar()
+            plano = (json.loads(plano) if isinstance(plano, str) else plano)[0]
+            relacoes = set()
+            pendentes = [plano["Plan"]]
+            while pendentes:
+                no = pendentes.pop()
+                if "Relation Name" in no:
+                    relacoes.add(no["Relation Name"])
+                pendentes.extend(no.get("Plans", []))
+            print(
+                f"  {tabela:<13} execução {plano['Execution Time']:9.2f} ms | "
+                f"planejamento {plano['Planning Time']:7.2f} ms | tabelas lidas: {len(relacoes)}"
+            )
+
+
+def medir_vacuum(linhas: int):
+    # VACUUM não roda dentro de transação
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conexao:
+        print()
+        for tabela in ("simples", "particionada"):
+            # Simula a rotina diária: só o último mês recebeu escritas
+            conexao.execute(text(
+                f"UPDATE {SCHEMA}.{tabela} SET score = score WHERE data_analise >= '2023-12-01'"
+            ))
+            inicio = time.perf_counter()
+            if tabela == "particionada":
+                conexao.execute(text(f"VACUUM ANALYZE {SCHEMA}.particionada_2023_12"))
+            else:
+                conexao.execute(text(f"VACUUM ANALYZE {SCHEMA}.{tabela}"))
+            print(f"VACUUM ANALYZE após escrita no último mês ({tabela}): {time.perf_counter() - inicio:.3f} segundos")
+
+
+def executar(linhas=2_000_000, anos=3):
+    if engine.dialect.name != "postgresql":
+        print("O benchmark de partições só roda no PostgreSQL")
+        return
+    try:
+        with engine.begin() as conexao:
+            inicio = time.perf_counter()
+            criar_tabelas(conexao, linhas, anos)
+            print(f"{linhas} linhas em {anos} anos carregadas em {time.perf_counter() - inicio:.1f} segundos")
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conexao:
+            conexao.execute(text(f"ANALYZE {SCHEMA}.simples"))
+            conexao.execute(text(f"ANALYZE {SCHEMA}.particionada"))
+        with engine.connect() as conexao:
+            medir_consultas(conexao)
+        medir_vacuum(linhas)
+    finally:
+        with engine.begin() as conexao:
+            conexao.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    anos = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    executar(linhas, anos)
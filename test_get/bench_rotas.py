@@ -0,0 +1,223 @@
+"""
+Benchmark de todas as rotas GET de ``app/routers/sentimento.py``.
+
+Por padrão a aplicação roda no próprio processo (``httpx.ASGITransport``, sem
+rede e sem o lifespan: o publisher do RabbitMQ não é aberto); com ``--url`` as
+requisições vão para um servidor já rodando. As rotas são descobertas no
+router; uma rota nova sem caso em ``CASOS`` aparece como aviso, para que não
+fique fora do benchmark sem ninguém perceber.
+
+Para cada rota: aquecimento, depois ``--requisicoes`` chamadas com até
+``--concorrencia`` em paralelo, e p50/p95/p99/média/máximo/vazão/erros. O
+resultado é gravado em JSON (com o commit atual) em ``resultados/``; com
+``--comparar`` o resultado é comparado a um JSON anterior e o processo sai com
+código 1 se o p95 de alguma rota piorar mais que ``--tolerancia``.
+
+    python bench_rotas.py --semear 100000
+    python bench_rotas.py --comparar resultados/<anterior>.json
+    python bench_rotas.py --url http://127.0.0.1:8000 --rotas /sentimento/all /atendimento
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.routers import sentimento  # noqa: E402
+from dados_sinteticos import BASE_ID  # noqa: E402
+
+RESULTADOS = os.path.join(os.path.dirname(__file__), "resultados")
+
+# Caminho da rota -> URL chamada (ids e filtros dentro da massa sintética)
+CASOS = {
+    "/sentimento/recebido/metricas": "/sentimento/recebido/metricas",
+    "/sentimento/all": "/sentimento/all?limite=1000",
+    "/sentimento/recorrente": "/sentimento/recorrente",
+    "/sentimento/tecnico/{id}": f"/sentimento/tecnico/{BASE_ID + 1}",
+    "/atendimento": "/atendimento?start=2024-03-01&end=2024-03-31",
+    "/tecnico/{id}": f"/tecnico/{BASE_ID + 1}",
+    "/cliente/{id}": f"/cliente/{BASE_ID + 1}",
+    "/tecnicos/perfis": "/tecnicos/perfis?" + "&".join(f"ids={BASE_ID + i}" for i in range(1, 11)),
+    "/clientes/perfis": "/clientes/perfis?" + "&".join(f"ids={BASE_ID + i}" for i in range(1, 51)),
+    "/tecnicos-lista": "/tecnicos-lista",
+    "/clientes-lista": "/clientes-lista",
+    "/sentimento/by-score": "/sentimento/by-score?min=0.9&max=1.0",
+    "/sentimento/by-data": "/sentimento/by-data?start=2024-03-01&end=2024-03-02",
+    "/sentimento/tendencia": "/sentimento/tendencia?inicio=2024-01-01&fim=2024-12-31&granularidade=semana",
+    "/sentimento/mais-negativo": "/sentimento/mais-negativo",
+    "/sentimento/quantidade": "/sentimento/quantidade",
+    "/sentimento/mais-frequente": "/sentimento/mais-frequente",
+}
+
+# Rotas que não fazem sentido medir por latência de requisição
+IGNORADAS = {
+    "/sentimento/stream": "fluxo SSE sem fim (veja test_feed_carga.py)",
+    "/sentimento/exportar": "exportação da tabela inteira, medida por vazão e não por latência",
+}
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def descobrir_rotas(filtro=None):
+    """
+    Rotas GET do router de sentimentos com o caso de benchmark de cada uma.
+    """
+    casos = {}
+    for rota in sentimento.router.routes:
+        if "GET" not in getattr(rota, "methods", ()):
+            continue
+        if rota.path in IGNORADAS:
+            print(f"Ignorando {rota.path}: {IGNORADAS[rota.path]}")
+        elif rota.path not in CASOS:
+            print(f"Aviso: {rota.path} não tem caso de benchmark em CASOS")
+        elif not filtro or rota.path in filtro:
+            casos[rota.path] = CASOS[rota.path]
+    return casos
+
+
+def commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def medir_rota(cliente, url, requisicoes, concorrencia, aquecimento):
+    for _ in range(aquecimento):
+        await cliente.get(url)
+
+    semaforo = asyncio.Semaphore(concorrencia)
+    latencias = []
+    erros = 0
+
+    async def chamar():
+        nonlocal erros
+        async with semaforo:
+            inicio = time.perf_counter()
+            try:
+                resposta = await cliente.get(url)
+                await resposta.aread()
+                if resposta.status_code >= 400:
+                    erros += 1
+            except httpx.HTTPError:
+                erros += 1
+            latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(chamar() for _ in range(requisicoes)))
+    duracao = time.perf_counter() - inicio
+
+    return {
+        "url": url,
+        "requisicoes": requisicoes,
+        "erros": erros,
+        "p50_ms": round(percentil(latencias, 50) * 1000, 3),
+        "p95_ms": round(percentil(latencias, 95) * 1000, 3),
+        "p99_ms": round(percentil(latencias, 99) * 1000, 3),
+        "media_ms": round(sum(latencias) / len(latencias) * 1000, 3),
+        "max_ms": round(max(latencias) * 1000, 3),
+        "rps": round(requisicoes / duracao, 1),
+    }
+
+
+def criar_cliente(url):
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=120)
+    from main import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120)
+
+
+async def executar(args):
+    casos = descobrir_rotas(args.rotas)
+    resultado = {
+        "commit": commit_atual(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "configuracao": {
+            "alvo": args.url or "asgi",
+            "analises": args.semear,
+            "requisicoes": args.requisicoes,
+            "concorrencia": args.concorrencia,
+        },
+        "rotas": {},
+    }
+    async with criar_cliente(args.url) as cliente:
+        for caminho, url in casos.items():
+            metricas = await medir_rota(cliente, url, args.requisicoes, args.concorrencia, args.aquecimento)
+            resultado["rotas"][caminho] = metricas
+            print(f"{caminho:<32} p50 {metricas['p50_ms']:8.2f} ms | p95 {metricas['p95_ms']:8.2f} ms | "
+                  f"p99 {metricas['p99_ms']:8.2f} ms | {metricas['rps']:8.1f} req/s | erros {metricas['erros']}")
+    return resultado
+
+
+def gravar(resultado):
+    os.makedirs(RESULTADOS, exist_ok=True)
+    nome = f"{resultado['data'].replace(':', '')}-{resultado['commit'] or 'sem-commit'}.json"
+    caminho = os.path.join(RESULTADOS, nome)
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+    print(f"\nResultado gravado em {caminho}")
+
+
+def comparar(resultado, caminho_base, tolerancia):
+    """
+    Compara o p95 de cada rota com um resultado anterior.
+
+    Returns:
+        bool: ``True`` se alguma rota piorou mais que ``tolerancia`` (em %).
+    """
+    with open(caminho_base, encoding="utf-8") as arquivo:
+        base = json.load(arquivo)
+    print(f"\nComparação com {base.get('commit')} ({base.get('data')}), tolerância {tolerancia:.0f}% no p95")
+    regrediu = False
+    for caminho, atual in resultado["rotas"].items():
+        anterior = base["rotas"].get(caminho)
+        if not anterior or not anterior["p95_ms"]:
+            print(f"{caminho:<32} sem referência")
+            continue
+        variacao = (atual["p95_ms"] - anterior["p95_ms"]) / anterior["p95_ms"] * 100
+        marca = ""
+        if variacao > tolerancia:
+            marca = "  <- regressão"
+            regrediu = True
+        print(f"{caminho:<32} p95 {anterior['p95_ms']:8.2f} -> {atual['p95_ms']:8.2f} ms ({variacao:+6.1f}%){marca}")
+    return regrediu
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das rotas GET de sentimentos")
+    parser.add_argument("--url", help="Servidor já rodando; sem ele a aplicação roda no processo")
+    parser.add_argument("--semear", type=int, help="Recria a massa sintética com N análises antes de medir")
+    parser.add_argument("--requisicoes", type=int, default=200)
+    parser.add_argument("--concorrencia", type=int, default=20)
+    parser.add_argument("--aquecimento", type=int, default=5)
+    parser.add_argument("--rotas", nargs="*", help="Mede só estas rotas (caminho como no router)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=20.0, help="Piora máxima do p95, em %%")
+    args = parser.parse_args()
+
+    if args.semear:
+        from dados_sinteticos import semear
+        semear(args.semear)
+
+    resultado = asyncio.run(executar(args))
+    gravar(resultado)
+    if args.comparar and comparar(resultado, args.comparar, args.tolerancia):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Micro-benchmark do custo por linha para serializar as listas de análises.
+
+Compara o caminho padrão do FastAPI (objetos ORM -> jsonable_encoder -> json)
+com o atual (só as colunas necessárias -> codificar_json/orjson). Não precisa
+de banco: os objetos são montados em memória.
+
+    python bench_serializacao.py [linhas]
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from sqlalchemy import DECIMAL, TIMESTAMP, Column, Integer, String  # noqa: E402
+from sqlalchemy.orm import declarative_base  # noqa: E402
+
+from app.respostas import codificar_json, orjson  # noqa: E402
+
+Base = declarative_base()
+
+
+class AnaliseSentimento(Base):
+    # Mesmas colunas de app.models.AnaliseSentimento, sem depender do DATABASE_URL
+    __tablename__ = "cs_analise_sentimento"
+
+    analise_id = Column(Integer, primary_key=True)
+    acao_id = Column(Integer, nullable=False)
+    user_id = Column(Integer)
+    agent_id = Column(Integer)
+    sentimento = Column(String(50), nullable=False)
+    score = Column(DECIMAL(5, 2))
+    data_analise = Column(TIMESTAMP)
+
+
+def gerar(linhas):
+    inicio = datetime(2024, 1, 1)
+    sentimentos = ["raiva", "frustracao", "satisfacao", "neutro"]
+    return [
+        {
+            "analise_id": i,
+            "acao_id": i // 4,
+            "user_id": i % 5000,
+            "agent_id": i % 200,
+            "sentimento": sentimentos[i % 4],
+            "score": Decimal(i % 100) / 100,
+            "data_analise": inicio + timedelta(minutes=i),
+        }
+        for i in range(linhas)
+    ]
+
+
+def medir(nome, funcao, linhas, repeticoes=5):
+    melhores = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        corpo = funcao()
+        melhores.append(time.perf_counter() - inicio)
+    duracao = min(melhores)
+    print(f"{nome:<45} {duracao * 1e6 / linhas:8.2f} µs/linha | {len(corpo) / 1024:8.0f} KiB")
+    return duracao
+
+
+def executar(linhas=50_000):
+    dados = gerar(linhas)
+    objetos = [AnaliseSentimento(**d) for d in dados]
+
+    print(f"{linhas} linhas (orjson {'disponível' if orjson else 'ausente: usando json'})\n")
+    antes = medir(
+        "ORM + jsonable_encoder + json.dumps (antes)",
+        lambda: json.dumps(jsonable_encoder(objetos)).encode(),
+        linhas
+    )
+    medir(
+        "dicts + jsonable_encoder + json.dumps",
+        lambda: json.dumps(jsonable_encoder(dados)).encode(),
+        linhas
+    )
+    depois = medir(
+        "dicts + codificar_json (depois)",
+        lambda: codificar_json(dados),
+        linhas
+    )
+    print(f"\nGanho: {antes / depois:.1f}x")
+
+
+if __name__ == "__main__":
+    executar(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
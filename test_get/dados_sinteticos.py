@@ -0,0 +1,184 @@
+"""
+Massa de dados sintética para benchmarks, em escala configurável.
+
+Os registros usam ids a partir de ``BASE_ID`` para não colidir com dados
+reais e podem ser removidos com ``limpar``. No PostgreSQL a carga usa
+``generate_series``; nos demais bancos, ``INSERT`` em lote. Depois da carga as
+estatísticas são reconstruídas para refletir as novas análises.
+
+    python dados_sinteticos.py semear 100000
+    python dados_sinteticos.py limpar
+"""
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import text  # noqa: E402
+
+from app import models  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.services.dicionario_sentimentos import dicionario_sentimentos  # noqa: E402
+from app.services.estatisticas import reconstruir_estatisticas  # noqa: E402
+
+BASE_ID = 900_000_000
+ROTULOS = ["raiva", "frustracao", "satisfacao", "neutro", "confusao", "urgencia", "alegria", "tristeza"]
+INICIO = datetime(2024, 1, 1)
+LOTE = 5000
+
+
+@dataclass
+class Escala:
+    """
+    Quantidades derivadas do número de análises.
+    """
+    analises: int
+
+    @property
+    def acoes(self) -> int:
+        return max(self.analises // 4, 1)
+
+    @property
+    def eventos(self) -> int:
+        return max(self.analises // 8, 1)
+
+    @property
+    def tecnicos(self) -> int:
+        return max(self.analises // 10_000, 10)
+
+    @property
+    def clientes(self) -> int:
+        return max(self.analises // 400, 100)
+
+    @property
+    def minutos(self) -> int:
+        # Espalha as análises por cerca de um ano
+        return 365 * 24 * 60
+
+
+def _semear_postgresql(conexao, escala: Escala, codigos: list[int]):
+    p = {
+        "base": BASE_ID, "analises": escala.analises, "acoes": escala.acoes, "eventos": escala.eventos,
+        "tecnicos": escala.tecnicos, "clientes": escala.clientes, "minutos": escala.minutos,
+        "codigos": codigos, "inicio": INICIO,
+    }
+    conexao.execute(text(
+        "INSERT INTO cs_agents (agent_id, nome, email, username) "
+        "SELECT :base + g, 'Técnico ' || g, 'tecnico' || g || '@bench', 'tecnico' || g "
+        "FROM generate_series(1, :tecnicos) g"
+    ), p)
+    conexao.execute(text(
+        "INSERT INTO cs_user (user_id, name, email, username) "
+        "SELECT :base + g, 'Cliente ' || g, 'cliente' || g || '@bench', 'cliente' || g "
+        "FROM generate_series(1, :clientes) g"
+    ), p)
+    conexao.execute(text(
+        "INSERT INTO cs_events (event_id, descricao, data_abertura, status_id) "
+        "SELECT :base + g, 'Conversa ' || g, :inicio + (g % :minutos || ' minutes')::interval, 1 "
+        "FROM generate_series(1, :eventos) g"
+    ), p)
+    conexao.execute(text(
+        "INSERT INTO cs_acoes (acao_id, event_id, descricao, agent_id, user_id, data_acao) "
+        "SELECT :base + g, :base + 1 + g % :eventos, 'Ação ' || g, :base + 1 + g % :tecnicos, "
+        ":base + 1 + g % :clientes, :inicio + ((g::bigint * :minutos / :acoes) || ' minutes')::interval "
+        "FROM generate_series(1, :acoes) g"
+    ), p)
+    conexao.execute(text(
+        "INSERT INTO cs_analise_sentimento (analise_id, acao_id, user_id, agent_id, sentimento_id, score, data_analise) "
+        "SELECT :base + g, :base + 1 + g % :acoes, :base + 1 + g % :clientes, :base + 1 + g % :tecnicos, "
+        "(CAST(:codigos AS smallint[]))[1 + g % cardinality(CAST(:codigos AS smallint[]))], "
+        "round((g % 100) / 100.0, 2), :inicio + ((g::bigint * :minutos / :analises) || ' minutes')::interval "
+        "FROM generate_series(1, :analises) g"
+    ), p)
+
+
+def _em_lotes(conexao, tabela, gerar, total: int):
+    for inicio in range(1, total + 1, LOTE):
+        conexao.execute(tabela.insert(), [gerar(g) for g in range(inicio, min(inicio + LOTE, total + 1))])
+
+
+def _semear_generico(conexao, escala: Escala, codigos: list[int]):
+    b = BASE_ID
+    _em_lotes(conexao, models.Agent.__table__, lambda g: {
+        "agent_id": b + g, "nome": f"Técnico {g}", "email": f"tecnico{g}@bench", "username": f"tecnico{g}",
+    }, escala.tecnicos)
+    _em_lotes(conexao, models.User.__table__, lambda g: {
+        "user_id": b + g, "name": f"Cliente {g}", "email": f"cliente{g}@bench", "username": f"cliente{g}",
+    }, escala.clientes)
+    _em_lotes(conexao, models.Event.__table__, lambda g: {
+        "event_id": b + g, "descricao": f"Conversa {g}", "status_id": 1,
+        "data_abertura": INICIO + timedelta(minutes=g % escala.minutos),
+    }, escala.eventos)
+    _em_lotes(conexao, models.Acao.__table__, lambda g: {
+        "acao_id": b + g, "event_id": b + 1 + g % escala.eventos, "descricao": f"Ação {g}",
+        "agent_id": b + 1 + g % escala.tecnicos, "user_id": b + 1 + g % escala.clientes,
+        "data_acao": INICIO + timedelta(minutes=g * escala.minutos // escala.acoes),
+    }, escala.acoes)
+    _em_lotes(conexao, models.AnaliseSentimento.__table__, lambda g: {
+        "analise_id": b + g, "acao_id": b + 1 + g % escala.acoes, "user_id": b + 1 + g % escala.clientes,
+        "agent_id": b + 1 + g % escala.tecnicos, "sentimento_id": codigos[g % len(codigos)],
+        "score": round((g % 100) / 100, 2),
+        "data_analise": INICIO + timedelta(minutes=g * escala.minutos // escala.analises),
+    }, escala.analises)
+
+
+def limpar():
+    """
+    Remove os registros sintéticos (ids a partir de ``BASE_ID``).
+    """
+    with engine.begin() as conexao:
+        for tabela, coluna in (
+            ("cs_analise_sentimento", "analise_id"),
+            ("cs_acoes", "acao_id"),
+            ("cs_events", "event_id"),
+            ("cs_user", "user_id"),
+            ("cs_agents", "agent_id"),
+        ):
+            conexao.execute(text(f"DELETE FROM {tabela} WHERE {coluna} >= :base"), {"base": BASE_ID})
+    _reconstruir()
+
+
+def _reconstruir():
+    db = SessionLocal()
+    try:
+        reconstruir_estatisticas(db)
+    finally:
+        db.close()
+
+
+def semear(analises: int) -> Escala:
+    """
+    Substitui a massa sintética por uma com ``analises`` análises.
+
+    Returns:
+        Escala: Quantidades geradas; os ids vão de ``BASE_ID + 1`` até ``BASE_ID + quantidade``.
+    """
+    limpar()
+    escala = Escala(analises)
+    with SessionLocal() as db:
+        codigos = list(dicionario_sentimentos.codigos(db, ROTULOS).values())
+    inicio = time.perf_counter()
+    with engine.begin() as conexao:
+        if engine.dialect.name == "postgresql":
+            _semear_postgresql(conexao, escala, codigos)
+        else:
+            _semear_generico(conexao, escala, codigos)
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conexao:
+            conexao.execute(text("ANALYZE"))
+    _reconstruir()
+    print(f"{analises} análises sintéticas carregadas em {time.perf_counter() - inicio:.1f} segundos")
+    return escala
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "limpar":
+        limpar()
+    elif len(sys.argv) > 1 and sys.argv[1] == "semear":
+        semear(int(sys.argv[2]) if len(sys.argv) > 2 else 100_000)
+    else:
+        print("Uso: python dados_sinteticos.py semear [analises] | limpar")
+        sys.exit(1)
@@ -1,3 +1,7 @@
+import time
+
+import requests
+
 from utils import medir_tempo
 
 def testar_get_atendimento():
@@ -8,9 +12,25 @@ def testar_get_atendimento():
     print(f"Status: {resposta.status_code}")
     print(f"Tempo de resposta: {duracao:.4f} segundos")
     try:
-        print("Dados:", resposta.json())
+        dados = resposta.json()
+        print(f"Registros retornados: {len(dados)} ({len(dados) / duracao:.0f} linhas/s)")
     except Exception as e:
         print("Erro ao interpretar JSON:", e)
 
+def testar_get_atendimento_ndjson():
+    url = "http://127.0.0.1:8000/atendimento?formato=ndjson"
+    inicio = time.perf_counter()
+    registros = 0
+    with requests.get(url, stream=True) as resposta:
+        for linha in resposta.iter_lines():
+            if linha:
+                registros += 1
+    duracao = time.perf_counter() - inicio
+
+    print(f"\nGET {url} (streaming)")
+    print(f"Status: {resposta.status_code}")
+    print(f"Registros: {registros} em {duracao:.4f} segundos ({registros / duracao:.0f} linhas/s)")
+
 if __name__ == "__main__":
     testar_get_atendimento()
+    testar_get_atendimento_ndjson()
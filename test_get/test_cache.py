@@ -0,0 +1,30 @@
+import requests
+
+from utils import medir_tempo
+
+BASE_URL = "http://127.0.0.1:8000"
+ROTAS = [
+    "/tecnicos-lista",
+    "/clientes-lista",
+    "/sentimento/recorrente",
+    "/tecnico/1",
+    "/cliente/1",
+]
+
+
+def testar_cache(repeticoes=20):
+    for rota in ROTAS:
+        url = f"{BASE_URL}{rota}"
+        primeira, resposta = medir_tempo(url)
+        tempos = [medir_tempo(url)[0] for _ in range(repeticoes)]
+
+        print(f"\nGET {url}")
+        print(f"Status: {resposta.status_code}")
+        print(f"Primeira chamada: {primeira:.4f} segundos")
+        print(f"Chamadas seguintes (média de {repeticoes}): {sum(tempos) / len(tempos):.4f} segundos")
+
+    print("\nMétricas do cache:", requests.get(f"{BASE_URL}/metricas/cache").json())
+
+
+if __name__ == "__main__":
+    testar_cache()
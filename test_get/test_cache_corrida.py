@@ -0,0 +1,53 @@
+"""
+Invalidação que chega enquanto a consulta de um item do cache está rodando.
+
+Roda no processo, sem servidor nem banco:
+
+    python test_cache_corrida.py
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.services.cache import BackendMemoria, CacheRotas, TAG_SENTIMENTOS
+
+
+async def testar_invalidacao_durante_calculo():
+    cache = CacheRotas(BackendMemoria(), ttl=60, habilitado=True)
+    dados = {"total": 1}
+    consultando = asyncio.Event()
+    liberar = asyncio.Event()
+
+    async def calcular_lento():
+        lido = dict(dados)
+        consultando.set()
+        await liberar.wait()
+        return lido
+
+    async def calcular():
+        return dict(dados)
+
+    tarefa = asyncio.create_task(cache.obter_ou_calcular("rota", calcular_lento, tags=(TAG_SENTIMENTOS,)))
+    await consultando.wait()
+    # Escrita confirmada no banco e invalidação enquanto a consulta ainda não terminou
+    dados["total"] = 2
+    cache.invalidar((TAG_SENTIMENTOS,))
+    liberar.set()
+    print("Resposta da consulta em andamento:", await tarefa)
+
+    seguinte = await cache.obter_ou_calcular("rota", calcular, tags=(TAG_SENTIMENTOS,))
+    print("Próxima chamada:", seguinte)
+    print("Métricas:", cache.metricas())
+    assert seguinte == {"total": 2}, "o resultado anterior à escrita ficou no cache"
+    assert cache.metricas()["gravacoes_descartadas"] == 1
+
+    # Sem invalidação no meio, o resultado é gravado normalmente
+    await cache.obter_ou_calcular("rota", calcular, tags=(TAG_SENTIMENTOS,))
+    assert cache.metricas()["acertos"] == 1
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(testar_invalidacao_durante_calculo())
@@ -0,0 +1,71 @@
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+BASE_URL = "http://127.0.0.1:8000"
+ROTAS = [
+    "/sentimento/recorrente",
+    "/sentimento/mais-frequente",
+    "/tecnico/1",
+    "/clientes-lista",
+]
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+async def disparar(cliente, rota, total, concorrencia):
+    semaforo = asyncio.Semaphore(concorrencia)
+    latencias = []
+    falhas = 0
+
+    async def uma_requisicao():
+        nonlocal falhas
+        async with semaforo:
+            inicio = time.perf_counter()
+            resposta = await cliente.get(rota)
+            latencias.append(time.perf_counter() - inicio)
+            if resposta.status_code >= 400:
+                falhas += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(uma_requisicao() for _ in range(total)))
+    return latencias, falhas, time.perf_counter() - inicio
+
+
+async def medir_concorrencia(total=500, niveis=(1, 10, 50, 100)):
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=60) as cliente:
+        for rota in ROTAS:
+            print(f"\nGET {rota}")
+            for concorrencia in niveis:
+                latencias, falhas, duracao = await disparar(cliente, rota, total, concorrencia)
+                print(
+                    f"  concorrência {concorrencia:>3}: "
+                    f"p50 {percentil(latencias, 50) * 1000:7.1f} ms | "
+                    f"p99 {percentil(latencias, 99) * 1000:7.1f} ms | "
+                    f"média {statistics.mean(latencias) * 1000:7.1f} ms | "
+                    f"{total / duracao:7.1f} req/s | falhas {falhas}"
+                )
+
+        # Latência de uma rota sem banco enquanto as demais estão sob carga:
+        # se o event loop estiver bloqueado por I/O síncrono, ela sobe junto.
+        carga = asyncio.gather(*(disparar(cliente, rota, total, 50) for rota in ROTAS))
+        sonda = []
+        while not carga.done():
+            inicio = time.perf_counter()
+            await cliente.get("/")
+            sonda.append(time.perf_counter() - inicio)
+            await asyncio.sleep(0.01)
+        await carga
+        print(f"\nGET / durante a carga: p50 {percentil(sonda, 50) * 1000:.1f} ms | p99 {percentil(sonda, 99) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    asyncio.run(medir_concorrencia(total))
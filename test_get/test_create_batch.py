@@ -0,0 +1,66 @@
+import json
+import time
+
+import requests
+
+from utils import medir_tempo_post
+
+BASE_URL = "http://127.0.0.1:8000"
+
+
+def gerar_acoes(quantidade):
+    return [
+        {
+            "acao_id": i,
+            "event_id": 1,
+            "descricao": f"Descrição de teste {i}",
+            "agent_id": 1,
+            "user_id": 1,
+            "data_acao": "2024-01-01T10:00:00"
+        }
+        for i in range(1, quantidade + 1)
+    ]
+
+
+def comparar_create_batch(quantidade=500, chunk_size=100):
+    acoes = gerar_acoes(quantidade)
+
+    url = f"{BASE_URL}/sentimento/create"
+    sessao = requests.Session()
+    inicio = time.perf_counter()
+    falhas = 0
+    for acao in acoes:
+        if sessao.post(url, json=acao).status_code != 200:
+            falhas += 1
+    duracao_unitario = time.perf_counter() - inicio
+
+    print(f"\nPOST {url} x {quantidade}")
+    print(f"Falhas: {falhas}")
+    print(f"Tempo total: {duracao_unitario:.4f} segundos ({quantidade / duracao_unitario:.1f} ações/s)")
+
+    url = f"{BASE_URL}/sentimento/create/batch?chunk_size={chunk_size}"
+    duracao_lote, resposta = medir_tempo_post(url, json=acoes)
+
+    print(f"\nPOST {url} (lista JSON com {quantidade} ações)")
+    print(f"Status: {resposta.status_code}")
+    print(f"Tempo total: {duracao_lote:.4f} segundos ({quantidade / duracao_lote:.1f} ações/s)")
+
+    corpo = "\n".join(json.dumps(acao) for acao in acoes)
+    duracao_ndjson, resposta = medir_tempo_post(
+        url, data=corpo, headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    print(f"\nPOST {url} (NDJSON com {quantidade} ações)")
+    print(f"Status: {resposta.status_code}")
+    print(f"Tempo total: {duracao_ndjson:.4f} segundos ({quantidade / duracao_ndjson:.1f} ações/s)")
+    try:
+        dados = resposta.json()
+        print(f"Enviados: {dados['enviados']} | Falhas: {dados['falhas']}")
+    except Exception as e:
+        print("Erro ao interpretar JSON:", e)
+
+    print(f"\nGanho do lote sobre chamadas unitárias: {duracao_unitario / duracao_lote:.1f}x")
+
+
+if __name__ == "__main__":
+    comparar_create_batch()
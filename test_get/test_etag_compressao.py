@@ -0,0 +1,44 @@
+import time
+
+import requests
+
+BASE_URL = "http://127.0.0.1:8000"
+ROTAS = [
+    "/sentimento/recorrente",
+    "/atendimento",
+    "/atendimento?limite=500",
+]
+
+
+def testar_etag_compressao(repeticoes=20):
+    for rota in ROTAS:
+        url = f"{BASE_URL}{rota}"
+
+        resposta = requests.get(url, headers={"Accept-Encoding": "identity"})
+        tamanho_original = len(resposta.content)
+        comprimida = requests.get(url, headers={"Accept-Encoding": "br, gzip"}, stream=True)
+        tamanho_comprimido = len(comprimida.raw.read())
+        etag = resposta.headers.get("ETag")
+
+        tempos_200 = []
+        tempos_304 = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            requests.get(url)
+            tempos_200.append(time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            condicional = requests.get(url, headers={"If-None-Match": etag})
+            tempos_304.append(time.perf_counter() - inicio)
+
+        print(f"\nGET {url}")
+        print(f"ETag: {etag}")
+        print(f"Tamanho: {tamanho_original} bytes sem compressão, "
+              f"{tamanho_comprimido} bytes com {comprimida.headers.get('Content-Encoding', 'nenhuma')}")
+        print(f"Status com If-None-Match: {condicional.status_code}")
+        print(f"Média 200: {sum(tempos_200) / repeticoes:.4f} segundos")
+        print(f"Média 304: {sum(tempos_304) / repeticoes:.4f} segundos")
+
+
+if __name__ == "__main__":
+    testar_etag_compressao()
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import sys
+import time
+
+import httpx
+
+BASE_URL = "http://127.0.0.1:8000"
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def gerar_resultados(quantidade):
+    return [
+        {"acao_id": 1, "user_id": 1, "agent_id": 1, "sentimento": "Neutro", "score": 0.5}
+        for _ in range(quantidade)
+    ]
+
+
+async def assinar(cliente, conectados, inicio_envio, esperados, resultado):
+    """
+    Abre uma conexão SSE e registra quando cada análise chega.
+    """
+    recebidos = 0
+    perdidos = 0
+    primeiro = None
+    try:
+        async with cliente.stream("GET", "/sentimento/stream", params={"agent_id": 1}) as resposta:
+            if resposta.status_code != 200:
+                resultado.append({"erro": resposta.status_code})
+                conectados.release()
+                return
+            conectados.release()
+            evento = None
+            async for linha in resposta.aiter_lines():
+                if linha.startswith("event: "):
+                    evento = linha[7:]
+                elif linha.startswith("data: ") and evento == "analise":
+                    recebidos += 1
+                    if primeiro is None:
+                        primeiro = time.perf_counter()
+                elif linha.startswith("data: ") and evento == "perdidos":
+                    perdidos += json.loads(linha[6:])["quantidade"]
+                if recebidos + perdidos >= esperados:
+                    break
+    except httpx.HTTPError as e:
+        resultado.append({"erro": repr(e)})
+        return
+    resultado.append({
+        "recebidos": recebidos,
+        "perdidos": perdidos,
+        "primeiro": primeiro - inicio_envio[0] if primeiro else None,
+        "ultimo": time.perf_counter() - inicio_envio[0],
+    })
+
+
+async def medir_feed(assinantes=500, analises=200):
+    limites = httpx.Limits(max_connections=assinantes + 10, max_keepalive_connections=assinantes + 10)
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=120, limits=limites) as cliente:
+        conectados = asyncio.Semaphore(0)
+        inicio_envio = [0.0]
+        resultado = []
+        tarefas = [
+            asyncio.create_task(assinar(cliente, conectados, inicio_envio, analises, resultado))
+            for _ in range(assinantes)
+        ]
+        for _ in range(assinantes):
+            await conectados.acquire()
+        print(f"{assinantes} assinantes conectados")
+
+        inicio_envio[0] = time.perf_counter()
+        await cliente.post("/sentimento/recebido/batch", json=gerar_resultados(analises))
+        await asyncio.wait(tarefas, timeout=60)
+
+        metricas = (await cliente.get("/sentimento/recebido/metricas")).json().get("feed")
+
+    ok = [r for r in resultado if "erro" not in r]
+    erros = len(resultado) - len(ok)
+    if not ok:
+        print(f"Nenhum assinante recebeu eventos ({erros} erros)")
+        return
+    primeiros = [r["primeiro"] for r in ok if r["primeiro"] is not None]
+    ultimos = [r["ultimo"] for r in ok]
+    print(f"Análises publicadas: {analises} | assinantes com resposta: {len(ok)} | erros: {erros}")
+    print(f"Eventos recebidos: {sum(r['recebidos'] for r in ok)} | perdidos por atraso: {sum(r['perdidos'] for r in ok)}")
+    if primeiros:
+        print(f"Primeiro evento: p50 {percentil(primeiros, 50) * 1000:.1f} ms | p99 {percentil(primeiros, 99) * 1000:.1f} ms")
+    print(f"Último evento:   p50 {percentil(ultimos, 50) * 1000:.1f} ms | p99 {percentil(ultimos, 99) * 1000:.1f} ms")
+    print("Métricas do feed:", metricas)
+
+
+if __name__ == "__main__":
+    assinantes = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    analises = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    asyncio.run(medir_feed(assinantes, analises))
@@ -0,0 +1,80 @@
+import asyncio
+import sys
+import time
+
+import httpx
+
+BASE_URL = "http://127.0.0.1:8000"
+ROTAS_SONDA = ["/", "/sentimento/quantidade"]
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+async def sondar(cliente, parar, latencias):
+    """
+    Chama rotas que não envolvem senha enquanto ``parar`` não for sinalizado.
+    """
+    while not parar.is_set():
+        for rota in ROTAS_SONDA:
+            inicio = time.perf_counter()
+            await cliente.get(rota)
+            latencias.setdefault(rota, []).append(time.perf_counter() - inicio)
+        await asyncio.sleep(0.01)
+
+
+def resumo(latencias):
+    return " | ".join(
+        f"{rota} p50 {percentil(v, 50) * 1000:.1f} ms p99 {percentil(v, 99) * 1000:.1f} ms"
+        for rota, v in latencias.items()
+    )
+
+
+async def tempestade_login(usuario, senha, total=200, concorrencia=50):
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=60) as cliente:
+        # Linha de base, sem logins
+        parar = asyncio.Event()
+        base = {}
+        sonda = asyncio.create_task(sondar(cliente, parar, base))
+        await asyncio.sleep(3)
+        parar.set()
+        await sonda
+        print(f"Sem logins:     {resumo(base)}")
+
+        parar = asyncio.Event()
+        durante = {}
+        sonda = asyncio.create_task(sondar(cliente, parar, durante))
+        semaforo = asyncio.Semaphore(concorrencia)
+        status = {}
+        latencias_login = []
+
+        async def login():
+            async with semaforo:
+                inicio = time.perf_counter()
+                resposta = await cliente.post("/token", data={"username": usuario, "password": senha})
+                latencias_login.append(time.perf_counter() - inicio)
+                status[resposta.status_code] = status.get(resposta.status_code, 0) + 1
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(total)))
+        duracao = time.perf_counter() - inicio
+        parar.set()
+        await sonda
+
+        print(f"Durante logins: {resumo(durante)}")
+        print(f"\nLogins: {total} em {duracao:.2f} s ({total / duracao:.1f}/s) | status {status}")
+        print(f"Latência do login: p50 {percentil(latencias_login, 50) * 1000:.1f} ms | "
+              f"p99 {percentil(latencias_login, 99) * 1000:.1f} ms")
+        print("Pool de senhas:", (await cliente.get("/metricas/auth")).json().get("senhas"))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Uso: python test_login_carga.py <usuario> <senha> [total] [concorrencia]")
+        sys.exit(1)
+    total = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    concorrencia = int(sys.argv[4]) if len(sys.argv) > 4 else 50
+    asyncio.run(tempestade_login(sys.argv[1], sys.argv[2], total, concorrencia))
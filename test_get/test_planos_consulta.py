@@ -0,0 +1,138 @@
+"""
+Regressão de planos de consulta (PostgreSQL).
+
+Popula as tabelas dentro de uma transação (desfeita no final), roda ANALYZE,
+executa os serviços que filtram por colunas indexadas e faz EXPLAIN de cada SQL
+emitido. Falha (código de saída 1) se algum deles ler cs_acoes ou
+cs_analise_sentimento com Seq Scan. Usa o DATABASE_URL do .env.
+
+    python test_planos_consulta.py [quantidade_de_analises]
+"""
+import datetime
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import event, text  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.database import engine  # noqa: E402
+from app.services import services_sentimentos  # noqa: E402
+
+TABELAS_VIGIADAS = {"cs_acoes", "cs_analise_sentimento"}
+# IDs altos para não colidir com dados existentes
+BASE_ID = 900_000_000
+
+
+def popular(conexao, analises: int):
+    acoes = max(analises // 4, 1)
+    parametros = {"base": BASE_ID, "acoes": acoes, "analises": analises}
+    conexao.execute(text(
+        "INSERT INTO cs_agents (agent_id, nome) "
+        "SELECT :base + g, 'Técnico ' || g FROM generate_series(1, 200) g"
+    ), parametros)
+    conexao.execute(text(
+        "INSERT INTO cs_user (user_id, name) "
+        "SELECT :base + g, 'Cliente ' || g FROM generate_series(1, 5000) g"
+    ), parametros)
+    conexao.execute(text(
+        "INSERT INTO cs_events (event_id, descricao, data_abertura, status_id) "
+        "SELECT :base + g, 'Conversa ' || g, now() - (g || ' minutes')::interval, 1 "
+        "FROM generate_series(1, 2000) g"
+    ), parametros)
+    conexao.execute(text(
+        "INSERT INTO cs_acoes (acao_id, event_id, descricao, agent_id, user_id, data_acao) "
+        "SELECT :base + g, :base + 1 + g % 2000, 'Ação ' || g, :base + 1 + g % 200, :base + 1 + g % 5000, "
+        "timestamp '2021-01-01' + (g || ' minutes')::interval "
+        "FROM generate_series(1, :acoes) g"
+    ), parametros)
+    conexao.execute(text(
+        "INSERT INTO cs_sentimento (nome) "
+        "SELECT unnest(ARRAY['raiva','frustracao','satisfacao','neutro','confusao']) "
+        "ON CONFLICT (nome) DO NOTHING"
+    ))
+    conexao.execute(text(
+        "INSERT INTO cs_analise_sentimento (analise_id, acao_id, user_id, agent_id, sentimento_id, score, data_analise) "
+        "SELECT :base + g, :base + 1 + g % :acoes, :base + 1 + g % 5000, :base + 1 + g % 200, s.sentimento_id, "
+        "round((g % 100) / 100.0, 2), timestamp '2021-01-01' + (g || ' minutes')::interval "
+        "FROM generate_series(1, :analises) g "
+        "JOIN cs_sentimento s ON s.nome = (ARRAY['raiva','frustracao','satisfacao','neutro','confusao'])[1 + g % 5]"
+    ), parametros)
+    for tabela in ("cs_agents", "cs_user", "cs_events", "cs_acoes", "cs_analise_sentimento"):
+        conexao.execute(text(f"ANALYZE {tabela}"))
+
+
+def casos(db: Session):
+    tecnico = BASE_ID + 7
+    cliente = BASE_ID + 42
+    inicio = datetime.date(2021, 1, 10)
+    fim = datetime.date(2021, 1, 11)
+    return {
+        "/sentimento/tecnico/{id}": lambda: services_sentimentos.get_sentimentos_por_id(tecnico, db),
+        "/sentimento/by-score": lambda: services_sentimentos.get_sentimentos_by_score(0.10, 0.10, db),
+        "/sentimento/by-data": lambda: services_sentimentos.get_sentimentos_by_data(inicio, fim, db),
+        "/sentimento/all?limite&apos": lambda: services_sentimentos.get_sentimentos_pagina(db, 100, BASE_ID + 1000),
+        "/atendimento?agent_id": lambda: services_sentimentos.get_atendimento_pagina(db, 100, agent_id=tecnico),
+        "/atendimento?user_id": lambda: services_sentimentos.get_atendimento(db, user_id=cliente),
+        "/atendimento?start&end": lambda: services_sentimentos.get_atendimento(db, start=inicio, end=inicio),
+        "/tecnico/{id}": lambda: services_sentimentos.get_tecnico(tecnico, db),
+        "/cliente/{id}": lambda: services_sentimentos.get_cliente(cliente, db),
+    }
+
+
+def varreduras_sequenciais(plano) -> set[str]:
+    encontradas = set()
+    pendentes = [plano]
+    while pendentes:
+        no = pendentes.pop()
+        if no.get("Node Type") == "Seq Scan" and no.get("Relation Name") in TABELAS_VIGIADAS:
+            encontradas.add(no["Relation Name"])
+        pendentes.extend(no.get("Plans", []))
+    return encontradas
+
+
+def verificar_planos(analises=200_000):
+    if engine.dialect.name != "postgresql":
+        print("A regressão de planos só roda no PostgreSQL")
+        return 2
+
+    falhas = 0
+    with engine.connect() as conexao:
+        transacao = conexao.begin()
+        try:
+            popular(conexao, analises)
+            db = Session(bind=conexao)
+            for nome, executar in casos(db).items():
+                capturados = []
+
+                def capturar(conn, cursor, statement, parameters, context, executemany):
+                    if statement.lstrip().upper().startswith("SELECT"):
+                        capturados.append((statement, parameters))
+
+                event.listen(conexao, "before_cursor_execute", capturar)
+                try:
+                    executar()
+                finally:
+                    event.remove(conexao, "before_cursor_execute", capturar)
+
+                for statement, parameters in capturados:
+                    resultado = conexao.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+                    plano = (json.loads(resultado) if isinstance(resultado, str) else resultado)[0]["Plan"]
+                    seq = varreduras_sequenciais(plano)
+                    status = "FALHOU" if seq else "ok"
+                    print(f"[{status}] {nome}: custo {plano['Total Cost']:.0f}" + (f" | Seq Scan em {', '.join(sorted(seq))}" if seq else ""))
+                    if seq:
+                        falhas += 1
+            db.close()
+        finally:
+            transacao.rollback()
+
+    print(f"\n{falhas} consulta(s) com Seq Scan")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    sys.exit(verificar_planos(quantidade))
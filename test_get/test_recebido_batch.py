@@ -0,0 +1,70 @@
+import json
+import time
+
+import requests
+
+from utils import medir_tempo, medir_tempo_post
+
+BASE_URL = "http://127.0.0.1:8000"
+
+
+def gerar_resultados(quantidade, acao_id=1):
+    sentimentos = ["Satisfação", "Raiva", "Frustração", "Neutro"]
+    return [
+        {
+            "acao_id": acao_id,
+            "user_id": 1,
+            "agent_id": 1,
+            "sentimento": sentimentos[i % len(sentimentos)],
+            "score": round((i % 100) / 100, 2),
+            "data_analise": "2024-01-01T10:00:00"
+        }
+        for i in range(quantidade)
+    ]
+
+
+def comparar_recebido_batch(quantidade=500):
+    resultados = gerar_resultados(quantidade)
+
+    url = f"{BASE_URL}/sentimento/recebido"
+    sessao = requests.Session()
+    inicio = time.perf_counter()
+    falhas = 0
+    for resultado in resultados:
+        if sessao.post(url, json=resultado).status_code != 201:
+            falhas += 1
+    duracao_unitario = time.perf_counter() - inicio
+
+    print(f"\nPOST {url} x {quantidade}")
+    print(f"Falhas: {falhas}")
+    print(f"Tempo total: {duracao_unitario:.4f} segundos ({quantidade / duracao_unitario:.1f} resultados/s)")
+
+    url = f"{BASE_URL}/sentimento/recebido/batch"
+    duracao_lote, resposta = medir_tempo_post(url, json=resultados)
+
+    print(f"\nPOST {url} (lista JSON com {quantidade} resultados)")
+    print(f"Status: {resposta.status_code}")
+    print(f"Tempo total: {duracao_lote:.4f} segundos ({quantidade / duracao_lote:.1f} resultados/s)")
+
+    corpo = "\n".join(json.dumps(resultado) for resultado in resultados)
+    duracao_ndjson, resposta = medir_tempo_post(
+        url, data=corpo, headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    print(f"\nPOST {url} (NDJSON com {quantidade} resultados)")
+    print(f"Status: {resposta.status_code}")
+    print(f"Tempo total: {duracao_ndjson:.4f} segundos ({quantidade / duracao_ndjson:.1f} resultados/s)")
+    try:
+        dados = resposta.json()
+        print(f"Salvos: {dados['salvos']} | Falhas: {dados['falhas']}")
+    except Exception as e:
+        print("Erro ao interpretar JSON:", e)
+
+    print(f"\nGanho do lote sobre chamadas unitárias: {duracao_unitario / duracao_lote:.1f}x")
+
+    _, resposta = medir_tempo(f"{BASE_URL}/sentimento/recebido/metricas")
+    print("Métricas do buffer:", resposta.json())
+
+
+if __name__ == "__main__":
+    comparar_recebido_batch()
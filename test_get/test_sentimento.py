@@ -1,7 +1,15 @@
+import json
+import time
+
+import requests
+
 from utils import medir_tempo
 
+BASE_URL = "http://127.0.0.1:8000"
+
+
 def testar_get_sentimentos():
-    url = "http://127.0.0.1:8000/sentimento/all"
+    url = f"{BASE_URL}/sentimento/all"
     duracao, resposta = medir_tempo(url)
 
     print(f"\nGET {url}")
@@ -14,5 +22,62 @@ def testar_get_sentimentos():
     except Exception as e:
         print("Erro ao interpretar JSON:", e)
 
+
+def testar_get_sentimentos_paginado(limite=1000):
+    url = f"{BASE_URL}/sentimento/all"
+    sessao = requests.Session()
+    cursor = None
+    paginas = 0
+    registros = 0
+    pior_pagina = 0.0
+    inicio = time.perf_counter()
+    while True:
+        params = {"limite": limite}
+        if cursor is not None:
+            params["apos"] = cursor
+        inicio_pagina = time.perf_counter()
+        resposta = sessao.get(url, params=params)
+        pior_pagina = max(pior_pagina, time.perf_counter() - inicio_pagina)
+        if resposta.status_code != 200:
+            print(f"Status inesperado: {resposta.status_code}")
+            break
+        dados = resposta.json()
+        paginas += 1
+        registros += len(dados["items"])
+        cursor = dados["proximo_cursor"]
+        if cursor is None:
+            break
+    duracao = time.perf_counter() - inicio
+
+    print(f"\nGET {url}?limite={limite} (paginado)")
+    print(f"Páginas: {paginas} | Registros: {registros}")
+    print(f"Tempo total: {duracao:.4f} segundos | Página mais lenta: {pior_pagina:.4f} segundos")
+
+
+def testar_get_sentimentos_ndjson():
+    url = f"{BASE_URL}/sentimento/all?formato=ndjson"
+    inicio = time.perf_counter()
+    primeiro_registro = None
+    registros = 0
+    with requests.get(url, stream=True) as resposta:
+        for linha in resposta.iter_lines():
+            if not linha:
+                continue
+            json.loads(linha)
+            if primeiro_registro is None:
+                primeiro_registro = time.perf_counter() - inicio
+            registros += 1
+    duracao = time.perf_counter() - inicio
+
+    print(f"\nGET {url} (streaming)")
+    print(f"Status: {resposta.status_code}")
+    print(f"Registros: {registros}")
+    if primeiro_registro is not None:
+        print(f"Tempo até o primeiro registro: {primeiro_registro:.4f} segundos")
+    print(f"Tempo total: {duracao:.4f} segundos")
+
+
 if __name__ == "__main__":
     testar_get_sentimentos()
+    testar_get_sentimentos_paginado()
+    testar_get_sentimentos_ndjson()
@@ -0,0 +1,90 @@
+"""
+Resultado atrasado gravado enquanto a parte encerrada da tendência está sendo consultada.
+
+Roda no processo, contra o banco do ``.env`` (com ao menos uma ação em ``cs_acoes``):
+
+    python test_tendencia_corrida.py
+
+A análise de teste é removida no final e as estatísticas são reconstruídas.
+"""
+import asyncio
+import os
+import sys
+from datetime import date, datetime, time, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app import models
+from app.database import AsyncSessionLocal, SessionLocal
+from app.services import tendencias
+from app.services.estatisticas import reconstruir_estatisticas
+from app.services.services_sentimentos import preparar_analise, salvar_analises_lote
+
+
+def total(resposta: dict) -> int:
+    return sum(sum(serie["quantidade"]) for serie in resposta["series"])
+
+
+def gravar_atrasada(acao_id: int, data_analise: datetime) -> int:
+    db = SessionLocal()
+    try:
+        linha = preparar_analise({"acao_id": acao_id, "sentimento": "neutro", "score": 0.5, "data_analise": data_analise})
+        salvar_analises_lote(db, [linha])
+        return linha["analise_id"]
+    finally:
+        db.close()
+
+
+def remover(analise_id: int):
+    db = SessionLocal()
+    try:
+        db.query(models.AnaliseSentimento).filter_by(analise_id=analise_id).delete(synchronize_session=False)
+        db.commit()
+        reconstruir_estatisticas(db)
+    finally:
+        db.close()
+
+
+async def testar_escrita_durante_consulta():
+    db = SessionLocal()
+    try:
+        acao_id = db.query(models.Acao.acao_id).limit(1).scalar()
+    finally:
+        db.close()
+    if acao_id is None:
+        print("Nenhuma ação em cs_acoes; rode dados_sinteticos.py antes")
+        return
+
+    # Intervalo inteiramente encerrado: vai todo para o cache
+    fim = date.today() - timedelta(days=1)
+    inicio = fim - timedelta(days=6)
+    atrasada = datetime.combine(fim - timedelta(days=2), time(12))
+    original = tendencias.consultar_buckets
+    gravadas = []
+
+    def consultar_com_escrita(*args, **kwargs):
+        linhas = original(*args, **kwargs)
+        # A consulta já leu o banco; a escrita confirma e invalida antes do resultado ir ao cache
+        gravadas.append(gravar_atrasada(acao_id, atrasada))
+        return linhas
+
+    try:
+        async with AsyncSessionLocal() as db:
+            tendencias.consultar_buckets = consultar_com_escrita
+            try:
+                antes, _ = await tendencias.get_tendencia_async(db, "dia", inicio, fim)
+            finally:
+                tendencias.consultar_buckets = original
+            depois, _ = await tendencias.get_tendencia_async(db, "dia", inicio, fim)
+        print(f"Análises no intervalo durante a escrita: {total(antes)}")
+        print(f"Análises no intervalo na chamada seguinte: {total(depois)}")
+        print("Métricas do cache:", tendencias.cache_rotas.metricas())
+        assert total(depois) == total(antes) + 1, "o resultado anterior à escrita ficou no cache"
+        print("OK")
+    finally:
+        for analise_id in gravadas:
+            remover(analise_id)
+
+
+if __name__ == "__main__":
+    asyncio.run(testar_escrita_durante_consulta())
@@ -8,3 +8,11 @@ def medir_tempo(url):
     fim = time.perf_counter()
     duracao = fim - inicio
     return duracao, resposta
+
+def medir_tempo_post(url, **kwargs):
+    """Mede o tempo de resposta de uma requisição POST."""
+    inicio = time.perf_counter()
+    resposta = requests.post(url, **kwargs)
+    fim = time.perf_counter()
+    duracao = fim - inicio
+    return duracao, resposta